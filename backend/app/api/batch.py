@@ -1,16 +1,61 @@
 # Batch Processing API
-from fastapi import APIRouter
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from typing import List, Optional
+
+from app.core.config import settings
+from app.api.conversion import conversion_service
+from app.services.conversion_service import ConversionOptions
+from app.services.batch_service import BatchService
+from app.utils.upload_utils import save_upload_file, UploadError
 
 router = APIRouter()
 
+# 初始化批量服务（与转换API共享转换服务和进程池）
+batch_service = BatchService(
+    conversion_service,
+    supported_formats=settings.supported_formats,
+    max_concurrency=settings.batch_max_concurrency,
+    max_tasks=settings.batch_max_tasks,
+)
+
 
 @router.post("/batch/convert")
-async def batch_convert():
-    """批量转换"""
-    return {"success": True, "message": "批量转换成功"}
+async def batch_convert(
+    files: List[UploadFile] = File(...),
+    target_format: str = Form(...),
+    quality: Optional[int] = Form(None),
+    dpi: Optional[int] = Form(None),
+    password: Optional[str] = Form(None),
+):
+    """批量转换
+
+    保存上传文件后立即返回任务ID，转换在后台执行
+    """
+    saved_files = []
+    try:
+        for file in files:
+            saved = await save_upload_file(file, settings.upload_dir, settings.max_file_size)
+            saved_files.append((saved.filename, saved.path))
+    except UploadError as e:
+        for _, path in saved_files:
+            path.unlink(missing_ok=True)
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    options = ConversionOptions(quality=quality, dpi=dpi, password=password)
+
+    try:
+        task = batch_service.submit(saved_files, target_format, options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return task.to_dict()
 
 
 @router.get("/batch/status/{task_id}")
 async def get_batch_status(task_id: str):
     """获取批量任务状态"""
-    return {"task_id": task_id, "status": "completed"}
+    task = batch_service.get_task(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+
+    return task.to_dict()
@@ -1,12 +1,13 @@
 # Conversion API
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query
 from pydantic import BaseModel
 from typing import List, Optional
 from pathlib import Path
-import shutil
 
 from app.core.config import settings
 from app.services.conversion_service import ConversionService, ConversionOptions, ConversionResult
+from app.services.result_cache import ConversionCache
+from app.api.upload import resolve_upload
 
 router = APIRouter()
 
@@ -14,6 +15,10 @@ router = APIRouter()
 conversion_service = ConversionService(
     upload_dir=settings.upload_dir,
     output_dir=settings.output_dir,
+    cache=ConversionCache(
+        settings.cache_dir,
+        max_size=settings.conversion_cache_max_size,
+    ) if settings.conversion_cache_enabled else None,
 )
 
 # 确保目录存在
@@ -29,6 +34,7 @@ class ConversionOptionsPydantic(BaseModel):
     dpi: Optional[int] = None
     page_size: Optional[str] = None
     orientation: Optional[str] = None
+    image_format: Optional[str] = None
 
 
 class ConversionResultPydantic(BaseModel):
@@ -39,20 +45,6 @@ class ConversionResultPydantic(BaseModel):
     error: Optional[str] = None
 
 
-async def _save_upload_file(file: UploadFile) -> Path:
-    """保存上传的文件"""
-    import uuid
-    file_id = str(uuid.uuid4())
-    file_ext = Path(file.filename).suffix
-    filename = f"{file_id}{file_ext}"
-    file_path = Path(settings.upload_dir) / filename
-
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-
-    return file_path
-
-
 def _convert_service_result(service_result: ConversionResult) -> ConversionResultPydantic:
     """转换服务结果为API结果"""
     return ConversionResultPydantic(
@@ -67,12 +59,13 @@ def _convert_service_result(service_result: ConversionResult) -> ConversionResul
 @router.post("/conversion/pdf-to-word", response_model=ConversionResultPydantic)
 async def pdf_to_word(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """PDF转Word"""
     try:
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else None,
@@ -84,6 +77,9 @@ async def pdf_to_word(
 
         return _convert_service_result(result)
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return ConversionResultPydantic(
             success=False,
@@ -95,12 +91,13 @@ async def pdf_to_word(
 @router.post("/conversion/word-to-pdf", response_model=ConversionResultPydantic)
 async def word_to_pdf(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """Word转PDF"""
     try:
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else None,
@@ -112,6 +109,9 @@ async def word_to_pdf(
 
         return _convert_service_result(result)
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return ConversionResultPydantic(
             success=False,
@@ -123,12 +123,13 @@ async def word_to_pdf(
 @router.post("/conversion/pdf-to-excel", response_model=ConversionResultPydantic)
 async def pdf_to_excel(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """PDF转Excel"""
     try:
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else None,
@@ -140,6 +141,9 @@ async def pdf_to_excel(
 
         return _convert_service_result(result)
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return ConversionResultPydantic(
             success=False,
@@ -151,12 +155,13 @@ async def pdf_to_excel(
 @router.post("/conversion/excel-to-pdf", response_model=ConversionResultPydantic)
 async def excel_to_pdf(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """Excel转PDF"""
     try:
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else None,
@@ -168,6 +173,9 @@ async def excel_to_pdf(
 
         return _convert_service_result(result)
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return ConversionResultPydantic(
             success=False,
@@ -179,12 +187,13 @@ async def excel_to_pdf(
 @router.post("/conversion/pdf-to-ppt", response_model=ConversionResultPydantic)
 async def pdf_to_ppt(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """PDF转PPT"""
     try:
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else None,
@@ -196,6 +205,9 @@ async def pdf_to_ppt(
 
         return _convert_service_result(result)
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return ConversionResultPydantic(
             success=False,
@@ -207,12 +219,13 @@ async def pdf_to_ppt(
 @router.post("/conversion/ppt-to-pdf", response_model=ConversionResultPydantic)
 async def ppt_to_pdf(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """PPT转PDF"""
     try:
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else None,
@@ -224,6 +237,9 @@ async def ppt_to_pdf(
 
         return _convert_service_result(result)
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return ConversionResultPydantic(
             success=False,
@@ -235,23 +251,28 @@ async def ppt_to_pdf(
 @router.post("/conversion/pdf-to-images", response_model=List[ConversionResultPydantic])
 async def pdf_to_images(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """PDF转图片"""
     try:
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else 90,
             password=options.password if options else None,
             dpi=options.dpi if options else 200,
+            image_format=options.image_format if options else None,
         )
 
         results = await conversion_service.pdf_to_images(file_path, service_options)
 
         return [_convert_service_result(r) for r in results]
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return [ConversionResultPydantic(
             success=False,
@@ -263,16 +284,23 @@ async def pdf_to_images(
 @router.post("/conversion/images-to-pdf", response_model=ConversionResultPydantic)
 async def images_to_pdf(
     background_tasks: BackgroundTasks,
-    files: List[UploadFile] = File(...),
+    files: Optional[List[UploadFile]] = File(None),
+    upload_ids: Optional[List[str]] = Query(None),
     options: Optional[ConversionOptionsPydantic] = None,
 ):
     """图片转PDF"""
     try:
         saved_files = []
-        for file in files:
-            file_path = await _save_upload_file(file)
+        for file in files or []:
+            file_path = await resolve_upload(file)
+            saved_files.append(file_path)
+        for upload_id in upload_ids or []:
+            file_path = await resolve_upload(upload_id=upload_id)
             saved_files.append(file_path)
 
+        if not saved_files:
+            raise HTTPException(status_code=400, detail="需要上传文件或提供 upload_ids")
+
         service_options = ConversionOptions(
             preserve_formatting=options.preserve_formatting if options else True,
             quality=options.quality if options else None,
@@ -284,6 +312,9 @@ async def images_to_pdf(
 
         return _convert_service_result(result)
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return ConversionResultPydantic(
             success=False,
@@ -309,6 +340,12 @@ async def get_document_info(filename: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/conversion/cache/stats")
+async def get_cache_stats():
+    """获取转换结果缓存统计"""
+    return conversion_service.get_cache_stats()
+
+
 @router.get("/conversion/outputs")
 async def list_output_files():
     """列出生成的输出文件"""
@@ -5,6 +5,7 @@ from typing import List, Optional
 from pathlib import Path
 
 from app.core.config import settings
+from app.api.upload import resolve_upload, upload_session_service
 from app.services.merge_service import (
     MergeService,
     SelectedPage as MergeServiceSelectedPage,
@@ -82,29 +83,41 @@ def _to_pydantic_result(result: MergeServiceMergeResult) -> MergeResultPydantic:
 
 
 @router.post("/merge/upload-document")
-async def upload_document(file_path: str):
-    """上传文档用于合并"""
-    # 验证文件是否存在
-    import shutil
-    from datetime import datetime
-
-    if not Path(file_path).exists():
-        raise HTTPException(status_code=404, detail="文件不存在")
-
-    # 生成文档ID
-    import uuid
-    doc_id = str(uuid.uuid4())
-
-    # 目标路径
-    target_filename = f"{doc_id}.pdf"
-    target_path = Path(settings.upload_dir) / target_filename
+async def upload_document(file_path: Optional[str] = None, upload_id: Optional[str] = None):
+    """上传文档用于合并
+
+    提供 upload_id 时直接使用已完成的分块上传文件，不再复制
+    """
+    if upload_id:
+        target_path = await resolve_upload(upload_id=upload_id)
+        doc_id = upload_id
+        filename = upload_session_service.get_session(upload_id).filename
+    elif file_path:
+        # 验证文件是否存在
+        import shutil
+        import uuid
+
+        if not Path(file_path).exists():
+            raise HTTPException(status_code=404, detail="文件不存在")
+
+        # 生成文档ID
+        doc_id = str(uuid.uuid4())
+
+        # 目标路径
+        target_filename = f"{doc_id}.pdf"
+        target_path = Path(settings.upload_dir) / target_filename
+        filename = Path(file_path).name
+
+        # 复制文件
+        shutil.copy2(file_path, target_path)
+    else:
+        raise HTTPException(status_code=400, detail="需要提供 file_path 或 upload_id")
 
-    # 复制文件
-    shutil.copy2(file_path, target_path)
+    merge_service.register_document(doc_id, filename, target_path)
 
     return {
         "document_id": doc_id,
-        "filename": Path(file_path).name,
+        "filename": filename,
         "status": "uploaded",
     }
 
@@ -1,10 +1,9 @@
 # Search API
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
 from pydantic import BaseModel
 from typing import List, Optional
 from pathlib import Path
-import uuid
-import shutil
+import asyncio
 
 from app.core.config import settings
 from app.services.search_service import (
@@ -12,6 +11,7 @@ from app.services.search_service import (
     SearchOptions as ServiceSearchOptions,
     SearchResult as ServiceSearchResult,
 )
+from app.api.upload import resolve_upload
 
 router = APIRouter()
 
@@ -36,11 +36,38 @@ class SearchResultPydantic(BaseModel):
     highlights: List[str] = []
 
 
+class CorpusSearchHitPydantic(BaseModel):
+    document_id: str
+    page_index: int
+    score: float
+    text: str
+    position: dict
+    highlights: List[str] = []
+
+
+class CorpusSearchFacetPydantic(BaseModel):
+    document_id: str
+    hits: int
+
+
+class CorpusSearchResponsePydantic(BaseModel):
+    query: str
+    total: int
+    truncated: bool = False
+    generation: int
+    facets: List[CorpusSearchFacetPydantic] = []
+    results: List[CorpusSearchHitPydantic] = []
+    next_cursor: Optional[str] = None
+
+
 class IndexBuildResultPydantic(BaseModel):
     success: bool
     document_id: str
+    job_id: Optional[str] = None
+    status: Optional[str] = None
     total_pages: int = 0
     indexed_pages: int = 0
+    pages_per_second: float = 0.0
     error: Optional[str] = None
 
 
@@ -54,17 +81,70 @@ def _to_pydantic_result(result: ServiceSearchResult) -> SearchResultPydantic:
     )
 
 
-async def _save_upload_file(file: UploadFile) -> Path:
-    """保存上传的文件"""
-    file_id = str(uuid.uuid4())
-    file_ext = Path(file.filename).suffix
-    filename = f"{file_id}{file_ext}"
-    file_path = Path(settings.upload_dir) / filename
+@router.get("/search", response_model=CorpusSearchResponsePydantic)
+async def search_corpus(
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    case_sensitive: bool = False,
+    whole_word: bool = False,
+):
+    """在所有已索引文档中搜索
 
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    结果按 BM25 排序，facets 为各文档在全部匹配结果中的命中页数；
+    total 为可翻页的结果数，truncated 为 True 时还有更多匹配的页面未进入排序结果。
+    使用上一页返回的 next_cursor 获取下一页
+    """
+    if not query or not query.strip():
+        raise HTTPException(status_code=400, detail="查询不能为空")
 
-    return file_path
+    service_options = ServiceSearchOptions(
+        case_sensitive=case_sensitive,
+        whole_word=whole_word,
+    )
+
+    try:
+        result = await asyncio.to_thread(
+            search_service.search_corpus, query, service_options, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CorpusSearchResponsePydantic(**result)
+
+
+@router.get("/search/cache/stats")
+async def get_search_cache_stats():
+    """获取搜索结果缓存统计（命中率等）"""
+    return search_service.get_cache_stats()
+
+
+@router.post("/search/reindex")
+async def reindex_all(force: bool = False):
+    """把所有已索引文档重新加入索引队列（来源文件已删除的文档除外）
+
+    force 为 True 时内容未变化的文档也重新索引，例如修改了分词或段落配置之后
+    """
+    queued = await asyncio.to_thread(search_service.reindex_all, force)
+    return {"queued": queued}
+
+
+@router.post("/search/optimize")
+async def optimize_index():
+    """合并索引段，清除删除和重建文档留下的旧记录"""
+    return await asyncio.to_thread(search_service.optimize_index)
+
+
+@router.post("/search/snapshot")
+async def export_snapshot():
+    """导出索引快照到 search_snapshot_dir，用于复制到新节点
+
+    在新节点上停止服务后执行 python -m app.services.index_snapshot import <快照文件>
+    """
+    try:
+        return await asyncio.to_thread(search_service.export_snapshot)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"导出快照失败: {e}")
 
 
 @router.get("/search/{document_id}", response_model=List[SearchResultPydantic])
@@ -92,24 +172,33 @@ async def search_document(
 @router.post("/search/index/{document_id}", response_model=IndexBuildResultPydantic)
 async def build_index(
     document_id: str,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
 ):
-    """为文档建立搜索索引"""
+    """为文档建立搜索索引（上传文件或使用已完成的分块上传）
+
+    文档加入后台索引队列后立即返回，通过 /search/index/{document_id}/status 查询进度
+    """
     try:
         # 保存上传的文件
-        file_path = await _save_upload_file(file)
+        file_path = await resolve_upload(file, upload_id)
 
-        # 建立索引
-        result = search_service.build_index(document_id, str(file_path))
+        # 加入索引队列
+        job = await asyncio.to_thread(search_service.submit_index, document_id, str(file_path))
 
         return IndexBuildResultPydantic(
-            success=result.get("success", False),
+            success=True,
             document_id=document_id,
-            total_pages=result.get("total_pages", 0),
-            indexed_pages=result.get("indexed_pages", 0),
-            error=result.get("error"),
+            job_id=job.id,
+            status=job.status.value,
+            total_pages=job.total_pages,
+            indexed_pages=job.indexed_pages,
+            pages_per_second=job.pages_per_second,
         )
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         return IndexBuildResultPydantic(
             success=False,
@@ -118,6 +207,12 @@ async def build_index(
         )
 
 
+@router.get("/search/index/{document_id}/status")
+async def get_index_status(document_id: str):
+    """获取文档索引任务状态"""
+    return search_service.get_index_status(document_id)
+
+
 @router.get("/search/index/{document_id}/info")
 async def get_index_info(document_id: str):
     """获取文档索引信息"""
@@ -128,5 +223,5 @@ async def get_index_info(document_id: str):
 @router.delete("/search/index/{document_id}")
 async def delete_index(document_id: str):
     """删除文档的索引"""
-    success = search_service.delete_index(document_id)
+    success = await asyncio.to_thread(search_service.delete_index, document_id)
     return {"success": success}
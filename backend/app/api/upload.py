@@ -0,0 +1,147 @@
+# Resumable Upload API
+from fastapi import APIRouter, HTTPException, Request, UploadFile
+from pydantic import BaseModel
+from typing import List, Optional
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.upload_session_service import UploadSessionService
+from app.utils.upload_utils import save_upload_file, UploadError
+
+router = APIRouter()
+
+# 初始化分块上传服务
+upload_session_service = UploadSessionService(
+    upload_dir=settings.upload_dir,
+    max_file_size=settings.max_file_size,
+    default_chunk_size=settings.upload_chunk_size,
+    session_ttl=settings.upload_session_ttl,
+)
+
+
+class UploadSessionCreatePydantic(BaseModel):
+    filename: str
+    total_size: int
+    chunk_size: Optional[int] = None
+
+
+class UploadSessionPydantic(BaseModel):
+    upload_id: str
+    filename: str
+    total_size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: int
+    received_offset: int
+    missing_chunks: List[int] = []
+    status: str
+    content_hash: Optional[str] = None
+
+
+class UploadCompletePydantic(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    content_hash: str
+
+
+async def resolve_upload(
+    file: Optional[UploadFile] = None,
+    upload_id: Optional[str] = None,
+) -> Path:
+    """获取接口的输入文件：普通上传文件或已完成的分块上传
+
+    Raises:
+        HTTPException: 两者都未提供或上传无效
+    """
+    try:
+        if upload_id:
+            return upload_session_service.resolve_upload(upload_id)
+        if file is not None:
+            saved = await save_upload_file(file, settings.upload_dir, settings.max_file_size)
+            return saved.path
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    raise HTTPException(status_code=400, detail="需要上传文件或提供 upload_id")
+
+
+def _to_pydantic_session(session) -> UploadSessionPydantic:
+    return UploadSessionPydantic(**{
+        k: v for k, v in session.to_dict().items()
+        if k in UploadSessionPydantic.model_fields
+    })
+
+
+@router.post("/uploads", response_model=UploadSessionPydantic)
+async def create_upload(request: UploadSessionCreatePydantic):
+    """创建分块上传会话"""
+    try:
+        session = await upload_session_service.create_session(
+            request.filename, request.total_size, request.chunk_size
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return _to_pydantic_session(session)
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}", response_model=UploadSessionPydantic)
+async def upload_chunk(upload_id: str, index: int, request: Request):
+    """上传编号为 index 的数据块（请求体为原始字节）"""
+    try:
+        session = upload_session_service.get_session(upload_id)
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > session.chunk_size:
+            raise HTTPException(status_code=413, detail="数据块超出分块大小")
+
+        # 没有 content-length（分块传输编码）时也不能无限缓冲，边读边检查长度
+        data = bytearray()
+        async for part in request.stream():
+            data.extend(part)
+            if len(data) > session.chunk_size:
+                raise HTTPException(status_code=413, detail="数据块超出分块大小")
+
+        session = await upload_session_service.write_chunk(upload_id, index, bytes(data))
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return _to_pydantic_session(session)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionPydantic)
+async def get_upload(upload_id: str):
+    """查询上传进度（received_offset 为可续传的偏移量）"""
+    try:
+        session = upload_session_service.get_session(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return _to_pydantic_session(session)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadCompletePydantic)
+async def complete_upload(upload_id: str):
+    """完成上传，之后可通过 upload_id 调用转换、检索和拼接接口"""
+    try:
+        saved = await upload_session_service.finalize(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return UploadCompletePydantic(
+        upload_id=upload_id,
+        filename=saved.filename,
+        size=saved.size,
+        content_hash=saved.content_hash,
+    )
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """取消上传"""
+    try:
+        await upload_session_service.abort(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return {"success": True}
@@ -17,7 +17,11 @@ class Settings(BaseSettings):
     upload_dir: str = "storage/uploads"
     output_dir: str = "storage/outputs"
     thumbnail_dir: str = "storage/thumbnails"
+    cache_dir: str = "storage/cache"
     max_file_size: int = 100 * 1024 * 1024  # 100MB
+    upload_chunk_size: int = 5 * 1024 * 1024  # 分块上传默认块大小 5MB
+    # 未完成的分块上传会话超过此时间（秒）未更新即删除临时文件，0 表示不清理
+    upload_session_ttl: int = 24 * 3600
 
     # Supported Formats
     supported_formats: dict[str, list[str]] = {
@@ -32,12 +36,54 @@ class Settings(BaseSettings):
     default_quality: int = 90
     default_compression: int = 3
 
+    # Worker Pool
+    conversion_workers: int = 0  # 进程池大小，0 表示使用CPU核心数
+
+    # Page Rendering
+    render_pages_per_task: int = 8  # 每个渲染任务最多处理的页数
+    render_max_pixels: int = 40_000_000  # 单页渲染像素上限，限制峰值内存
+
+    # Search Indexing
+    index_pages_per_task: int = 64  # 每个文本提取任务最多处理的页数
+    index_commit_batch_size: int = 50  # 每次提交最多包含的文档数
+    index_commit_interval: float = 2.0  # 一批写入最长等待时间（秒）
+    # 等待其他进程释放索引写锁的时间（秒），超时后任务留在队列中按退避重试
+    index_writer_lock_timeout: float = 5.0
+    # 文本分析器：standard 按单词切分；cjk_bigram 把中日韩文本切分为二元组，修改后自动重建索引
+    search_analyzer: str = "cjk_bigram"
+    search_passage_size: int = 1000  # 索引段落长度（字符）
+    search_passage_overlap: int = 200  # 相邻段落重叠的字符数
+    search_corpus_max_hits: int = 1000  # 全库搜索排序结果最多保留的页数
+    search_ranked_cache_size: int = 32  # 缓存的全库搜索结果集数量
+    search_result_cache_size: int = 1024  # 单文档搜索结果缓存条数，0 表示关闭
+    index_optimize_interval: float = 3600.0  # 定期合并索引段的间隔（秒），0 表示关闭
+    search_warm_start: bool = True  # 启动时在后台预热索引
+
+    # Parsed Document Cache
+    document_cache_max_size: int = 256 * 1024 * 1024  # 按文件大小估算，256MB
+
+    # Thumbnail Cache
+    thumbnail_cache_max_size: int = 512 * 1024 * 1024  # 512MB
+
+    # Conversion Result Cache
+    conversion_cache_enabled: bool = True
+    conversion_cache_max_size: int = 2 * 1024 * 1024 * 1024  # 2GB
+
+    # Batch Jobs
+    batch_max_concurrency: int = 4  # 同时执行的批量转换文件数
+    batch_max_tasks: int = 1000  # 内存中保留的任务数
+
     # Database
     db_url: str = "sqlite+aiosqlite:///storage/db/document_processor.db"
 
     # Search Index
     search_index_dir: str = "storage/db/search_index"
     index_dir: str = "storage/db/search_index"  # 别名，用于向后兼容
+    search_snapshot_dir: str = "storage/db/search_snapshots"
+    # 索引布局：single 单个索引；document 每个文档一个分区，删除和重建只需丢弃分区；
+    # bucket 按文档ID哈希分到 search_index_buckets 个分区。修改后自动重建索引
+    search_index_layout: str = "single"
+    search_index_buckets: int = 16
 
     model_config = SettingsConfigDict(
         env_file=".env",
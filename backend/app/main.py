@@ -1,7 +1,10 @@
 # Application Module
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.services.worker_pool import shutdown_worker_pool
 
 app = FastAPI(
     title=settings.app_name,
@@ -36,11 +39,26 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.on_event("startup")
+async def startup_event():
+    """启动时在后台预热搜索索引"""
+    if settings.search_warm_start:
+        asyncio.get_running_loop().run_in_executor(None, search.search_service.warm_up)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """关闭时释放转换进程池和搜索器"""
+    shutdown_worker_pool()
+    search.search_service.close()
+
+
 # Include routers
-from app.api import conversion, search, annotation, page, batch, merge
+from app.api import conversion, search, annotation, page, batch, merge, upload
 app.include_router(conversion.router, prefix=settings.api_prefix, tags=["conversion"])
 app.include_router(search.router, prefix=settings.api_prefix, tags=["search"])
 app.include_router(annotation.router, prefix=settings.api_prefix, tags=["annotation"])
 app.include_router(page.router, prefix=settings.api_prefix, tags=["page"])
 app.include_router(batch.router, prefix=settings.api_prefix, tags=["batch"])
 app.include_router(merge.router, prefix=settings.api_prefix, tags=["merge"])
+app.include_router(upload.router, prefix=settings.api_prefix, tags=["upload"])
@@ -2,6 +2,7 @@
 from .conversion_service import ConversionService, ConversionOptions, ConversionResult
 from .search_service import SearchService, SearchOptions, SearchResult
 from .merge_service import MergeService, MergeConfig, MergeResult, SelectedPage
+from .batch_service import BatchService, BatchTask, BatchItem, TaskStatus
 
 __all__ = [
     "ConversionService",
@@ -14,4 +15,8 @@ __all__ = [
     "MergeConfig",
     "MergeResult",
     "SelectedPage",
+    "BatchService",
+    "BatchTask",
+    "BatchItem",
+    "TaskStatus",
 ]
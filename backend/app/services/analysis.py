@@ -0,0 +1,121 @@
+# Text Analysis
+from typing import Iterable, Tuple
+import re
+
+try:
+    from whoosh.analysis import LowercaseFilter, StopFilter, Token, Tokenizer
+    WHOOSH_AVAILABLE = True
+except ImportError:
+    WHOOSH_AVAILABLE = False
+
+# 假名、汉字（含扩展A和兼容汉字）、谚文
+CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+
+WORD_PATTERN = re.compile(r"\w+")
+# CJK 字符连续段，或不含 CJK 字符的单词
+CJK_WORD_PATTERN = re.compile(rf"[{CJK_CHARS}]+|[^\W{CJK_CHARS}]+")
+CJK_RUN = re.compile(rf"[{CJK_CHARS}]")
+
+ANALYZERS = ("standard", "cjk_bigram")
+
+
+def iter_tokens(
+    text: str, cjk_bigrams: bool = False, unigrams: bool = False
+) -> Iterable[Tuple[str, int, int]]:
+    """切分词元，产出 (原文词元, 起始偏移, 结束偏移)
+
+    cjk_bigrams 为 True 时，CJK 连续段切分为相互重叠的二元组（单个字符保持原样），
+    其他文字仍按单词切分；否则整段连续的字母数字为一个词元。
+    unigrams 为 True 时 CJK 连续段中的每个字符也作为词元，建立索引时使用，
+    使单字查询（包括连续段末尾的字符）也能匹配。
+    """
+    if not cjk_bigrams:
+        for match in WORD_PATTERN.finditer(text):
+            yield match.group(), match.start(), match.end()
+        return
+
+    for match in CJK_WORD_PATTERN.finditer(text):
+        start, end = match.span()
+        if end - start > 1 and CJK_RUN.match(text, start):
+            for i in range(start, end):
+                if i + 1 < end:
+                    yield text[i:i + 2], i, i + 2
+                if unigrams:
+                    yield text[i], i, i + 1
+        else:
+            yield match.group(), start, end
+
+
+def token_end(text: str, offset: int, cjk_bigrams: bool = False) -> int:
+    """从 offset 开始的词元的结束偏移，与 iter_tokens 的切分一致"""
+    if cjk_bigrams and CJK_RUN.match(text, offset):
+        return offset + 2 if CJK_RUN.match(text, offset + 1) else offset + 1
+    match = (CJK_WORD_PATTERN if cjk_bigrams else WORD_PATTERN).match(text, offset)
+    return match.end() if match else offset
+
+
+if WHOOSH_AVAILABLE:
+
+    class CJKBigramTokenizer(Tokenizer):
+        """Whoosh 分词器：CJK 文本切分为二元组（建立索引时另加单字），其他文字按单词切分"""
+
+        def __call__(
+            self,
+            value,
+            positions=False,
+            chars=False,
+            keeporiginal=False,
+            removestops=True,
+            start_pos=0,
+            start_char=0,
+            tokenize=True,
+            mode="",
+            **kwargs,
+        ):
+            t = Token(positions, chars, removestops=removestops, mode=mode, **kwargs)
+            if not tokenize:
+                t.original = t.text = value
+                t.boost = 1.0
+                if positions:
+                    t.pos = start_pos
+                if chars:
+                    t.startchar = start_char
+                    t.endchar = start_char + len(value)
+                yield t
+                return
+
+            # 建立索引时同时产出单字，查询时只用二元组（单字查询除外）。
+            # 位置按字符递增，单字与同一位置开始的二元组位置相同，
+            # 因此索引和查询中的二元组短语位置一致
+            unigrams = mode != "query"
+            pos = start_pos
+            for match in CJK_WORD_PATTERN.finditer(value):
+                start, end = match.span()
+                run = end - start > 1 and CJK_RUN.match(value, start)
+                tokens = (
+                    iter_tokens(match.group(), cjk_bigrams=True, unigrams=unigrams)
+                    if run else [(match.group(), 0, end - start)]
+                )
+                for text, token_start, token_stop in tokens:
+                    t.text = text
+                    t.boost = 1.0
+                    t.stopped = False
+                    if keeporiginal:
+                        t.original = text
+                    if positions:
+                        t.pos = pos + token_start
+                    if chars:
+                        t.startchar = start_char + start + token_start
+                        t.endchar = start_char + start + token_stop
+                    yield t
+                pos += end - start if run else 1
+
+    def cjk_bigram_analyzer():
+        """CJK 二元组分析器
+
+        单字也保留，因此停用词过滤不限制最短长度；也不重新编号位置，
+        否则与二元组交错的单字会使相邻二元组的位置不再连续，多字短语无法匹配。
+        """
+        return (
+            CJKBigramTokenizer() | LowercaseFilter() | StopFilter(minsize=1, renumber=False)
+        )
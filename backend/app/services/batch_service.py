@@ -0,0 +1,249 @@
+# Batch Service
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import uuid
+
+from app.services.conversion_service import ConversionService, ConversionOptions
+
+logger = logging.getLogger(__name__)
+
+
+# (源格式, 目标格式) -> ConversionService 方法名
+CONVERSION_METHODS: Dict[Tuple[str, str], str] = {
+    ("pdf", "word"): "pdf_to_word",
+    ("pdf", "excel"): "pdf_to_excel",
+    ("pdf", "ppt"): "pdf_to_ppt",
+    ("pdf", "images"): "pdf_to_images",
+    ("word", "pdf"): "word_to_pdf",
+    ("excel", "pdf"): "excel_to_pdf",
+    ("ppt", "pdf"): "ppt_to_pdf",
+    ("image", "pdf"): "images_to_pdf",
+}
+
+TARGET_FORMATS = sorted({target for _, target in CONVERSION_METHODS})
+
+
+class TaskStatus(str, Enum):
+    """任务状态"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    PARTIAL = "partial"  # 部分文件失败
+
+
+class BatchItem:
+    """批量任务中的单个文件"""
+
+    def __init__(
+        self,
+        filename: str,
+        input_path: Path,
+        source_format: Optional[str],
+        method: Optional[str],
+    ):
+        self.id = str(uuid.uuid4())
+        self.filename = filename
+        self.input_path = input_path
+        self.source_format = source_format
+        self.method = method
+        self.status = TaskStatus.PENDING
+        self.progress = 0.0
+        self.output_paths: List[str] = []
+        self.warnings: List[str] = []
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "source_format": self.source_format,
+            "status": self.status.value,
+            "progress": self.progress,
+            "output_paths": self.output_paths,
+            "warnings": self.warnings,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class BatchTask:
+    """批量转换任务"""
+
+    def __init__(self, target_format: str, items: List[BatchItem]):
+        self.id = str(uuid.uuid4())
+        self.target_format = target_format
+        self.items = items
+        self.created_at = datetime.now()
+
+    @property
+    def finished(self) -> bool:
+        return all(item.finished for item in self.items)
+
+    @property
+    def status(self) -> TaskStatus:
+        if not self.finished:
+            if any(item.status != TaskStatus.PENDING for item in self.items):
+                return TaskStatus.RUNNING
+            return TaskStatus.PENDING
+
+        failed = sum(1 for item in self.items if item.status == TaskStatus.FAILED)
+        if failed == 0:
+            return TaskStatus.COMPLETED
+        if failed == len(self.items):
+            return TaskStatus.FAILED
+        return TaskStatus.PARTIAL
+
+    @property
+    def progress(self) -> float:
+        if not self.items:
+            return 1.0
+        return sum(item.progress for item in self.items) / len(self.items)
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.id,
+            "status": self.status.value,
+            "target_format": self.target_format,
+            "progress": round(self.progress, 4),
+            "total_files": len(self.items),
+            "completed_files": sum(1 for i in self.items if i.status == TaskStatus.COMPLETED),
+            "failed_files": sum(1 for i in self.items if i.status == TaskStatus.FAILED),
+            "created_at": self.created_at.isoformat(),
+            "items": [item.to_dict() for item in self.items],
+        }
+
+
+class BatchService:
+    """批量转换服务
+
+    提交后立即返回任务ID，文件在后台按有界并发执行转换
+    """
+
+    def __init__(
+        self,
+        conversion_service: ConversionService,
+        supported_formats: Dict[str, List[str]],
+        max_concurrency: int = 4,
+        max_tasks: int = 1000,
+    ):
+        self.conversion_service = conversion_service
+        self.supported_formats = supported_formats
+        self.max_tasks = max_tasks
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: "OrderedDict[str, BatchTask]" = OrderedDict()
+        self._running: Set[asyncio.Task] = set()
+
+    def _detect_format(self, filename: str) -> Optional[str]:
+        """根据扩展名识别源格式"""
+        ext = Path(filename).suffix.lower()
+        for format_type, extensions in self.supported_formats.items():
+            if ext in extensions:
+                return format_type
+        return None
+
+    def submit(
+        self,
+        files: List[Tuple[str, Path]],
+        target_format: str,
+        options: Optional[ConversionOptions] = None,
+    ) -> BatchTask:
+        """提交批量转换任务
+
+        Args:
+            files: [(原始文件名, 已保存的文件路径), ...]
+            target_format: 目标格式（word/excel/ppt/pdf/images）
+            options: 转换选项
+
+        Raises:
+            ValueError: 目标格式不支持或文件列表为空
+        """
+        if target_format not in TARGET_FORMATS:
+            raise ValueError(f"不支持的目标格式: {target_format}")
+        if not files:
+            raise ValueError("文件列表为空")
+
+        options = options or ConversionOptions()
+        items = []
+        for filename, path in files:
+            source_format = self._detect_format(filename)
+            method = CONVERSION_METHODS.get((source_format, target_format))
+            item = BatchItem(filename, path, source_format, method)
+            if method is None:
+                item.status = TaskStatus.FAILED
+                item.error = f"不支持从 {source_format or '未知格式'} 转换为 {target_format}"
+                item.progress = 1.0
+                item.finished_at = datetime.now()
+            items.append(item)
+
+        task = BatchTask(target_format, items)
+        self._tasks[task.id] = task
+        self._evict_finished_tasks()
+
+        for item in items:
+            if not item.finished:
+                job = asyncio.create_task(self._run_item(item, options))
+                self._running.add(job)
+                job.add_done_callback(self._running.discard)
+
+        return task
+
+    def get_task(self, task_id: str) -> Optional[BatchTask]:
+        """获取任务"""
+        return self._tasks.get(task_id)
+
+    async def _run_item(self, item: BatchItem, options: ConversionOptions) -> None:
+        """在有界并发下转换单个文件"""
+        async with self._semaphore:
+            item.status = TaskStatus.RUNNING
+            item.started_at = datetime.now()
+            try:
+                method = getattr(self.conversion_service, item.method)
+                if item.method == "images_to_pdf":
+                    results = await method([item.input_path], options)
+                else:
+                    results = await method(item.input_path, options)
+                if not isinstance(results, list):
+                    results = [results]
+
+                errors = [r.error or "Unknown error" for r in results if not r.success]
+                item.output_paths = [r.output_path for r in results if r.success and r.output_path]
+                for r in results:
+                    item.warnings.extend(r.warnings)
+
+                if errors or not results:
+                    item.status = TaskStatus.FAILED
+                    item.error = "; ".join(errors) or "转换没有产生输出"
+                else:
+                    item.status = TaskStatus.COMPLETED
+
+            except Exception as e:
+                logger.error(f"批量转换 {item.filename} 失败: {e}")
+                item.status = TaskStatus.FAILED
+                item.error = str(e)
+
+            finally:
+                item.progress = 1.0
+                item.finished_at = datetime.now()
+
+    def _evict_finished_tasks(self) -> None:
+        """超出保留数量时移除最早完成的任务"""
+        if len(self._tasks) <= self.max_tasks:
+            return
+        for task_id in list(self._tasks):
+            if len(self._tasks) <= self.max_tasks:
+                break
+            if self._tasks[task_id].finished:
+                del self._tasks[task_id]
@@ -1,11 +1,12 @@
 # Conversion Service
 from pathlib import Path
 from typing import Optional, List
-from datetime import datetime
+import asyncio
 import uuid
 import os
 import logging
 
+from app.core.config import settings
 from app.models.document import DocumentType
 from app.services.converters import (
     PDFToWordConverter,
@@ -17,6 +18,14 @@ from app.services.converters import (
     PDFToImagesConverter,
     ImagesToPDFConverter,
 )
+from app.services.document_cache import get_document_cache, open_pdf
+from app.services.result_cache import ConversionCache
+from app.services.single_flight import SingleFlight
+from app.services.converters.pdf_renderer import get_page_count
+from app.services.worker_pool import get_worker_count, run_converter, run_in_worker_pool
+from app.utils.file_utils import get_file_hash
+
+logger = logging.getLogger(__name__)
 
 
 class ConversionOptions:
@@ -31,6 +40,7 @@ class ConversionOptions:
         dpi: Optional[int] = None,
         page_size: Optional[str] = None,
         orientation: Optional[str] = None,
+        image_format: Optional[str] = None,
     ):
         self.preserve_formatting = preserve_formatting
         self.quality = quality
@@ -39,6 +49,19 @@ class ConversionOptions:
         self.dpi = dpi
         self.page_size = page_size
         self.orientation = orientation
+        self.image_format = image_format
+
+    def to_dict(self) -> dict:
+        return {
+            "preserve_formatting": self.preserve_formatting,
+            "quality": self.quality,
+            "password": self.password,
+            "include_annotations": self.include_annotations,
+            "dpi": self.dpi,
+            "page_size": self.page_size,
+            "orientation": self.orientation,
+            "image_format": self.image_format,
+        }
 
 
 class ConversionResult:
@@ -58,21 +81,149 @@ class ConversionResult:
         self.warnings = warnings or []
         self.error = error
 
+    def to_dict(self) -> dict:
+        return {
+            "success": self.success,
+            "output_path": self.output_path,
+            "output_format": self.output_format,
+            "warnings": self.warnings,
+            "error": self.error,
+        }
+
 
 class ConversionService:
     """文档转换服务"""
 
-    def __init__(self, upload_dir: str, output_dir: str):
+    def __init__(
+        self,
+        upload_dir: str,
+        output_dir: str,
+        cache: Optional[ConversionCache] = None,
+    ):
         self.upload_dir = Path(upload_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = cache
+        self._inflight = SingleFlight()
 
     def _get_output_path(self, input_filename: str, output_format: str) -> Path:
-        """生成输出文件路径"""
+        """生成输出文件路径
+
+        文件名带随机后缀，同一输入以不同选项转换的结果各自缓存，不会相互覆盖
+        """
         base_name = Path(input_filename).stem
-        return self.output_dir / f"{base_name}_converted.{output_format}"
+        return self.output_dir / f"{base_name}_converted_{uuid.uuid4().hex[:8]}.{output_format}"
+
+    async def _convert(
+        self,
+        converter_cls: type,
+        init_args: tuple,
+        convert_kwargs: Optional[dict] = None,
+    ) -> dict:
+        """将转换器派发到CPU进程池执行并等待结果"""
+        return await run_in_worker_pool(run_converter, converter_cls, init_args, convert_kwargs)
+
+    async def pdf_to_word(self, file: Path, options: ConversionOptions) -> ConversionResult:
+        """PDF转Word"""
+        return await self._cached("pdf_to_word", [file], options, self._pdf_to_word)
+
+    async def word_to_pdf(self, file: Path, options: ConversionOptions) -> ConversionResult:
+        """Word转PDF"""
+        return await self._cached("word_to_pdf", [file], options, self._word_to_pdf)
+
+    async def pdf_to_excel(self, file: Path, options: ConversionOptions) -> ConversionResult:
+        """PDF转Excel"""
+        return await self._cached("pdf_to_excel", [file], options, self._pdf_to_excel)
+
+    async def excel_to_pdf(self, file: Path, options: ConversionOptions) -> ConversionResult:
+        """Excel转PDF"""
+        return await self._cached("excel_to_pdf", [file], options, self._excel_to_pdf)
+
+    async def pdf_to_ppt(self, file: Path, options: ConversionOptions) -> ConversionResult:
+        """PDF转PPT"""
+        return await self._cached("pdf_to_ppt", [file], options, self._pdf_to_ppt)
+
+    async def ppt_to_pdf(self, file: Path, options: ConversionOptions) -> ConversionResult:
+        """PPT转PDF"""
+        return await self._cached("ppt_to_pdf", [file], options, self._ppt_to_pdf)
+
+    async def images_to_pdf(
+        self, files: List[Path], options: ConversionOptions
+    ) -> ConversionResult:
+        """图片转PDF"""
+        return await self._cached("images_to_pdf", files, options, self._images_to_pdf, many=True)
 
-    async def pdf_to_word(
+    async def pdf_to_images(
+        self, file: Path, options: ConversionOptions
+    ) -> List[ConversionResult]:
+        """PDF转图片"""
+        return await self._cached("pdf_to_images", [file], options, self._pdf_to_images)
+
+    async def _cached(
+        self,
+        conversion_type: str,
+        files: List[Path],
+        options: ConversionOptions,
+        compute,
+        many: bool = False,
+    ):
+        """查询结果缓存，未命中时执行转换并写入缓存
+
+        输入、转换类型和选项都相同的并发请求只执行一次转换，共享同一结果。
+
+        Args:
+            conversion_type: 转换类型
+            files: 输入文件
+            options: 转换选项
+            compute: 实际执行转换的协程函数
+            many: compute 是否接收文件列表
+        """
+        target = files if many else files[0]
+
+        hashes = [await asyncio.to_thread(get_file_hash, f) for f in files]
+        key = ConversionCache.make_key(",".join(hashes), conversion_type, options.to_dict())
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                results = [ConversionResult(**r) for r in cached["results"]]
+                return results if cached["is_list"] else results[0]
+
+        return await self._inflight.do(key, lambda: self._compute(key, target, options, compute))
+
+    async def _compute(self, key: str, target, options: ConversionOptions, compute):
+        """执行转换，成功时写入结果缓存"""
+        result = await compute(target, options)
+        results = result if isinstance(result, list) else [result]
+        if self.cache is not None and results and all(r.success and r.output_path for r in results):
+            # 结果独占的子目录（PDF转图片）在淘汰时一并删除，输出目录本身不删除
+            parents = {Path(r.output_path).parent.resolve() for r in results}
+            directory = parents.pop() if len(parents) == 1 else None
+            self.cache.put(
+                key,
+                {"is_list": isinstance(result, list), "results": [r.to_dict() for r in results]},
+                files=[r.output_path for r in results],
+                directory=(
+                    str(directory)
+                    if directory is not None and directory != self.output_dir.resolve()
+                    else None
+                ),
+            )
+
+        return result
+
+    def get_cache_stats(self) -> dict:
+        """获取结果缓存统计"""
+        stats = {
+            "enabled": self.cache is not None,
+            "single_flight": self._inflight.stats(),
+            "document_handles": get_document_cache().stats(),
+        }
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+        return stats
+
+    async def _pdf_to_word(
         self, file: Path, options: ConversionOptions
     ) -> ConversionResult:
         """PDF转Word"""
@@ -81,8 +232,7 @@ class ConversionService:
             output_path = self._get_output_path(file.name, "docx")
             logger.info(f"输出路径: {output_path}")
 
-            converter = PDFToWordConverter(file, output_path)
-            result = converter.convert()
+            result = await self._convert(PDFToWordConverter, (file, output_path))
 
             logger.info(f"转换器结果: {result}")
 
@@ -111,14 +261,13 @@ class ConversionService:
                 error=str(e),
             )
 
-    async def word_to_pdf(
+    async def _word_to_pdf(
         self, file: Path, options: ConversionOptions
     ) -> ConversionResult:
         """Word转PDF"""
         try:
             output_path = self._get_output_path(file.name, "pdf")
-            converter = WordToPDFConverter(file, output_path)
-            result = converter.convert()
+            result = await self._convert(WordToPDFConverter, (file, output_path))
 
             if not result.get("success"):
                 return ConversionResult(
@@ -140,14 +289,15 @@ class ConversionService:
                 error=str(e),
             )
 
-    async def pdf_to_excel(
+    async def _pdf_to_excel(
         self, file: Path, options: ConversionOptions
     ) -> ConversionResult:
         """PDF转Excel"""
         try:
             output_path = self._get_output_path(file.name, "xlsx")
-            converter = PDFToExcelConverter(file, output_path)
-            result = converter.convert(method="auto")
+            result = await self._convert(
+                PDFToExcelConverter, (file, output_path), {"method": "auto"}
+            )
 
             if not result.get("success"):
                 return ConversionResult(
@@ -169,14 +319,13 @@ class ConversionService:
                 error=str(e),
             )
 
-    async def excel_to_pdf(
+    async def _excel_to_pdf(
         self, file: Path, options: ConversionOptions
     ) -> ConversionResult:
         """Excel转PDF"""
         try:
             output_path = self._get_output_path(file.name, "pdf")
-            converter = ExcelToPDFConverter(file, output_path)
-            result = converter.convert()
+            result = await self._convert(ExcelToPDFConverter, (file, output_path))
 
             if not result.get("success"):
                 return ConversionResult(
@@ -198,14 +347,13 @@ class ConversionService:
                 error=str(e),
             )
 
-    async def pdf_to_ppt(
+    async def _pdf_to_ppt(
         self, file: Path, options: ConversionOptions
     ) -> ConversionResult:
         """PDF转PPT"""
         try:
             output_path = self._get_output_path(file.name, "pptx")
-            converter = PDFToPPTConverter(file, output_path)
-            result = converter.convert()
+            result = await self._convert(PDFToPPTConverter, (file, output_path))
 
             if not result.get("success"):
                 return ConversionResult(
@@ -228,14 +376,13 @@ class ConversionService:
                 error=str(e),
             )
 
-    async def ppt_to_pdf(
+    async def _ppt_to_pdf(
         self, file: Path, options: ConversionOptions
     ) -> ConversionResult:
         """PPT转PDF"""
         try:
             output_path = self._get_output_path(file.name, "pdf")
-            converter = PPTToPDFConverter(file, output_path)
-            result = converter.convert()
+            result = await self._convert(PPTToPDFConverter, (file, output_path))
 
             if not result.get("success"):
                 return ConversionResult(
@@ -258,19 +405,19 @@ class ConversionService:
                 error=str(e),
             )
 
-    async def images_to_pdf(
+    async def _images_to_pdf(
         self, files: List[Path], options: ConversionOptions
     ) -> ConversionResult:
         """图片转PDF"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.output_dir / f"images_{timestamp}.pdf"
+            output_path = self.output_dir / f"images_{uuid.uuid4().hex}.pdf"
 
             page_size = options.page_size or "a4"
             orientation = options.orientation or "keep-original"
 
-            converter = ImagesToPDFConverter(files, output_path, page_size, orientation)
-            result = converter.convert()
+            result = await self._convert(
+                ImagesToPDFConverter, (files, output_path, page_size, orientation)
+            )
 
             if not result.get("success"):
                 return ConversionResult(
@@ -292,35 +439,64 @@ class ConversionService:
                 error=str(e),
             )
 
-    async def pdf_to_images(
+    async def _pdf_to_images(
         self, file: Path, options: ConversionOptions
     ) -> List[ConversionResult]:
-        """PDF转图片"""
+        """PDF转图片
+
+        页面按范围切分后分派到多个工作进程并行渲染
+        """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = self.output_dir / f"{file.stem}_{timestamp}"
-            output_dir.mkdir(parents=True, exist_ok=True)
+            # 每个结果一个独立目录，选项不同的结果不会写入同一目录
+            output_dir = self.output_dir / f"{file.stem}_{uuid.uuid4().hex}"
+            output_dir.mkdir(parents=True)
 
             dpi = options.dpi or 200
-            output_format = options.quality or "png"  # 使用quality参数作为格式
+            output_format = (options.image_format or "png").lower()
 
-            converter = PDFToImagesConverter(file, output_dir, output_format, dpi)
-            result = converter.convert()
+            total_pages = await run_in_worker_pool(get_page_count, file, options.password)
+            chunk_size = max(
+                1, min(settings.render_pages_per_task, -(-total_pages // get_worker_count()))
+            )
+            chunks = [
+                list(range(start + 1, min(start + chunk_size, total_pages) + 1))
+                for start in range(0, total_pages, chunk_size)
+            ]
 
-            if not result.get("success"):
-                error_msg = result.get("error", "Unknown error")
+            init_args = (
+                file, output_dir, output_format, dpi,
+                options.quality, settings.render_max_pixels, options.password,
+            )
+            chunk_results = await asyncio.gather(*[
+                self._convert(PDFToImagesConverter, init_args, {"page_numbers": chunk})
+                for chunk in chunks
+            ])
+
+            failed = [r for r in chunk_results if not r.get("success")]
+            if failed or not chunks:
+                if failed:
+                    error_msg = failed[0].get("error", "Unknown error")
+                else:
+                    error_msg = "没有要转换的页面"
                 return [
-                    ConversionResult(success=False, error=error_msg)
+                    ConversionResult(success=False, output_format=output_format, error=error_msg)
                 ]
 
+            images = sorted(
+                (img for r in chunk_results for img in r.get("images", [])),
+                key=lambda img: img["page_number"],
+            )
+            warnings = [e for r in chunk_results for e in r.get("errors", [])]
+
             # 返回每个图片的结果
             results = []
-            for img_info in result.get("images", []):
-                img_path = Path(result["output_dir"]) / img_info["filename"]
+            for img_info in images:
+                img_path = output_dir / img_info["filename"]
                 results.append(ConversionResult(
                     success=True,
                     output_path=str(img_path),
                     output_format=output_format,
+                    warnings=warnings,
                 ))
 
             return results
@@ -336,13 +512,12 @@ class ConversionService:
             suffix = file.suffix.lower()
 
             if suffix == ".pdf":
-                from PyPDF2 import PdfReader
-                reader = PdfReader(str(file))
-                return {
-                    "type": "pdf",
-                    "page_count": len(reader.pages),
-                    "metadata": reader.metadata,
-                }
+                with open_pdf(file) as reader:
+                    return {
+                        "type": "pdf",
+                        "page_count": len(reader.pages),
+                        "metadata": reader.metadata,
+                    }
             elif suffix in [".doc", ".docx"]:
                 return {
                     "type": "word",
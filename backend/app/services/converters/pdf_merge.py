@@ -1,10 +1,14 @@
 # Document Merge Converter
 from PyPDF2 import PdfReader, PdfWriter
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Optional
-from PIL import Image
+from typing import Dict, List, Optional
+import base64
 import io
 
+from .pdf_renderer import PDFRenderer
+from app.services.document_cache import open_pdf
+
 
 class DocumentMergeConverter:
     """文档拼接转换器"""
@@ -14,63 +18,69 @@ class DocumentMergeConverter:
 
     def merge_pdf_pages(
         self,
-        pdf_files: List[Path],
-        page_indices: List[tuple[int, int]],  # [(doc_index, page_index), ...]
+        sources: Dict[str, Path],
+        page_indices: List[tuple[str, int]],  # [(document_id, page_index), ...]
         page_size: str = "auto",
         orientation: str = "keep-original",
     ) -> dict:
         """合并多个PDF页面为一个新PDF
 
+        每个源文档只打开一次，页面按队列顺序写入，读取器数量与源文档数量相关，
+        与页面数量无关。
+
         Args:
-            pdf_files: PDF文件路径列表
-            page_indices: 要合并的页面索引 [(文档索引, 页面索引), ...]
+            sources: 文档ID到PDF文件路径的映射
+            page_indices: 要合并的页面 [(文档ID, 页面索引), ...]
             page_size: 页面尺寸
             orientation: 页面方向
         """
         try:
-            writer = PdfWriter()
+            missing = {doc_id for doc_id, _ in page_indices} - set(sources)
+            if missing:
+                return {
+                    "success": False,
+                    "error": f"文档 {sorted(missing)[0]} 不存在",
+                }
 
-            # 创建新PDF文档
-            for doc_idx, page_idx in page_indices:
-                if doc_idx >= len(pdf_files):
-                    return {
-                        "success": False,
-                        "error": f"文档索引 {doc_idx} 超出范围",
-                    }
+            with ExitStack() as stack:
+                # 按固定顺序打开用到的源文档，每个只打开一次
+                used = sorted({doc_id for doc_id, _ in page_indices})
+                readers: Dict[str, PdfReader] = {
+                    doc_id: stack.enter_context(open_pdf(sources[doc_id])) for doc_id in used
+                }
 
-                pdf_path = pdf_files[doc_idx]
-                reader = PdfReader(str(pdf_path))
+                writer = PdfWriter()
 
-                if page_idx >= len(reader.pages):
-                    return {
-                        "success": False,
-                        "error": f"页面索引 {page_idx} 超出范围",
-                    }
+                # 创建新PDF文档
+                for doc_id, page_idx in page_indices:
+                    reader = readers[doc_id]
 
-                page = reader.pages[page_idx]
+                    if page_idx < 0 or page_idx >= len(reader.pages):
+                        return {
+                            "success": False,
+                            "error": f"页面索引 {page_idx} 超出范围",
+                        }
 
-                # 处理页面尺寸和方向
-                if orientation == "keep-original":
-                    merged_page = page
-                elif orientation == "portrait":
-                    merged_page = page.rotate(0)
-                elif orientation == "landscape":
-                    merged_page = page.rotate(90)
+                    # 同一页面可能多次出现，旋转作用在写入后的副本上，不修改源页面
+                    merged_page = writer.add_page(reader.pages[page_idx])
 
-                # 如果需要统一页面尺寸，需要添加到标准尺寸的页面
-                if page_size != "auto":
-                    # TODO: 实现页面尺寸统一逻辑
-                    pass
+                    # 处理页面方向
+                    if orientation == "landscape":
+                        merged_page.rotate(90)
 
-                writer.add_page(merged_page)
+                    # 如果需要统一页面尺寸，需要添加到标准尺寸的页面
+                    if page_size != "auto":
+                        # TODO: 实现页面尺寸统一逻辑
+                        pass
 
-            # 写入输出文件
-            writer.write(str(self.output_path))
+                # 写入输出文件
+                writer.write(str(self.output_path))
 
             return {
                 "success": True,
                 "output_file": str(self.output_path),
                 "pages_merged": len(page_indices),
+                "sources_opened": len(readers),
             }
 
         except Exception as e:
@@ -87,39 +97,40 @@ class DocumentMergeConverter:
     ) -> List[dict]:
         """从PDF中提取页面缩略图
 
+        不带缓存，在线服务请使用 ThumbnailService
+
         Args:
             pdf_path: PDF文件路径
             pages: 要提取的页码列表，None表示全部页面
             size: 缩略图尺寸（宽度，高度）
         """
         try:
-            reader = PdfReader(str(pdf_path))
             thumbnails = []
 
-            # 确定要处理的页码
-            page_numbers = list(range(len(reader.pages))) if pages is None else pages
+            with PDFRenderer(pdf_path) as renderer:
+                # 确定要处理的页码
+                page_numbers = list(range(renderer.page_count)) if pages is None else pages
 
-            for page_num in page_numbers:
-                if page_num >= len(reader.pages):
-                    continue
+                for page_num in page_numbers:
+                    if page_num >= renderer.page_count:
+                        continue
 
-                page = reader.pages[page_num]
+                    img_data = self._create_thumbnail(renderer, page_num, size)
 
-                # 使用PIL创建缩略图
-                img_data = self._create_thumbnail(page, size)
+                    if img_data:
+                        thumbnails.append({
+                            "page_number": page_num + 1,
+                            "thumbnail": img_data["data"],
+                            "width": img_data["width"],
+                            "height": img_data["height"],
+                        })
 
-                if img_data:
-                    thumbnails.append({
-                        "page_number": page_num + 1,
-                        "thumbnail": img_data["data"],
-                        "width": img_data["width"],
-                        "height": img_data["height"],
-                    })
+                total_pages = renderer.page_count
 
             return {
                 "success": True,
                 "thumbnails": thumbnails,
-                "total_pages": len(reader.pages),
+                "total_pages": total_pages,
             }
 
         except Exception as e:
@@ -128,32 +139,22 @@ class DocumentMergeConverter:
                 "error": str(e),
             }
 
-    def _create_thumbnail(self, page, size: tuple[int, int]) -> Optional[dict]:
-        """创建单个页面的缩略图
-
-        注意：pypdf2不直接支持页面渲染为图片
-        这里需要使用pdf2image或其他库
-        目前返回占位数据
-        """
+    def _create_thumbnail(
+        self, renderer: PDFRenderer, page_num: int, size: tuple[int, int]
+    ) -> Optional[dict]:
+        """渲染单个页面的缩略图，返回base64编码的PNG"""
         try:
-            # 获取页面尺寸
-            page_width = float(page.mediabox.width)
-            page_height = float(page.mediabox.height)
-
-            # 计算缩略图尺寸
-            width, height = size
-
-            # 创建占位图片（白色背景）
-            img = Image.new('RGB', (width, height), color='white')
+            page_width, page_height = renderer.page_size(page_num)
+            img = renderer.render_thumbnail(page_num, size)
 
             # 转换为字节
             img_byte_arr = io.BytesIO()
             img.save(img_byte_arr, format='PNG')
 
             return {
-                "data": img_byte_arr.getvalue(),
-                "width": width,
-                "height": height,
+                "data": base64.b64encode(img_byte_arr.getvalue()).decode("ascii"),
+                "width": img.width,
+                "height": img.height,
                 "original_width": int(page_width),
                 "original_height": int(page_height),
             }
@@ -164,23 +165,22 @@ class DocumentMergeConverter:
     def get_pdf_page_info(self, pdf_path: Path) -> dict:
         """获取PDF的页面信息"""
         try:
-            reader = PdfReader(str(pdf_path))
-
-            pages_info = []
-
-            for i, page in enumerate(reader.pages):
-                pages_info.append({
-                    "page_number": i + 1,
-                    "width": float(page.mediabox.width),
-                    "height": float(page.mediabox.height),
-                    "rotation": int(page.rotation),
-                })
+            with open_pdf(pdf_path) as reader:
+                pages_info = []
+
+                for i, page in enumerate(reader.pages):
+                    pages_info.append({
+                        "page_number": i + 1,
+                        "width": float(page.mediabox.width),
+                        "height": float(page.mediabox.height),
+                        "rotation": int(page.rotation),
+                    })
 
-            return {
-                "success": True,
-                "pages": pages_info,
-                "total_pages": len(reader.pages),
-            }
+                return {
+                    "success": True,
+                    "pages": pages_info,
+                    "total_pages": len(reader.pages),
+                }
 
         except Exception as e:
             return {
@@ -202,38 +202,38 @@ class DocumentMergeConverter:
             split_points: 拆分点（页码列表）
         """
         try:
-            reader = PdfReader(str(pdf_path))
-            total_pages = len(reader.pages)
+            with open_pdf(pdf_path) as reader:
+                total_pages = len(reader.pages)
 
-            if not split_points:
-                split_points = [1]
+                if not split_points:
+                    split_points = [1]
 
-            # 验证拆分点
-            split_points = [0] + split_points
-            split_points.append(total_pages)
+                # 验证拆分点
+                split_points = [0] + split_points
+                split_points.append(total_pages)
 
-            # 创建拆分后的PDF
-            output_files = []
+                # 创建拆分后的PDF
+                output_files = []
 
-            for i in range(len(split_points) - 1):
-                start_page = split_points[i]
-                end_page = split_points[i + 1]
+                for i in range(len(split_points) - 1):
+                    start_page = split_points[i]
+                    end_page = split_points[i + 1]
 
-                writer = PdfWriter()
-                for page_num in range(start_page, end_page):
-                    if page_num < total_pages:
-                        writer.add_page(reader.pages[page_num])
+                    writer = PdfWriter()
+                    for page_num in range(start_page, end_page):
+                        if page_num < total_pages:
+                            writer.add_page(reader.pages[page_num])
 
-                # 生成输出文件名
-                output_filename = output_dir / f"{pdf_path.stem}_part_{i + 1}.pdf"
-                writer.write(str(output_filename))
-                output_files.append(str(output_filename))
+                    # 生成输出文件名
+                    output_filename = output_dir / f"{pdf_path.stem}_part_{i + 1}.pdf"
+                    writer.write(str(output_filename))
+                    output_files.append(str(output_filename))
 
-            return {
-                "success": True,
-                "output_files": output_files,
-                "parts_created": len(output_files),
-            }
+                return {
+                    "success": True,
+                    "output_files": output_files,
+                    "parts_created": len(output_files),
+                }
 
         except Exception as e:
             return {
@@ -250,26 +250,26 @@ class DocumentMergeConverter:
     ) -> dict:
         """旋转PDF中的指定页面"""
         try:
-            reader = PdfReader(str(pdf_path))
-
-            if page_number < 1 or page_number > len(reader.pages):
-                return {
-                    "success": False,
-                    "error": f"页码 {page_number} 无效",
-                }
+            with open_pdf(pdf_path) as reader:
+                if page_number < 1 or page_number > len(reader.pages):
+                    return {
+                        "success": False,
+                        "error": f"页码 {page_number} 无效",
+                    }
 
-            page = reader.pages[page_number - 1]
+                page = reader.pages[page_number - 1]
 
-            writer = PdfWriter()
-            rotated_page = page.rotate(rotation)
-            writer.add_page(rotated_page)
-            writer.write(str(output_path))
+                # 旋转写入后的副本，不修改缓存中的源页面
+                writer = PdfWriter()
+                rotated_page = writer.add_page(page)
+                rotated_page.rotate(rotation)
+                writer.write(str(output_path))
 
-            return {
-                "success": True,
-                "output_file": str(output_path),
-                "rotation": rotation,
-            }
+                return {
+                    "success": True,
+                    "output_file": str(output_path),
+                    "rotation": rotation,
+                }
 
         except Exception as e:
             return {
@@ -285,27 +285,27 @@ class DocumentMergeConverter:
     ) -> dict:
         """删除PDF中的指定页面"""
         try:
-            reader = PdfReader(str(pdf_path))
-            writer = PdfWriter()
+            with open_pdf(pdf_path) as reader:
+                writer = PdfWriter()
 
-            if page_number < 1 or page_number > len(reader.pages):
-                return {
-                    "success": False,
-                    "error": f"页码 {page_number} 无效",
-                }
+                if page_number < 1 or page_number > len(reader.pages):
+                    return {
+                        "success": False,
+                        "error": f"页码 {page_number} 无效",
+                    }
 
-            # 添加除指定页面外的所有页面
-            for i, page in enumerate(reader.pages):
-                if i + 1 != page_number:
-                    writer.add_page(page)
+                # 添加除指定页面外的所有页面
+                for i, page in enumerate(reader.pages):
+                    if i + 1 != page_number:
+                        writer.add_page(page)
 
-            writer.write(str(output_path))
+                writer.write(str(output_path))
 
-            return {
-                "success": True,
-                "output_file": str(output_path),
-                "pages_kept": len(reader.pages) - 1,
-            }
+                return {
+                    "success": True,
+                    "output_file": str(output_path),
+                    "pages_kept": len(reader.pages) - 1,
+                }
 
         except Exception as e:
             return {
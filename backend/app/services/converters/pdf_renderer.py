@@ -0,0 +1,139 @@
+# PDF Page Renderer
+from pathlib import Path
+from typing import Optional
+import math
+
+from PIL import Image
+from PyPDF2 import PdfReader
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+try:
+    from pdf2image import convert_from_path
+    POPPLER_AVAILABLE = True
+except ImportError:
+    POPPLER_AVAILABLE = False
+
+
+class RendererUnavailableError(RuntimeError):
+    """没有可用的PDF渲染后端"""
+
+
+def fit_scale(width: float, height: float, scale: float, max_pixels: Optional[int]) -> float:
+    """限制渲染像素总数，避免超大页面占用过多内存"""
+    if max_pixels and width * height * scale * scale > max_pixels:
+        return math.sqrt(max_pixels / (width * height))
+    return scale
+
+
+class PDFRenderer:
+    """PDF页面渲染器
+
+    优先使用 pdfium（pypdfium2），其次使用 poppler（pdf2image）。
+    文档只打开一次，页面逐页渲染，单页渲染完成后即可释放，峰值内存与单页大小相关。
+    """
+
+    def __init__(self, pdf_path: Path, password: Optional[str] = None):
+        self.pdf_path = Path(pdf_path)
+        self.password = password
+        self._pdf = None
+        self._reader: Optional[PdfReader] = None
+        self._page_count: Optional[int] = None
+
+        if PDFIUM_AVAILABLE:
+            self.backend = "pdfium"
+            self._pdf = pdfium.PdfDocument(str(self.pdf_path), password=password)
+            self._page_count = len(self._pdf)
+        elif POPPLER_AVAILABLE:
+            self.backend = "poppler"
+            # poppler 只负责渲染，页数和页面尺寸从 PyPDF2 读取
+            self._reader = PdfReader(str(self.pdf_path))
+            if self._reader.is_encrypted:
+                self._reader.decrypt(password or "")
+            self._page_count = len(self._reader.pages)
+        else:
+            raise RendererUnavailableError(
+                "未安装PDF渲染库，请安装 pypdfium2 或 pdf2image（poppler）"
+            )
+
+    def __enter__(self) -> "PDFRenderer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        self._reader = None
+
+    @property
+    def page_count(self) -> int:
+        return self._page_count
+
+    def page_size(self, page_index: int) -> tuple[float, float]:
+        """页面尺寸（点），已考虑页面旋转"""
+        if self._pdf is not None:
+            page = self._pdf[page_index]
+            try:
+                return page.get_size()
+            finally:
+                page.close()
+
+        page = self._reader.pages[page_index]
+        width, height = float(page.mediabox.width), float(page.mediabox.height)
+        if page.get("/Rotate", 0) % 180 == 90:
+            return (height, width)
+        return (width, height)
+
+    def render(
+        self,
+        page_index: int,
+        dpi: int = 200,
+        max_pixels: Optional[int] = None,
+    ) -> Image.Image:
+        """按DPI渲染单个页面为RGB图片"""
+        scale = dpi / 72
+
+        if self._pdf is not None:
+            page = self._pdf[page_index]
+            try:
+                width, height = page.get_size()
+                scale = fit_scale(width, height, scale, max_pixels)
+                bitmap = page.render(scale=scale)
+                try:
+                    return bitmap.to_pil().convert("RGB")
+                finally:
+                    bitmap.close()
+            finally:
+                page.close()
+
+        width, height = self.page_size(page_index)
+        scale = fit_scale(width, height, scale, max_pixels)
+        images = convert_from_path(
+            str(self.pdf_path),
+            dpi=int(scale * 72),
+            first_page=page_index + 1,
+            last_page=page_index + 1,
+            userpw=self.password,
+        )
+        return images[0].convert("RGB")
+
+    def render_thumbnail(self, page_index: int, size: tuple[int, int]) -> Image.Image:
+        """渲染适合 size（宽，高）范围的缩略图，保持页面比例"""
+        width, height = self.page_size(page_index)
+        scale = min(size[0] / width, size[1] / height)
+        image = self.render(page_index, dpi=max(1, int(math.ceil(scale * 72))))
+        image.thumbnail(size)
+        return image
+
+
+def get_page_count(pdf_path: Path, password: Optional[str] = None) -> int:
+    """获取PDF页数"""
+    with PDFRenderer(pdf_path, password) as renderer:
+        return renderer.page_count
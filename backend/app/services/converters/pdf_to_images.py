@@ -2,19 +2,33 @@
 from PyPDF2 import PdfReader
 from pathlib import Path
 from typing import List, Optional
-from PIL import Image
-import io
-import base64
+
+from .pdf_renderer import PDFRenderer
 
 
 class PDFToImagesConverter:
     """PDF转图片转换器"""
 
-    def __init__(self, pdf_path: Path, output_dir: Path, format: str = "png", dpi: int = 200):
+    # 输出格式 -> PIL保存格式
+    PIL_FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG", "webp": "WEBP"}
+
+    def __init__(
+        self,
+        pdf_path: Path,
+        output_dir: Path,
+        format: str = "png",
+        dpi: int = 200,
+        quality: Optional[int] = None,
+        max_pixels: Optional[int] = None,
+        password: Optional[str] = None,
+    ):
         self.pdf_path = pdf_path
         self.output_dir = output_dir
-        self.format = format.lower()  # png, jpg, jpeg
+        self.format = format.lower()  # png, jpg, jpeg, webp
         self.dpi = dpi
+        self.quality = quality
+        self.max_pixels = max_pixels
+        self.password = password
 
     def convert(self, page_numbers: Optional[List[int]] = None) -> dict:
         """将PDF页面转换为图片
@@ -23,31 +37,39 @@ class PDFToImagesConverter:
             page_numbers: 指定要转换的页码，None表示全部页面
         """
         try:
-            reader = PdfReader(str(self.pdf_path))
-            total_pages = len(reader.pages)
-
-            # 确定要转换的页码
-            if page_numbers is None:
-                pages_to_convert = list(range(total_pages))
-            else:
-                pages_to_convert = [p - 1 for p in page_numbers if 1 <= p <= total_pages]
-
-            if not pages_to_convert:
+            if self.format not in self.PIL_FORMATS:
                 return {
                     "success": False,
-                    "error": "没有要转换的页面",
+                    "error": f"不支持的图片格式: {self.format}",
                 }
 
-            # 确保输出目录存在
-            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with PDFRenderer(self.pdf_path, self.password) as renderer:
+                total_pages = renderer.page_count
+
+                # 确定要转换的页码
+                if page_numbers is None:
+                    pages_to_convert = list(range(total_pages))
+                else:
+                    pages_to_convert = [p - 1 for p in page_numbers if 1 <= p <= total_pages]
+
+                if not pages_to_convert:
+                    return {
+                        "success": False,
+                        "error": "没有要转换的页面",
+                    }
+
+                # 确保输出目录存在
+                self.output_dir.mkdir(parents=True, exist_ok=True)
 
-            images_created = []
+                images_created = []
+                errors = []
 
-            for page_num in pages_to_convert:
-                page = reader.pages[page_num]
-                image_info = self._convert_page_to_image(page, page_num)
-                if image_info.get("success"):
-                    images_created.append(image_info)
+                for page_num in pages_to_convert:
+                    image_info = self._convert_page_to_image(renderer, page_num)
+                    if image_info.get("success"):
+                        images_created.append(image_info)
+                    else:
+                        errors.append(f"第{page_num + 1}页: {image_info.get('error')}")
 
             return {
                 "success": True,
@@ -55,6 +77,8 @@ class PDFToImagesConverter:
                 "images": images_created,
                 "pages_converted": len(images_created),
                 "total_pages": total_pages,
+                "errors": errors,
+                "backend": renderer.backend,
             }
 
         except Exception as e:
@@ -63,49 +87,36 @@ class PDFToImagesConverter:
                 "error": str(e),
             }
 
-    def _convert_page_to_image(self, page, page_num: int) -> dict:
-        """将单个PDF页面转换为图片
+    def _convert_page_to_image(self, renderer: PDFRenderer, page_num: int) -> dict:
+        """渲染单个PDF页面并保存为图片
 
-        注意：pypdf2不直接支持PDF页面渲染为图片
-        这里提供框架，实际渲染需要使用pdf2image或其他库
+        每页渲染后立即写盘并释放，峰值内存受单页像素数（max_pixels）限制
         """
         try:
-            # 提取页面信息
-            page_width = float(page.mediabox.width)
-            page_height = float(page.mediabox.height)
-
-            # 计算图片尺寸（根据DPI）
-            img_width = int(page_width * self.dpi / 72)
-            img_height = int(page_height * self.dpi / 72)
-
-            # 生成输出文件名
             output_filename = self.output_dir / f"page_{page_num + 1:03d}.{self.format}"
 
-            # 这里实际需要使用pdf2image或类似库进行渲染
-            # 目前生成占位图片
+            image = renderer.render(page_num, dpi=self.dpi, max_pixels=self.max_pixels)
             try:
-                # 创建一个纯色图片作为占位符
-                img = Image.new('RGB', (img_width, img_height), color='white')
-                img.save(output_filename, format=self.format.upper())
+                save_kwargs = {}
+                if self.quality and self.PIL_FORMATS[self.format] in ("JPEG", "WEBP"):
+                    save_kwargs["quality"] = self.quality
+                image.save(output_filename, format=self.PIL_FORMATS[self.format], **save_kwargs)
 
                 return {
                     "success": True,
                     "filename": output_filename.name,
                     "page_number": page_num + 1,
-                    "width": img_width,
-                    "height": img_height,
+                    "width": image.width,
+                    "height": image.height,
                     "format": self.format,
                 }
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": f"保存图片失败: {str(e)}",
-                }
+            finally:
+                image.close()
 
         except Exception as e:
             return {
                 "success": False,
-                "error": str(e),
+                "error": f"渲染页面失败: {str(e)}",
             }
 
     def get_page_info(self) -> dict:
@@ -0,0 +1,121 @@
+# Document Handle Cache
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+import os
+import threading
+
+from PyPDF2 import PdfReader
+
+from app.core.config import settings
+
+
+class _Handle:
+    """缓存中的已解析文档"""
+
+    def __init__(self, reader: PdfReader, weight: int):
+        self.reader = reader
+        self.weight = weight
+        # PdfReader 不是线程安全的，同一文档同一时间只允许一个使用者
+        self.lock = threading.RLock()
+
+
+class DocumentHandleCache:
+    """进程内共享的已解析PDF文档LRU缓存
+
+    键为（规范化路径、修改时间、文件大小），文件被替换后自动失效。
+    以文件大小估算内存占用，总量超出预算时淘汰最久未使用的文档。
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._handles: "OrderedDict[Tuple[str, int, int], _Handle]" = OrderedDict()
+        self._total_weight = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: Path) -> Tuple[str, int, int]:
+        stat = os.stat(path)
+        return (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+    @contextmanager
+    def open_pdf(self, path: Path) -> Iterator[PdfReader]:
+        """获取已解析的PdfReader，使用期间独占该文档"""
+        key = self._key(path)
+
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if handle is None:
+            # 在锁外解析，避免大文件阻塞其他文档的访问
+            handle = _Handle(PdfReader(str(path)), weight=key[2])
+            with self._lock:
+                existing = self._handles.get(key)
+                if existing is not None:
+                    handle = existing
+                elif handle.weight <= self.max_bytes:
+                    self._drop_stale(key[0])
+                    self._handles[key] = handle
+                    self._total_weight += handle.weight
+                    self._evict()
+
+        with handle.lock:
+            yield handle.reader
+
+    def _drop_stale(self, resolved_path: str) -> None:
+        """移除同一路径的旧版本（调用方需持有锁）"""
+        for key in [k for k in self._handles if k[0] == resolved_path]:
+            self._total_weight -= self._handles.pop(key).weight
+
+    def _evict(self) -> None:
+        """超出预算时淘汰最久未使用的文档（调用方需持有锁）"""
+        while self._total_weight > self.max_bytes and self._handles:
+            _, handle = self._handles.popitem(last=False)
+            self._total_weight -= handle.weight
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._handles.clear()
+            self._total_weight = 0
+
+    def stats(self) -> Dict[str, float]:
+        """缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "documents": len(self._handles),
+                "total_bytes": self._total_weight,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache: Optional[DocumentHandleCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentHandleCache:
+    """获取进程内共享的文档缓存"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DocumentHandleCache(settings.document_cache_max_size)
+        return _cache
+
+
+def open_pdf(path: Path):
+    """从进程内共享缓存中获取PdfReader（上下文管理器）"""
+    return get_document_cache().open_pdf(path)
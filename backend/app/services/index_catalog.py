@@ -0,0 +1,114 @@
+# Index Catalog
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import sqlite3
+import threading
+
+
+class IndexCatalog:
+    """已索引文档目录
+
+    记录每个文档ID当前索引内容的哈希、页数、字符数、建立耗时和来源文件，
+    用于跳过内容未变化的文档、在索引结构变化后重新建立索引，以及常数时间查询索引信息。
+    目录在索引提交成功后才更新；两者不一致时只会多做一次重建，不会漏掉变更。
+    """
+
+    # 后续版本增加的列及其定义
+    ADDED_COLUMNS = {
+        "source_path": "TEXT",
+        "char_count": "INTEGER NOT NULL DEFAULT 0",
+        "build_seconds": "REAL NOT NULL DEFAULT 0",
+    }
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """db_path 为 None 时使用内存数据库"""
+        self.db_path = db_path
+        self._conn = sqlite3.connect(
+            str(db_path) if db_path else ":memory:", check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    document_id TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    total_pages INTEGER NOT NULL DEFAULT 0,
+                    indexed_pages INTEGER NOT NULL DEFAULT 0,
+                    indexed_at TEXT NOT NULL,
+                    source_path TEXT,
+                    char_count INTEGER NOT NULL DEFAULT 0,
+                    build_seconds REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            # 旧版本目录缺少的列
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(documents)")}
+            for column, definition in self.ADDED_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE documents ADD COLUMN {column} {definition}")
+
+    def get(self, document_id: str) -> Optional[Dict]:
+        """获取文档记录，不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_documents(self) -> List[Dict]:
+        """所有文档记录"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM documents ORDER BY document_id").fetchall()
+        return [dict(row) for row in rows]
+
+    def apply(self, upserts: Iterable[Dict], deletes: Iterable[str]) -> None:
+        """在一个事务中写入和删除记录
+
+        Args:
+            upserts: {"document_id", "content_hash", "total_pages", "indexed_pages",
+                      "source_path", "char_count", "build_seconds"}
+            deletes: 要删除的文档ID
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM documents WHERE document_id = ?",
+                [(document_id,) for document_id in deletes],
+            )
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO documents
+                    (document_id, content_hash, total_pages, indexed_pages, indexed_at,
+                     source_path, char_count, build_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        record["document_id"],
+                        record["content_hash"],
+                        record.get("total_pages", 0),
+                        record.get("indexed_pages", 0),
+                        now,
+                        record.get("source_path"),
+                        record.get("char_count", 0),
+                        record.get("build_seconds", 0.0),
+                    )
+                    for record in upserts
+                ],
+            )
+
+    def clear(self) -> None:
+        """删除所有记录（索引重建时使用）"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,291 @@
+# Index Partitions
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import hashlib
+import os
+import shutil
+import threading
+
+try:
+    from whoosh.index import create_in, open_dir
+    from whoosh.reading import EmptyReader, MultiReader
+    from whoosh.searching import Searcher
+    WHOOSH_AVAILABLE = True
+except ImportError:
+    WHOOSH_AVAILABLE = False
+
+LAYOUTS = ("single", "document", "bucket")
+
+_STAGING = ".staging"  # 整体重建中的分区
+_OLD = ".old"  # 替换过程中的旧分区
+
+
+def partition_name(document_id: str, layout: str, buckets: int = 16) -> str:
+    """文档所属的分区名：document 布局每个文档一个分区，bucket 布局按哈希分桶"""
+    digest = hashlib.sha1(document_id.encode("utf-8")).hexdigest()
+    if layout == "document":
+        return digest
+    return f"{int(digest, 16) % buckets:04d}"
+
+
+class PartitionedIndex:
+    """按文档或哈希桶分区的 Whoosh 索引
+
+    每个分区是一个独立的 Whoosh 索引目录，对外提供与单个索引相同的
+    writer() / searcher() / doc_count() 接口，搜索时用 MultiReader 合并所有分区，
+    打分使用合并后的全局统计。
+
+    document 布局下删除或重建文档直接丢弃整个分区目录，不留下已删除记录；
+    bucket 布局在分桶内按词删除，已删除记录只影响所在的小分区，合并时清除。
+    """
+
+    def __init__(self, root: Path, schema, layout: str, buckets: int = 16):
+        if layout not in ("document", "bucket"):
+            raise ValueError(f"不支持的分区布局: {layout}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.schema = schema
+        self.layout = layout
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._indexes: Dict[str, object] = {}
+        self._readers: Dict[str, object] = {}  # 分区 -> 当前读取器
+        # 读取器的引用计数：当前读取器算一次，每个持有它的搜索器各算一次
+        self._refs: Dict[int, int] = {}
+        self._names: Set[str] = self._recover()
+
+    def _recover(self) -> Set[str]:
+        """清理上次替换分区时中断留下的目录，返回现有分区"""
+        for path in self.root.glob(f"*{_OLD}"):
+            final = path.with_name(path.name[:-len(_OLD)])
+            if final.exists():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.replace(path, final)
+        for path in self.root.glob(f"*{_STAGING}"):
+            shutil.rmtree(path, ignore_errors=True)
+        return {path.name for path in self.root.iterdir() if path.is_dir()}
+
+    def partition(self, document_id: str) -> str:
+        return partition_name(document_id, self.layout, self.buckets)
+
+    def _index(self, name: str):
+        """打开分区索引，不存在时创建（调用方需持有锁）"""
+        ix = self._indexes.get(name)
+        if ix is None:
+            path = self.root / name
+            if path.exists():
+                ix = open_dir(str(path))
+            else:
+                path.mkdir()
+                ix = create_in(str(path), schema=self.schema)
+                self._names.add(name)
+            self._indexes[name] = ix
+        return ix
+
+    def writer(self, timeout: float = 0.0) -> "PartitionedWriter":
+        """timeout 为打开各分区写入器时等待写锁的秒数"""
+        return PartitionedWriter(self, timeout)
+
+    def _acquire_readers(self, names: Optional[List[str]] = None) -> list:
+        """取得分区的读取器并各加一次引用
+
+        未指定 names 时取所有分区，没有当前读取器的分区新打开一个并保留为当前读取器。
+        指定 names 时（单文档搜索）有当前读取器就使用，没有时打开一个只供本次搜索使用、
+        搜索器关闭时即关闭的读取器，逐个文档搜索不会让所有分区的文件都保持打开。
+        """
+        with self._lock:
+            keep = names is None
+            readers = []
+            for name in sorted(self._names) if keep else [n for n in names if n in self._names]:
+                reader = self._readers.get(name)
+                if reader is None:
+                    # 不复用旧读取器：reuse 会关闭旧读取器中未复用的段，而它可能仍在被查询使用
+                    reader = self._index(name).reader()
+                    self._refs[id(reader)] = 0
+                    if keep:
+                        self._readers[name] = reader
+                        self._refs[id(reader)] += 1
+                self._refs[id(reader)] += 1
+                readers.append(reader)
+            return readers
+
+    def _release_readers(self, readers: list) -> None:
+        with self._lock:
+            for reader in readers:
+                self._unref(reader)
+
+    def _unref(self, reader) -> None:
+        """减少一次引用，没有引用时关闭（调用方需持有锁）"""
+        key = id(reader)
+        self._refs[key] -= 1
+        if self._refs[key] == 0:
+            del self._refs[key]
+            reader.close()
+
+    def _retire(self, name: str) -> None:
+        """分区提交或丢弃后不再使用其当前读取器（调用方需持有锁）"""
+        reader = self._readers.pop(name, None)
+        if reader is not None:
+            self._unref(reader)
+
+    def searcher(self, document_id: Optional[str] = None, **kwargs):
+        """合并所有分区的搜索器；关闭时归还读取器，读取器在最后一个持有者关闭后才关闭
+
+        document 布局下指定 document_id 时只打开该文档所在的分区，用于单文档搜索
+        """
+        names = None
+        if document_id is not None and self.layout == "document":
+            names = [self.partition(document_id)]
+        readers = self._acquire_readers(names)
+        if readers:
+            reader = MultiReader(readers, generation=self._generation)
+        else:
+            reader = EmptyReader(self.schema)
+        searcher = _PartitionSearcher(reader, closereader=False, **kwargs)
+        searcher._release = lambda: self._release_readers(readers)
+        return searcher
+
+    def doc_count_all(self) -> int:
+        with self._lock:
+            return sum(self._index(name).doc_count_all() for name in self._names)
+
+    def doc_count(self) -> int:
+        with self._lock:
+            return sum(self._index(name).doc_count() for name in self._names)
+
+    def partition_count(self) -> int:
+        with self._lock:
+            return len(self._names)
+
+    def _commit(self, written: List[str], replaced: Dict[str, Optional[Path]]) -> None:
+        """提交后更新分区：replaced 为 分区 -> 重建后的目录，None 表示丢弃"""
+        with self._lock:
+            for name, staging in replaced.items():
+                final = self.root / name
+                old = final.with_name(name + _OLD)
+                shutil.rmtree(old, ignore_errors=True)
+                if final.exists():
+                    os.replace(final, old)
+                if staging is not None:
+                    os.replace(staging, final)
+                shutil.rmtree(old, ignore_errors=True)
+
+                self._indexes.pop(name, None)
+                self._retire(name)
+                if staging is not None:
+                    self._names.add(name)
+                else:
+                    self._names.discard(name)
+
+            for name in written:
+                if name not in replaced:
+                    self._retire(name)
+            self._generation += 1
+
+    def close(self) -> None:
+        """不再使用各分区的当前读取器，仍被搜索器持有的在搜索器关闭后关闭"""
+        with self._lock:
+            for name in list(self._readers):
+                self._retire(name)
+
+
+class PartitionedWriter:
+    """分区索引的写入器，只在写入线程中使用
+
+    每个涉及的分区各开一个写入器；document 布局下文档先写入临时目录，
+    提交时整体替换原分区。
+    """
+
+    def __init__(self, index: PartitionedIndex, timeout: float = 0.0):
+        self.index = index
+        self.timeout = timeout
+        self._writers: Dict[str, object] = {}
+        self._replaced: Dict[str, Optional[Path]] = {}
+
+    def _writer(self, name: str):
+        writer = self._writers.get(name)
+        if writer is None:
+            if name in self._replaced:
+                staging = self.index.root / (name + _STAGING)
+                shutil.rmtree(staging, ignore_errors=True)
+                staging.mkdir()
+                self._replaced[name] = staging
+                writer = create_in(str(staging), schema=self.index.schema).writer()
+            else:
+                with self.index._lock:
+                    index = self.index._index(name)
+                writer = index.writer(timeout=self.timeout)
+            self._writers[name] = writer
+        return writer
+
+    def _discard(self, name: str) -> None:
+        """放弃本批次中对分区的写入"""
+        writer = self._writers.pop(name, None)
+        if writer is not None:
+            writer.cancel()
+        staging = self._replaced.pop(name, None)
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def delete_by_term(self, fieldname: str, text: str) -> None:
+        """按文档ID删除；document 布局在提交时丢弃整个分区"""
+        if fieldname != "document_id":
+            raise ValueError("分区索引只支持按文档ID删除")
+        name = self.index.partition(text)
+        if self.index.layout == "document":
+            self._discard(name)
+            self._replaced[name] = None
+        else:
+            self._writer(name).delete_by_term(fieldname, text)
+
+    def add_document(self, **fields) -> None:
+        name = self.index.partition(fields["document_id"])
+        if self.index.layout == "document" and name not in self._writers:
+            # 文档总是整体写入新的分区目录
+            self._replaced.setdefault(name, None)
+        self._writer(name).add_document(**fields)
+
+    def commit(self, optimize: bool = False) -> None:
+        """提交所有分区；optimize 时合并各分桶的段
+
+        document 布局的分区只写入一次，本身只有一个段，无需合并。
+        """
+        if optimize and self.index.layout == "bucket":
+            with self.index._lock:
+                names = [
+                    name for name in self.index._names
+                    if name not in self._writers and name not in self._replaced
+                ]
+            for name in names:
+                self._writer(name)
+
+        for writer in self._writers.values():
+            writer.commit(optimize=optimize)
+        self.index._commit(list(self._writers), self._replaced)
+        self._writers = {}
+        self._replaced = {}
+
+    def cancel(self) -> None:
+        for writer in self._writers.values():
+            writer.cancel()
+        for staging in self._replaced.values():
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+        self._writers = {}
+        self._replaced = {}
+
+
+if WHOOSH_AVAILABLE:
+
+    class _PartitionSearcher(Searcher):
+        """分区索引的搜索器，关闭时把分区读取器归还给 PartitionedIndex"""
+
+        _release = None
+
+        def close(self):
+            super().close()
+            release, self._release = self._release, None
+            if release is not None:
+                release()
@@ -0,0 +1,341 @@
+# Index Queue
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class IndexJobStatus(str, Enum):
+    """索引任务状态"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    WAITING_COMMIT = "waiting_commit"  # 已写入，等待批量提交
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class IndexJob:
+    """索引写入任务（建立或删除一个文档的索引）"""
+
+    def __init__(
+        self,
+        document_id: str,
+        action: str = "index",
+        pdf_path: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        force: bool = False,
+    ):
+        self.id = str(uuid.uuid4())
+        self.document_id = document_id
+        self.action = action
+        self.pdf_path = pdf_path
+        self.content_hash = content_hash
+        self.force = force  # 内容未变化也重新索引
+        self.status = IndexJobStatus.QUEUED
+        self.total_pages = 0
+        self.indexed_pages = 0
+        self.elapsed = 0.0
+        self.skipped = False  # 内容未变化，未重新索引
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (IndexJobStatus.COMPLETED, IndexJobStatus.FAILED)
+
+    @property
+    def pages_per_second(self) -> float:
+        return round(self.total_pages / self.elapsed, 1) if self.elapsed > 0 else 0.0
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待任务提交完成"""
+        return self._done.wait(timeout)
+
+    def _finish(self, status: IndexJobStatus, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now()
+        self._done.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "document_id": self.document_id,
+            "action": self.action,
+            "status": self.status.value,
+            "total_pages": self.total_pages,
+            "indexed_pages": self.indexed_pages,
+            "pages_per_second": self.pages_per_second,
+            "skipped": self.skipped,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def to_result(self) -> Dict[str, Any]:
+        """转换为 build_index 的返回格式"""
+        result = {
+            "success": self.status == IndexJobStatus.COMPLETED,
+            "document_id": self.document_id,
+            "status": self.status.value,
+            "total_pages": self.total_pages,
+            "indexed_pages": self.indexed_pages,
+            "elapsed": round(self.elapsed, 3),
+            "pages_per_second": self.pages_per_second,
+            "skipped": self.skipped,
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+_STOP = object()
+
+
+class _ExclusiveTask:
+    """在写入线程中独占执行的维护操作（合并索引段、导出快照等）"""
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+        self.future: Future = Future()
+
+    def run(self) -> None:
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            self.future.set_result(self.func())
+        except BaseException as e:
+            self.future.set_exception(e)
+
+
+class IndexQueue:
+    """后台索引写入队列
+
+    所有写操作都由唯一的写入线程执行，不会再有请求争抢索引写锁。
+    写入线程持续消费任务，攒够 batch_size 个文档或距本批第一个任务超过
+    commit_interval 秒时提交一次，多个文档共享一次提交。
+
+    同一文档在一批中只写入一次，再次出现时先提交当前批次，
+    保证后一次写入能看到并替换前一次的结果。
+    维护操作通过 run_exclusive 排入同一队列，执行前先提交当前批次，执行期间没有写入。
+    写锁被其他进程（另一个服务进程或命令行）占用时，sink 抛出 lock_errors 中的异常，
+    任务不会失败，而是按指数退避重试，直到取得写锁或队列关闭。
+
+    实际的写入由 sink 完成，需要提供：
+        begin_batch() -> writer
+        apply_job(writer, job) -> bool  # 返回 False 表示无需提交（如内容未变化）
+        commit_batch(writer)
+        cancel_batch(writer)
+    """
+
+    def __init__(
+        self,
+        sink: Any,
+        batch_size: int = 50,
+        commit_interval: float = 2.0,
+        max_jobs: int = 1000,
+        lock_errors: tuple = (),
+        lock_retry_delay: float = 0.5,
+        lock_retry_max_delay: float = 30.0,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.max_jobs = max_jobs
+        self.lock_errors = lock_errors
+        self.lock_retry_delay = lock_retry_delay
+        self.lock_retry_max_delay = lock_retry_max_delay
+        self.lock_retries = 0
+        self.commits = 0
+        self.committed_jobs = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._jobs: "OrderedDict[str, IndexJob]" = OrderedDict()  # 文档ID -> 最近的任务
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = threading.Event()
+
+    def submit(self, job: IndexJob) -> IndexJob:
+        """提交任务；同一文档相同内容的任务尚未完成时直接返回该任务"""
+        with self._lock:
+            current = self._jobs.get(job.document_id)
+            if (
+                current is not None
+                and not current.finished
+                and current.action == job.action
+                and current.content_hash == job.content_hash
+                and (current.force or not job.force)
+            ):
+                return current
+
+            self._jobs[job.document_id] = job
+            self._jobs.move_to_end(job.document_id)
+            self._trim()
+            self._ensure_thread()
+
+        self._queue.put(job)
+        return job
+
+    def run_exclusive(self, func: Callable[[], Any]) -> Future:
+        """在写入线程中执行 func，返回其结果的 Future"""
+        task = _ExclusiveTask(func)
+        with self._lock:
+            self._ensure_thread()
+        self._queue.put(task)
+        return task.future
+
+    def _ensure_thread(self) -> None:
+        """写入线程未运行时启动（调用方需持有锁）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._closing.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="index-writer", daemon=True
+            )
+            self._thread.start()
+
+    def get_job(self, document_id: str) -> Optional[IndexJob]:
+        with self._lock:
+            return self._jobs.get(document_id)
+
+    def _trim(self) -> None:
+        """丢弃最早的已完成任务记录（调用方需持有锁）"""
+        excess = len(self._jobs) - self.max_jobs
+        for document_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[document_id].finished:
+                del self._jobs[document_id]
+                excess -= 1
+
+    def _run(self) -> None:
+        """写入线程主循环"""
+        writer = None
+        pending: List[IndexJob] = []
+        deadline = 0.0
+
+        while True:
+            timeout = None if writer is None else max(0.0, deadline - time.monotonic())
+            try:
+                job = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                job = None
+
+            if job is _STOP:
+                if writer is not None:
+                    self._commit(writer, pending)
+                return
+
+            if isinstance(job, _ExclusiveTask):
+                if writer is not None:
+                    self._commit(writer, pending)
+                    writer = None
+                    pending = []
+                job.run()
+                continue
+
+            if job is not None:
+                if writer is not None and any(p.document_id == job.document_id for p in pending):
+                    self._commit(writer, pending)
+                    writer = None
+                    pending = []
+
+                if writer is None:
+                    try:
+                        writer = self._retry_locked(self.sink.begin_batch)
+                    except Exception as e:
+                        logger.error(f"打开索引写入器失败: {e}")
+                        job._finish(IndexJobStatus.FAILED, str(e))
+                        continue
+                    deadline = time.monotonic() + self.commit_interval
+
+                job.status = IndexJobStatus.RUNNING
+                job.started_at = datetime.now()
+                try:
+                    if self._retry_locked(lambda: self.sink.apply_job(writer, job)):
+                        job.status = IndexJobStatus.WAITING_COMMIT
+                        pending.append(job)
+                    else:
+                        job._finish(IndexJobStatus.COMPLETED)
+                except Exception as e:
+                    logger.warning(f"索引文档 {job.document_id} 失败: {e}")
+                    job._finish(IndexJobStatus.FAILED, str(e))
+
+            if writer is not None and (
+                job is None
+                or not pending
+                or len(pending) >= self.batch_size
+                or time.monotonic() >= deadline
+            ):
+                self._commit(writer, pending)
+                writer = None
+                pending = []
+
+    def _retry_locked(self, func: Callable[[], Any]) -> Any:
+        """执行 func，写锁被占用时按指数退避重试；队列关闭时不再等待，抛出最后的异常"""
+        delay = self.lock_retry_delay
+        while True:
+            try:
+                return func()
+            except self.lock_errors as e:
+                if self._closing.is_set():
+                    raise
+                logger.warning(f"索引写锁被占用，{delay:.1f} 秒后重试: {e}")
+                self.lock_retries += 1
+                if self._closing.wait(delay):
+                    raise
+                delay = min(delay * 2, self.lock_retry_max_delay)
+
+    def _commit(self, writer: Any, pending: List[IndexJob]) -> None:
+        """提交本批写入，并通知等待的任务"""
+        if not pending:
+            self.sink.cancel_batch(writer)
+            return
+
+        try:
+            self.sink.commit_batch(writer)
+        except Exception as e:
+            logger.error(f"提交索引失败: {e}")
+            try:
+                self.sink.cancel_batch(writer)
+            except Exception:
+                pass
+            for job in pending:
+                job._finish(IndexJobStatus.FAILED, str(e))
+            return
+
+        self.commits += 1
+        self.committed_jobs += len(pending)
+        for job in pending:
+            job._finish(IndexJobStatus.COMPLETED)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """提交剩余任务并停止写入线程"""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._closing.set()
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "commits": self.commits,
+                "committed_jobs": self.committed_jobs,
+                "lock_retries": self.lock_retries,
+                "jobs_per_commit": (
+                    round(self.committed_jobs / self.commits, 2) if self.commits else 0.0
+                ),
+            }
@@ -0,0 +1,133 @@
+# Index Snapshot
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+import argparse
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+
+MANIFEST_NAME = "snapshot.json"
+
+# 不进入快照的文件：Whoosh 写锁和未完成的临时文件
+_EXCLUDED_SUFFIXES = ("LOCK", ".tmp")
+
+
+def _is_excluded(path: Path) -> bool:
+    return path.name == MANIFEST_NAME or path.name.endswith(_EXCLUDED_SUFFIXES)
+
+
+def export_snapshot(index_dir: Path, target: Path) -> Dict[str, Any]:
+    """把索引目录（索引、目录数据库、文本存储、三元组等）打包为 tar.gz 快照
+
+    调用时不能有写入进行中：服务运行时通过 SearchService.export_snapshot 调用，
+    离线时直接使用命令行。
+
+    Returns:
+        快照信息
+    """
+    index_dir = Path(index_dir)
+    target = Path(target)
+    if not index_dir.is_dir():
+        raise FileNotFoundError(f"索引目录不存在: {index_dir}")
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    files = sorted(
+        path for path in index_dir.rglob("*") if path.is_file() and not _is_excluded(path)
+    )
+    version_path = index_dir / "schema_version"
+    manifest = {
+        "created_at": datetime.now().isoformat(),
+        "schema_version": version_path.read_text().strip() if version_path.exists() else None,
+        "files": len(files),
+        "bytes": sum(path.stat().st_size for path in files),
+    }
+
+    # 先写临时文件，完成后原子替换，避免留下不完整的快照
+    tmp_path = target.with_name(target.name + ".tmp")
+    with tarfile.open(tmp_path, "w:gz") as archive:
+        data = json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        archive.addfile(info, io.BytesIO(data))
+        for path in files:
+            archive.add(path, arcname=path.relative_to(index_dir).as_posix())
+    os.replace(tmp_path, target)
+
+    return {**manifest, "path": str(target), "size": target.stat().st_size}
+
+
+def _safe_members(archive: tarfile.TarFile, root: Path):
+    """只允许解压到 root 之内的普通文件和目录"""
+    root = root.resolve()
+    for member in archive.getmembers():
+        if not (member.isfile() or member.isdir()):
+            raise ValueError(f"快照包含不支持的条目: {member.name}")
+        if not (root / member.name).resolve().is_relative_to(root):
+            raise ValueError(f"快照条目路径无效: {member.name}")
+        yield member
+
+
+def import_snapshot(archive_path: Path, index_dir: Path) -> Dict[str, Any]:
+    """用快照替换索引目录，只能在服务停止时执行
+
+    先解压到同级临时目录并校验，成功后再替换原目录，失败时原目录保持不变。
+    快照的结构版本或分析器与当前配置不一致时，服务启动后会自动重建索引。
+
+    Returns:
+        快照信息
+    """
+    archive_path = Path(archive_path)
+    index_dir = Path(index_dir)
+    index_dir.parent.mkdir(parents=True, exist_ok=True)
+
+    staging = Path(tempfile.mkdtemp(prefix=f".{index_dir.name}.", dir=index_dir.parent))
+    try:
+        with tarfile.open(archive_path, "r:gz") as archive:
+            archive.extractall(staging, members=list(_safe_members(archive, staging)))
+
+        manifest_path = staging / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise ValueError("不是有效的索引快照")
+        manifest = json.loads(manifest_path.read_text())
+        manifest_path.unlink()
+
+        backup = None
+        if index_dir.exists():
+            backup = index_dir.with_name(index_dir.name + ".old")
+            shutil.rmtree(backup, ignore_errors=True)
+            os.replace(index_dir, backup)
+        os.replace(staging, index_dir)
+        if backup is not None:
+            shutil.rmtree(backup, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return {**manifest, "path": str(index_dir)}
+
+
+def main(argv=None) -> None:
+    """命令行：python -m app.services.index_snapshot export|import <快照文件>"""
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="导出或导入搜索索引快照")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("snapshot", help="快照文件路径（.tar.gz）")
+    parser.add_argument("--index-dir", default=settings.index_dir, help="索引目录")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        info = export_snapshot(Path(args.index_dir), Path(args.snapshot))
+    else:
+        info = import_snapshot(Path(args.snapshot), Path(args.index_dir))
+    print(json.dumps(info, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,31 @@
 from typing import List, Optional
 from pathlib import Path
 from datetime import datetime
+import hashlib
 import json
 
 from app.core.config import settings
 from app.services.converters.pdf_merge import DocumentMergeConverter
+from app.services.single_flight import SingleFlight
+from app.services.thumbnail_service import ThumbnailService
+from app.services.worker_pool import run_in_worker_pool
+
+
+def merge_pdf_pages(
+    output_path: Path,
+    sources: dict,
+    page_indices: List[tuple],
+    page_size: str,
+    orientation: str,
+) -> dict:
+    """在工作进程中执行页面合并"""
+    converter = DocumentMergeConverter(output_path)
+    return converter.merge_pdf_pages(
+        sources=sources,
+        page_indices=page_indices,
+        page_size=page_size,
+        orientation=orientation,
+    )
 
 
 class SelectedPage:
@@ -68,10 +89,23 @@ class MergeResult:
 class MergeService:
     """文档拼接服务"""
 
-    def __init__(self):
+    def __init__(self, thumbnail_service: Optional[ThumbnailService] = None):
         """初始化拼接服务"""
+        self.thumbnails = thumbnail_service or ThumbnailService(
+            settings.thumbnail_dir,
+            max_size=settings.thumbnail_cache_max_size,
+        )
         self._queue: List[SelectedPage] = []
         self._documents: dict = {}  # document_id -> document info
+        self._inflight = SingleFlight()
+
+    def register_document(self, document_id: str, name: str, path: Path) -> None:
+        """登记可用于拼接的文档"""
+        self._documents[document_id] = {
+            "id": document_id,
+            "name": name,
+            "path": str(path),
+        }
 
     def select_page(self, selected_page: SelectedPage) -> dict:
         """选择页面"""
@@ -94,7 +128,7 @@ class MergeService:
 
         return {"status": "deselected", "queue_size": len(self._queue)}
 
-    def select_page_range(
+    async def select_page_range(
         self,
         document_id: str,
         start_index: int,
@@ -115,16 +149,10 @@ class MergeService:
             }
 
         try:
-            from PyPDF2 import PdfReader
-
             pdf_path = Path(doc_info["path"])
-            reader = PdfReader(str(pdf_path))
 
-            total_pages = len(reader.pages)
-            converter = DocumentMergeConverter(Path(settings.thumbnail_dir))
-
-            # 提取所有页面的缩略图
-            thumbnails_result = converter.extract_page_thumbnails(
+            # 提取范围内页面的缩略图
+            thumbnails_result = await self.thumbnails.get_thumbnails(
                 pdf_path,
                 pages=list(range(start_index - 1, end_index)),
                 size=(150, 210),  # 缩略图尺寸
@@ -138,28 +166,21 @@ class MergeService:
 
             # 添加页面到队列
             pages_added = []
-            for i in range(start_index - 1, end_index):
-                if i < total_pages:
-                    page_info = reader.pages[i]
-
-                    page_id = f"{document_id}_page_{i}"
-
-                    # 生成缩略图数据（base64）
-                    thumbnail_data = thumbnails_result["thumbnails"][i]["thumbnail"]
-
-                    selected_page = SelectedPage(
-                        id=page_id,
-                        document_id=document_id,
-                        page_index=i,
-                        original_document_name=doc_info["name"],
-                        thumbnail=thumbnail_data,
-                        page_width=thumbnails_result["thumbnails"][i]["width"],
-                        page_height=thumbnails_result["thumbnails"][i]["height"],
-                        rotation=0,  # 初始旋转
-                    )
+            for thumb in thumbnails_result["thumbnails"]:
+                i = thumb["page_number"] - 1
+                selected_page = SelectedPage(
+                    id=f"{document_id}_page_{i}",
+                    document_id=document_id,
+                    page_index=i,
+                    original_document_name=doc_info["name"],
+                    thumbnail=thumb["thumbnail"],
+                    page_width=thumb["width"],
+                    page_height=thumb["height"],
+                    rotation=0,  # 初始旋转
+                )
 
-                    self._queue.append(selected_page)
-                    pages_added.append(i + 1)
+                self._queue.append(selected_page)
+                pages_added.append(i + 1)
 
             return {
                 "success": True,
@@ -173,7 +194,7 @@ class MergeService:
                 "error": str(e),
             }
 
-    def toggle_all_pages(self, document_id: str) -> dict:
+    async def toggle_all_pages(self, document_id: str) -> dict:
         """全选/取消全选文档的所有页面"""
         doc_info = self._documents.get(document_id)
 
@@ -184,11 +205,8 @@ class MergeService:
             }
 
         try:
-            from PyPDF2 import PdfReader
-
             pdf_path = Path(doc_info["path"])
-            reader = PdfReader(str(pdf_path))
-            total_pages = len(reader.pages)
+            total_pages = len(await self.thumbnails.get_page_layout(pdf_path))
 
             # 检查是否已经全选
             already_selected = [
@@ -202,8 +220,7 @@ class MergeService:
                 action = "deselected"
             else:
                 # 否则全选
-                converter = DocumentMergeConverter(Path(settings.thumbnail_dir))
-                thumbnails_result = converter.extract_page_thumbnails(
+                thumbnails_result = await self.thumbnails.get_thumbnails(
                     pdf_path,
                     size=(150, 210),
                 )
@@ -214,18 +231,16 @@ class MergeService:
                         "error": thumbnails_result.get("error"),
                     }
 
-                for i, page in enumerate(reader.pages):
-                    page_id = f"{document_id}_page_{i}"
-                    thumbnail_data = thumbnails_result["thumbnails"][i]["thumbnail"]
-
+                for thumb in thumbnails_result["thumbnails"]:
+                    i = thumb["page_number"] - 1
                     selected_page = SelectedPage(
-                        id=page_id,
+                        id=f"{document_id}_page_{i}",
                         document_id=document_id,
                         page_index=i,
                         original_document_name=doc_info["name"],
-                        thumbnail=thumbnail_data,
-                        page_width=thumbnails_result["thumbnails"][i]["width"],
-                        page_height=thumbnails_result["thumbnails"][i]["height"],
+                        thumbnail=thumb["thumbnail"],
+                        page_width=thumb["width"],
+                        page_height=thumb["height"],
                         rotation=0,
                     )
 
@@ -287,7 +302,10 @@ class MergeService:
         return self._queue
 
     async def merge_documents(self, config: MergeConfig) -> MergeResult:
-        """生成合并后的PDF"""
+        """生成合并后的PDF
+
+        队列和配置都相同的并发请求只合并一次，共享同一结果
+        """
         if not self._queue:
             return MergeResult(
                 success=False,
@@ -295,44 +313,65 @@ class MergeService:
                 error="队列为空",
             )
 
+        queue = list(self._queue)
+        key = self._merge_key(queue, config)
+        return await self._inflight.do(key, lambda: self._merge(queue, config))
+
+    def _merge_key(self, queue: List[SelectedPage], config: MergeConfig) -> str:
+        """根据队列内容和拼接配置生成合并键"""
+        payload = json.dumps(
+            {
+                "pages": [(p.document_id, p.page_index, p.rotation) for p in queue],
+                "documents": sorted(
+                    (doc_id, self._documents.get(doc_id, {}).get("path"))
+                    for doc_id in {p.document_id for p in queue}
+                ),
+                "config": {
+                    "page_size": config.page_size,
+                    "orientation": config.orientation,
+                    "output_file_name": config.output_file_name,
+                    "include_bookmarks": config.include_bookmarks,
+                    "metadata": config.metadata,
+                },
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _merge(self, queue: List[SelectedPage], config: MergeConfig) -> MergeResult:
+        """按队列快照执行合并"""
         try:
-            # 按文档ID分组
-            doc_pages = {}
-            for page in self._queue:
-                if page.document_id not in doc_pages:
-                    doc_pages[page.document_id] = []
-                doc_pages[page.document_id].append((page.document_id, page.page_index))
-
-            # 收集所有PDF文件路径
-            pdf_files = []
-            for doc_id, pages in doc_pages.items():
+            # 按文档ID收集源文件
+            sources = {}
+            for page in queue:
+                doc_id = page.document_id
+                if doc_id in sources:
+                    continue
                 doc_info = self._documents.get(doc_id)
-                if doc_info and Path(doc_info["path"]).exists():
-                    pdf_files.append(Path(doc_info["path"]))
-
-            if not pdf_files:
-                return MergeResult(
-                    success=False,
-                    total_pages=0,
-                    error="没有有效的PDF文件",
-                )
+                if not doc_info or not Path(doc_info["path"]).exists():
+                    return MergeResult(
+                        success=False,
+                        total_pages=0,
+                        error=f"文档 {doc_id} 的PDF文件不存在",
+                    )
+                sources[doc_id] = Path(doc_info["path"])
 
             # 按队列顺序排序页面
-            sorted_pages = []
-            for page in self._queue:
-                sorted_pages.append((page.document_id, page.page_index))
+            sorted_pages = [(page.document_id, page.page_index) for page in queue]
 
             # 生成输出文件路径
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = Path(settings.output_dir) / f"merged_{timestamp}.pdf"
 
-            # 使用合并转换器
-            converter = DocumentMergeConverter(output_path)
-            result = converter.merge_pdf_pages(
-                pdf_files=pdf_files,
-                page_indices=sorted_pages,
-                page_size=config.page_size,
-                orientation=config.orientation,
+            # 在工作进程中执行合并
+            result = await run_in_worker_pool(
+                merge_pdf_pages,
+                output_path,
+                sources,
+                sorted_pages,
+                config.page_size,
+                config.orientation,
             )
 
             if not result.get("success"):
@@ -378,49 +417,36 @@ class MergeService:
             }
 
         try:
-            from PyPDF2 import PdfReader
-            from app.services.converters.pdf_merge import DocumentMergeConverter
-
             pdf_path = Path(doc_info["path"])
-            reader = PdfReader(str(pdf_path))
 
-            # 获取页面信息和缩略图
-            converter = DocumentMergeConverter(Path(settings.thumbnail_dir))
-            page_info = converter.get_pdf_page_info(pdf_path)
+            # 获取页面信息和缩略图（命中缓存时不解析PDF）
+            layout = await self.thumbnails.get_page_layout(pdf_path)
+            thumbnails_result = await self.thumbnails.get_thumbnails(
+                pdf_path,
+                size=(300, 420),  # 更大的预览尺寸
+            )
 
-            if not page_info.get("success"):
-                return {
-                    "success": False,
-                    "error": page_info.get("error"),
+            thumbnails = {}
+            if thumbnails_result.get("success"):
+                thumbnails = {
+                    t["page_number"]: t["thumbnail"] for t in thumbnails_result["thumbnails"]
                 }
 
             pages_data = []
-            for i, info in enumerate(page_info["pages"]):
-                # 提取页面缩略图
-                thumbnails_result = converter.extract_page_thumbnails(
-                    pdf_path,
-                    pages=[i],
-                    size=(300, 420),  # 更大的预览尺寸
-                )
-
-                if thumbnails_result.get("success"):
-                    thumbnail_base64 = thumbnails_result["thumbnails"][0]["thumbnail"]
-                else:
-                    thumbnail_base64 = None
-
+            for i, info in enumerate(layout):
                 pages_data.append({
-                    "page_number": info["page_number"],
+                    "page_number": i + 1,
                     "width": info["width"],
                     "height": info["height"],
                     "rotation": info["rotation"],
-                    "thumbnail": thumbnail_base64,
+                    "thumbnail": thumbnails.get(i + 1),
                 })
 
             return {
                 "success": True,
                 "document_id": document_id,
                 "document_name": doc_info["name"],
-                "total_pages": page_info["total_pages"],
+                "total_pages": len(layout),
                 "pages": pages_data,
             }
 
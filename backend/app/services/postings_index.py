@@ -0,0 +1,172 @@
+# Postings Index
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import threading
+import zlib
+
+from app.services.analysis import iter_tokens
+
+# 每个文档的倒排表：词元 -> 交错排列的 (页码, 字符偏移) 数组
+Postings = Dict[str, array]
+
+
+def tokenize(
+    text: str, cjk_bigrams: bool = False, unigrams: bool = False
+) -> Iterable[Tuple[str, int]]:
+    """切分词元，产出 (小写词元, 起始偏移)，切分规则见 analysis.iter_tokens"""
+    for token, start, _ in iter_tokens(text, cjk_bigrams, unigrams):
+        yield token.lower(), start
+
+
+def build_postings(pages: List[str], cjk_bigrams: bool = False) -> Postings:
+    """为文档各页文本（下标为页码减一）建立倒排表，CJK 单字也建立索引"""
+    postings: Postings = {}
+    for page_index, text in enumerate(pages):
+        for token, offset in tokenize(text, cjk_bigrams, unigrams=True):
+            entry = postings.get(token)
+            if entry is None:
+                entry = postings[token] = array("I")
+            entry.append(page_index + 1)
+            entry.append(offset)
+    return postings
+
+
+def encode_arrays(postings: Postings) -> bytes:
+    """序列化为：头部长度 + JSON 头部（词元和记录数）+ 小端 uint32 数组"""
+    tokens = sorted(postings)
+    header = json.dumps(
+        [[token, len(postings[token])] for token in tokens], ensure_ascii=False
+    ).encode("utf-8")
+    body = array("I")
+    for token in tokens:
+        body.extend(postings[token])
+    if sys.byteorder == "big":
+        body.byteswap()
+    return zlib.compress(struct.pack("<I", len(header)) + header + body.tobytes())
+
+
+def decode_arrays(data: bytes) -> Postings:
+    raw = zlib.decompress(data)
+    (header_size,) = struct.unpack_from("<I", raw)
+    header = json.loads(raw[4:4 + header_size].decode("utf-8"))
+    body = array("I")
+    body.frombytes(raw[4 + header_size:])
+    if sys.byteorder == "big":
+        body.byteswap()
+
+    postings: Postings = {}
+    position = 0
+    for token, count in header:
+        postings[token] = body[position:position + count]
+        position += count
+    return postings
+
+
+class PostingsIndex:
+    """Whoosh 不可用时使用的倒排索引
+
+    每个文档的倒排表压缩后保存为一个文件，服务重启后仍然可用；
+    查询时按需加载到内存，最近使用的文档保留在内存中。
+    """
+
+    SUFFIX = ".postings"
+
+    def __init__(self, root: Path, cache_documents: int = 64):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_documents = cache_documents
+        self._cache: "OrderedDict[str, Postings]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, document_id: str) -> Path:
+        name = hashlib.sha1(document_id.encode("utf-8")).hexdigest()
+        return self.root / f"{name}{self.SUFFIX}"
+
+    def contains(self, document_id: str) -> bool:
+        return self._path(document_id).exists()
+
+    def put(self, document_id: str, postings: Postings) -> None:
+        """保存文档的倒排表，原子替换旧文件"""
+        path = self._path(document_id)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(encode_arrays(postings))
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._cache.pop(document_id, None)
+
+    def get(self, document_id: str) -> Optional[Postings]:
+        """获取文档的倒排表，不存在时返回 None"""
+        with self._lock:
+            postings = self._cache.get(document_id)
+            if postings is not None:
+                self._cache.move_to_end(document_id)
+                return postings
+
+        try:
+            postings = decode_arrays(self._path(document_id).read_bytes())
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            self._cache[document_id] = postings
+            while len(self._cache) > self.cache_documents:
+                self._cache.popitem(last=False)
+        return postings
+
+    def lookup(
+        self, document_id: str, terms: List[str], require_all: bool = False
+    ) -> Dict[int, List[int]]:
+        """查找包含查询词的页面
+
+        Args:
+            terms: 小写词元
+            require_all: 是否要求页面包含所有词元
+
+        Returns:
+            页码 -> 命中词元的起始偏移列表（升序）
+        """
+        postings = self.get(document_id)
+        if postings is None or not terms:
+            return {}
+
+        per_term: List[Dict[int, List[int]]] = []
+        for term in dict.fromkeys(terms):
+            entry = postings.get(term)
+            pages: Dict[int, List[int]] = {}
+            if entry is not None:
+                for i in range(0, len(entry), 2):
+                    pages.setdefault(entry[i], []).append(entry[i + 1])
+            if require_all and not pages:
+                return {}
+            per_term.append(pages)
+
+        if require_all:
+            page_numbers = set(per_term[0])
+            for pages in per_term[1:]:
+                page_numbers &= pages.keys()
+        else:
+            page_numbers = set().union(*per_term)
+
+        return {
+            page: sorted(offset for pages in per_term for offset in pages.get(page, ()))
+            for page in page_numbers
+        }
+
+    def delete(self, document_id: str) -> None:
+        self._path(document_id).unlink(missing_ok=True)
+        with self._lock:
+            self._cache.pop(document_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,176 @@
+# Conversion Result Cache
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionCache:
+    """按内容寻址的转换结果缓存
+
+    键为（输入文件SHA-256、转换类型、规范化的转换选项），值为已生成的输出文件。
+    输出文件总大小超出预算时按LRU淘汰并删除对应文件。
+    """
+
+    INDEX_FILENAME = "conversion_cache.json"
+
+    def __init__(self, cache_dir: str, max_size: int):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def make_key(content_hash: str, conversion_type: str, options: Dict[str, Any]) -> str:
+        """生成缓存键
+
+        None值不参与键计算，密码只以哈希形式参与
+        """
+        normalized = {}
+        for name, value in options.items():
+            if value is None:
+                continue
+            if name == "password":
+                value = hashlib.sha256(str(value).encode("utf-8")).hexdigest()
+            elif isinstance(value, str):
+                value = value.strip().lower()
+            normalized[name] = value
+
+        payload = json.dumps(
+            {"input": content_hash, "type": conversion_type, "options": normalized},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查询缓存，输出文件已丢失时视为未命中"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not all(Path(p).exists() for p in entry["files"]):
+                self._remove(key, delete_files=True)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry["last_access"] = time.time()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["value"]
+
+    def put(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        files: List[str],
+        directory: Optional[str] = None,
+    ) -> None:
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 可JSON序列化的结果数据
+            files: 结果对应的输出文件，用于统计磁盘占用和淘汰时删除
+            directory: 结果独占的目录，淘汰时删除文件后若为空则一并删除
+        """
+        size = sum(os.path.getsize(p) for p in files if os.path.exists(p))
+        if size > self.max_size:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, delete_files=False)
+
+            self._entries[key] = {
+                "value": value,
+                "files": files,
+                "size": size,
+                "directory": directory,
+                "last_access": time.time(),
+            }
+            self._total_size += size
+
+            while self._total_size > self.max_size and len(self._entries) > 1:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key, delete_files=True)
+                self.evictions += 1
+
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "total_size": self._total_size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: str, delete_files: bool) -> None:
+        """移除缓存条目（调用方需持有锁）"""
+        entry = self._entries.pop(key)
+        self._total_size -= entry["size"]
+
+        if delete_files:
+            for file_path in entry["files"]:
+                try:
+                    Path(file_path).unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"删除缓存文件失败 {file_path}: {e}")
+
+            # 只删除结果独占的目录，共享的输出目录即使为空也保留
+            directory = entry.get("directory")
+            if directory:
+                try:
+                    Path(directory).rmdir()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"删除缓存目录失败 {directory}: {e}")
+
+    def _load(self) -> None:
+        """从磁盘加载缓存索引"""
+        index_path = self.cache_dir / self.INDEX_FILENAME
+        if not index_path.exists():
+            return
+
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取转换缓存索引失败: {e}")
+            return
+
+        for key, entry in sorted(entries.items(), key=lambda kv: kv[1]["last_access"]):
+            self._entries[key] = entry
+            self._total_size += entry["size"]
+
+    def _save(self) -> None:
+        """原子地写入缓存索引（调用方需持有锁）"""
+        index_path = self.cache_dir / self.INDEX_FILENAME
+        tmp_path = index_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.warning(f"写入转换缓存索引失败: {e}")
@@ -1,19 +1,111 @@
 # Search Service
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import base64
+import hashlib
 import json
+import math
 import re
+import shutil
+import threading
+import time
 
 try:
-    from whoosh.index import create_in, exists_in, open_dir
-    from whoosh.fields import Schema, TEXT, ID, STORED
+    from whoosh.index import LockError, create_in, exists_in, open_dir
+    from whoosh.fields import Schema, TEXT, ID, NUMERIC, STORED
     from whoosh.qparser import QueryParser, OrGroup, AndGroup
+    from whoosh.query import And, Term
     from whoosh.analysis import StandardAnalyzer
+    from whoosh.sorting import Count, FieldFacet, MultiFacet
+    from app.services.analysis import cjk_bigram_analyzer
     WHOOSH_AVAILABLE = True
 except ImportError:
     WHOOSH_AVAILABLE = False
 
-from PyPDF2 import PdfReader
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+from app.core.config import settings
+from app.services.analysis import ANALYZERS, iter_tokens, token_end
+from app.services.document_cache import open_pdf
+from app.services import index_snapshot
+from app.services.index_catalog import IndexCatalog
+from app.services.index_partitions import LAYOUTS, PartitionedIndex
+from app.services.index_queue import IndexJob, IndexJobStatus, IndexQueue
+from app.services.query_cache import QueryResultCache
+from app.services.searcher_lease import SearcherManager
+from app.services.postings_index import PostingsIndex, build_postings, tokenize
+from app.services.text_store import TextStore
+from app.services.trigram_index import TrigramIndex, build_trigrams
+from app.services.word_boxes import build_page_text, match_rects
+from app.services.worker_pool import get_worker_count, get_worker_pool
+from app.utils.file_utils import get_file_hash
+
+
+# 索引结构版本，变化时重建索引
+SCHEMA_VERSION = 5
+
+# 预热时查询的高频词数量
+WARM_UP_TERMS = 20
+# 每页最多返回的匹配位置数
+MAX_MATCH_POSITIONS = 50
+
+
+def split_passages(text: str, size: int, overlap: int) -> List[Tuple[int, int]]:
+    """把文本切分为固定长度、相互重叠的段落，返回各段的 (起始, 结束) 字符偏移"""
+    if len(text) <= size:
+        return [(0, len(text))]
+
+    step = max(1, size - overlap)
+    passages = []
+    for start in range(0, len(text), step):
+        end = min(start + size, len(text))
+        passages.append((start, end))
+        if end == len(text):
+            break
+    return passages
+
+
+def extract_pages(pdf_path: str, start: int, end: int) -> List[Tuple[str, List[int]]]:
+    """在工作进程中提取 [start, end) 范围内各页的文本和单词边界框
+
+    优先使用 pdfplumber 按单词提取并记录每个单词的位置；未安装时退回 PyPDF2，
+    只提取文本。提取失败的页面返回空文本，不影响同一范围内的其他页面。
+
+    Returns:
+        [(页面文本, 扁平的单词边界框数组), ...]
+    """
+    pages: List[Tuple[str, List[int]]] = []
+
+    if PDFPLUMBER_AVAILABLE:
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_num in range(start, min(end, len(pdf.pages))):
+                page = pdf.pages[page_num]
+                try:
+                    pages.append(build_page_text(page.extract_words()))
+                except Exception as e:
+                    print(f"提取页面 {page_num + 1} 文本失败: {e}")
+                    pages.append(("", []))
+                finally:
+                    # 释放页面解析缓存，避免大文档占用过多内存
+                    page.close()
+        return pages
+
+    with open_pdf(Path(pdf_path)) as reader:
+        for page_num in range(start, min(end, len(reader.pages))):
+            try:
+                pages.append((reader.pages[page_num].extract_text() or "", []))
+            except Exception as e:
+                print(f"提取页面 {page_num + 1} 文本失败: {e}")
+                pages.append(("", []))
+    return pages
 
 
 class SearchOptions:
@@ -44,6 +136,19 @@ class SearchResult:
         self.highlights = highlights or []
 
 
+class _IndexBatch:
+    """一批待提交的索引写入"""
+
+    def __init__(self, writer=None):
+        self.writer = writer  # Whoosh 写入器
+        self.postings: Dict[str, Optional[Dict]] = {}  # 后备方案的倒排表变更，None 表示删除
+        self.trigrams: Dict[str, Optional[Dict]] = {}  # 三元组索引变更，None 表示删除
+        # 提交后写入文本存储的 (各页文本, 各页单词边界框)，None 表示删除
+        self.texts: Dict[str, Optional[Tuple[List[str], List[List[int]]]]] = {}
+        self.upserts: List[Dict] = []  # 提交后写入目录的记录
+        self.deletes: List[str] = []
+
+
 class SearchService:
     """全文检索服务"""
 
@@ -51,26 +156,149 @@ class SearchService:
         """初始化搜索服务"""
         self.index_dir = Path(index_dir)
         self.index_dir.mkdir(parents=True, exist_ok=True)
-
-        self.schema = Schema(
-            document_id=ID(stored=True, unique=True),
-            page_number=STORED(),
-            content=TEXT(analyzer=StandardAnalyzer()),
-            text_stored=STORED(),
+        # 所有写操作都经由后台写入队列，Whoosh 同一时间只有一个写入者
+        self._queue = IndexQueue(
+            self,
+            batch_size=settings.index_commit_batch_size,
+            commit_interval=settings.index_commit_interval,
+            lock_errors=(LockError,) if WHOOSH_AVAILABLE else (),
         )
 
+        # 共享搜索器按查询租借，索引提交后打开新的搜索器，旧的在最后一个查询结束后关闭
+        self._searchers = SearcherManager(lambda: self.ix.searcher())
+        self._generation = 0  # 本进程内的提交次数
+
+        # 单文档搜索结果缓存，索引提交后自动失效
+        self.result_cache = QueryResultCache(settings.search_result_cache_size)
+
+        # 全库搜索的排序结果集：(查询键, 代次) -> 结果集
+        self._ranked: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._ranked_lock = threading.Lock()
+
+        self.catalog = IndexCatalog(self.index_dir / "catalog.sqlite3")
+        self.text_store = TextStore(self.index_dir / "text")
+        self.trigrams = TrigramIndex(self.index_dir / "trigrams")
+
+        if settings.search_analyzer not in ANALYZERS:
+            raise ValueError(f"不支持的文本分析器: {settings.search_analyzer}")
+        self.cjk_bigrams = settings.search_analyzer == "cjk_bigram"
+
+        if settings.search_index_layout not in LAYOUTS:
+            raise ValueError(f"不支持的索引布局: {settings.search_index_layout}")
+        self.layout = settings.search_index_layout
+
+        # 索引结构版本、分析器和布局任一变化都需要重建索引
+        version = f"{SCHEMA_VERSION}:{settings.search_analyzer}"
+        if WHOOSH_AVAILABLE and self.layout == "bucket":
+            version += f":bucket{settings.search_index_buckets}"
+        elif WHOOSH_AVAILABLE and self.layout == "document":
+            version += ":document"
+        version_path = self.index_dir / "schema_version"
+        current_version = version_path.read_text().strip() if version_path.exists() else None
+
         if WHOOSH_AVAILABLE:
-            if not exists_in(str(self.index_dir)):
-                self.ix = create_in(str(self.index_dir), schema=self.schema)
+            if self.cjk_bigrams:
+                # 多个二元组组成的查询词按短语匹配，保证字符连续
+                content = TEXT(analyzer=cjk_bigram_analyzer(), multitoken_query="phrase")
             else:
-                self.ix = open_dir(str(self.index_dir))
+                content = TEXT(analyzer=StandardAnalyzer())
+
+            # 每页切分为相互重叠的段落分别索引，原文只保存在文本存储中
+            self.schema = Schema(
+                document_id=ID(stored=True, unique=True),
+                page_number=NUMERIC(stored=True, sortable=True),
+                passage_start=STORED(),
+                passage_end=STORED(),
+                content=content,
+            )
+
+            partitions_dir = self.index_dir / "partitions"
+            if self.layout == "single":
+                rebuild = not exists_in(str(self.index_dir)) or current_version != version
+                if rebuild:
+                    shutil.rmtree(partitions_dir, ignore_errors=True)
+                    self.ix = create_in(str(self.index_dir), schema=self.schema)
+                else:
+                    self.ix = open_dir(str(self.index_dir))
+            else:
+                # 按文档或哈希桶分区，删除和重建文档只涉及一个分区
+                rebuild = current_version != version
+                if rebuild:
+                    shutil.rmtree(partitions_dir, ignore_errors=True)
+                    # 清除单个索引布局留下的文件
+                    for path in self.index_dir.glob("*MAIN*"):
+                        path.unlink(missing_ok=True)
+                self.ix = PartitionedIndex(
+                    partitions_dir, self.schema, self.layout, settings.search_index_buckets
+                )
         else:
             self.ix = None
-            # 简单的内存存储作为后备方案
-            self._memory_index: Dict[str, List[Dict]] = {}
+            # 后备方案：保存在磁盘上的倒排索引
+            self.postings = PostingsIndex(self.index_dir / "postings")
+            rebuild = current_version != version
+            if rebuild:
+                self.postings.clear()
+
+        if rebuild:
+            # 重建空索引，来源文件仍然存在的文档在后台重新建立索引
+            records = self.catalog.list_documents()
+            self.catalog.clear()
+            self.text_store.clear()
+            self.trigrams.clear()
+            version_path.write_text(version)
+            self._requeue(records)
+
+        # 定期合并索引段，清除删除和重建文档留下的旧记录
+        self._closing = threading.Event()
+        self._optimized_commits = 0
+        self.last_optimized_at: Optional[str] = None
+        if WHOOSH_AVAILABLE and settings.index_optimize_interval > 0:
+            threading.Thread(
+                target=self._optimize_loop, name="index-optimizer", daemon=True
+            ).start()
+
+    def submit_index(self, document_id: str, pdf_path: str) -> IndexJob:
+        """把文档加入后台索引队列，立即返回任务
+
+        同一文档相同内容的索引任务尚未完成时，返回已有的任务
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        pdf_file = Path(pdf_path)
+        if not pdf_file.exists():
+            raise FileNotFoundError("文件不存在")
+
+        content_hash = get_file_hash(pdf_file)
+        return self._queue.submit(
+            IndexJob(document_id, "index", str(pdf_file), content_hash)
+        )
+
+    def reindex_all(self, force: bool = False) -> int:
+        """把目录中所有来源文件仍然存在的文档重新加入索引队列
+
+        Args:
+            force: 内容未变化的文档也重新索引
+
+        Returns:
+            加入队列的文档数
+        """
+        return self._requeue(self.catalog.list_documents(), force)
+
+    def _requeue(self, records: List[Dict[str, Any]], force: bool = False) -> int:
+        queued = 0
+        for record in records:
+            source_path = record.get("source_path")
+            if not source_path or not Path(source_path).exists():
+                continue
+            # 不使用目录中记录的哈希，否则来源文件修改后仍被判断为内容未变化；
+            # 哈希留到写入线程中计算，避免在调用线程中读取所有文件
+            self._queue.submit(IndexJob(record["document_id"], "index", source_path, force=force))
+            queued += 1
+        return queued
 
     def build_index(self, document_id: str, pdf_path: str) -> Dict[str, Any]:
-        """为PDF文档建立索引
+        """为PDF文档建立索引，等待所在批次提交后返回
 
         Args:
             document_id: 文档ID
@@ -80,67 +308,289 @@ class SearchService:
             包含索引状态和统计信息的字典
         """
         try:
-            pdf_file = Path(pdf_path)
-            if not pdf_file.exists():
-                return {"success": False, "error": "文件不存在"}
+            job = self.submit_index(document_id, pdf_path)
+        except FileNotFoundError:
+            return {"success": False, "error": "文件不存在"}
 
-            reader = PdfReader(str(pdf_path))
-            total_pages = len(reader.pages)
-            indexed_pages = 0
+        job.wait()
+        return job.to_result()
 
+    async def build_index_async(self, document_id: str, pdf_path: str) -> Dict[str, Any]:
+        """在线程中建立索引，不阻塞事件循环"""
+        return await asyncio.to_thread(self.build_index, document_id, pdf_path)
+
+    def get_index_status(self, document_id: str) -> Dict[str, Any]:
+        """获取文档最近一次索引任务的状态"""
+        job = self._queue.get_job(document_id)
+        if job is not None:
+            return job.to_dict()
+
+        info = self.get_index_info(document_id)
+        return {
+            "document_id": document_id,
+            "status": "completed" if info.get("indexed") else "not_indexed",
+            "indexed_pages": info.get("page_count", 0),
+        }
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """索引写入队列统计"""
+        return {**self._queue.stats(), "last_optimized_at": self.last_optimized_at}
+
+    def optimize_index(self) -> Dict[str, Any]:
+        """合并索引段并清除已删除的记录，在写入线程中独占执行"""
+        return self._queue.run_exclusive(self._optimize).result()
+
+    def _optimize(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        commits = self._queue.commits
+        purged = 0
+        if WHOOSH_AVAILABLE:
+            purged = self.ix.doc_count_all() - self.ix.doc_count()
+            self.ix.writer(timeout=settings.index_writer_lock_timeout).commit(optimize=True)
+            # 已删除的记录仍计入词频统计，清除后打分可能变化，刷新搜索器并让缓存失效
+            self._generation += 1
+        # 后备倒排索引按文档整体替换文件，没有需要清除的记录
+
+        self._optimized_commits = commits
+        self.last_optimized_at = datetime.now().isoformat()
+        return {
+            "optimized": WHOOSH_AVAILABLE,
+            "purged_entries": purged,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _optimize_loop(self) -> None:
+        """按 index_optimize_interval 定期合并，没有新提交也没有已删除记录时跳过"""
+        while not self._closing.wait(settings.index_optimize_interval):
+            if (
+                self._queue.commits == self._optimized_commits
+                and self.ix.doc_count_all() == self.ix.doc_count()
+            ):
+                continue
+            try:
+                self.optimize_index()
+            except Exception as e:
+                print(f"合并索引失败: {e}")
+
+    def export_snapshot(self, target: Optional[Path] = None) -> Dict[str, Any]:
+        """导出索引快照，导出期间暂停写入
+
+        Args:
+            target: 快照文件路径，默认保存到 search_snapshot_dir 下并以时间命名
+        """
+        if target is None:
+            name = f"search-index-{datetime.now():%Y%m%d-%H%M%S}.tar.gz"
+            target = Path(settings.search_snapshot_dir) / name
+        return self._queue.run_exclusive(
+            lambda: index_snapshot.export_snapshot(self.index_dir, Path(target))
+        ).result()
+
+    def warm_up(self) -> Dict[str, Any]:
+        """预热索引，使服务启动后的第一个查询和之后的查询一样快
+
+        打开共享搜索器，查询高频词以加载各索引段的倒排表、页码列和存储字段，
+        并把最近索引的文档读入倒排表和文本存储的内存缓存。
+        """
+        started = time.perf_counter()
+        terms = 0
+        documents = 0
+        try:
             if WHOOSH_AVAILABLE:
-                writer = self.ix.writer()
-
-                for page_num, page in enumerate(reader.pages):
-                    try:
-                        # 提取页面文本
-                        text = page.extract_text() or ""
-
-                        # 限制文本长度
-                        if len(text) > 10000:
-                            text = text[:10000]
-
-                        if text.strip():
-                            writer.add_document(
-                                document_id=document_id,
-                                page_number=page_num + 1,
-                                content=text,
-                                text_stored=text,
-                            )
-                            indexed_pages += 1
-                    except Exception as e:
-                        print(f"索引页面 {page_num + 1} 失败: {e}")
-                        continue
-
-                writer.commit()
+                with self._lease_searcher() as searcher:
+                    reader = searcher.reader()
+                    frequent = reader.most_frequent_terms("content", number=WARM_UP_TERMS)
+                    for _, text in frequent:
+                        hits = searcher.search(
+                            Term("content", text), limit=10, collapse=FieldFacet("page_number")
+                        )
+                        for hit in hits:
+                            hit.fields()
+                        terms += 1
+
+            records = sorted(
+                self.catalog.list_documents(), key=lambda r: r["indexed_at"], reverse=True
+            )
+            for record in records[:self.text_store.cache_documents]:
+                if not WHOOSH_AVAILABLE:
+                    self.postings.get(record["document_id"])
+                self.text_store.get_pages(record["document_id"])
+                documents += 1
+        except Exception as e:
+            print(f"预热索引失败: {e}")
+
+        return {
+            "terms": terms,
+            "documents": documents,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    # 以下方法只在后台写入线程中调用
+
+    def begin_batch(self) -> _IndexBatch:
+        """开始一批写入"""
+        if not WHOOSH_AVAILABLE:
+            return _IndexBatch()
+        # 其他进程持有写锁时最多等待 index_writer_lock_timeout 秒，
+        # 仍未取得时抛出 LockError，由写入队列退避后重试
+        return _IndexBatch(self.ix.writer(timeout=settings.index_writer_lock_timeout))
+
+    def apply_job(self, batch: _IndexBatch, job: IndexJob) -> bool:
+        """执行一个索引任务，写入在提交前不可见
+
+        未指定内容哈希时（重新索引）在此计算。文档已按相同内容哈希索引过时直接跳过；
+        内容变化时在同一批次中先删除旧的页面再写入新页面，提交后一次性替换。
+
+        Returns:
+            是否有需要提交的写入
+        """
+        if job.action == "delete":
+            if WHOOSH_AVAILABLE:
+                batch.writer.delete_by_term("document_id", job.document_id)
             else:
-                # 后备方案：使用简单内存索引
-                self._memory_index[document_id] = []
-                for page_num, page in enumerate(reader.pages):
-                    try:
-                        text = page.extract_text() or ""
-                        if text.strip():
-                            self._memory_index[document_id].append({
-                                "page_number": page_num + 1,
-                                "content": text,
-                            })
-                            indexed_pages += 1
-                    except Exception as e:
-                        print(f"索引页面 {page_num + 1} 失败: {e}")
-                        continue
+                batch.postings[job.document_id] = None
+            batch.texts[job.document_id] = None
+            batch.trigrams[job.document_id] = None
+            batch.deletes.append(job.document_id)
+            return True
 
-            return {
-                "success": True,
-                "total_pages": total_pages,
-                "indexed_pages": indexed_pages,
-                "document_id": document_id,
-            }
+        if job.content_hash is None:
+            job.content_hash = get_file_hash(Path(job.pdf_path))
 
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-            }
+        record = self.catalog.get(job.document_id)
+        if (
+            not job.force
+            and record is not None
+            and record["content_hash"] == job.content_hash
+            and self.trigrams.contains(job.document_id)
+            and (WHOOSH_AVAILABLE or self.postings.contains(job.document_id))
+        ):
+            job.skipped = True
+            job.total_pages = record["total_pages"]
+            job.indexed_pages = record["indexed_pages"]
+            return False
+
+        started = time.perf_counter()
+        pdf_file = Path(job.pdf_path)
+        with open_pdf(pdf_file) as reader:
+            job.total_pages = len(reader.pages)
+
+        # 先完整提取再写入：Whoosh 无法撤销本批次中已添加的文档，边提取边写入时
+        # 中途失败会提交半个文档。文本存储和三元组索引在提交时本来就需要整个文档，
+        # 因此峰值内存为一个文档的全部页面文本和单词边界框
+        texts = list(self._extract_pages(pdf_file, job.total_pages))
+
+        if WHOOSH_AVAILABLE:
+            batch.writer.delete_by_term("document_id", job.document_id)
+            for page_num, text, _ in texts:
+                if not text.strip():
+                    continue
+                for start, end in split_passages(
+                    text, settings.search_passage_size, settings.search_passage_overlap
+                ):
+                    batch.writer.add_document(
+                        document_id=job.document_id,
+                        page_number=page_num + 1,
+                        passage_start=start,
+                        passage_end=end,
+                        content=text[start:end],
+                    )
+                job.indexed_pages += 1
+        else:
+            batch.postings[job.document_id] = build_postings(
+                [text for _, text, _ in texts], self.cjk_bigrams
+            )
+            job.indexed_pages = sum(1 for _, text, _ in texts if text.strip())
+
+        batch.texts[job.document_id] = (
+            [text for _, text, _ in texts],
+            [boxes for _, _, boxes in texts],
+        )
+        batch.trigrams[job.document_id] = build_trigrams([text for _, text, _ in texts])
+
+        job.elapsed = time.perf_counter() - started
+        batch.upserts.append({
+            "document_id": job.document_id,
+            "content_hash": job.content_hash,
+            "total_pages": job.total_pages,
+            "indexed_pages": job.indexed_pages,
+            "source_path": job.pdf_path,
+            "char_count": sum(len(text) for _, text, _ in texts),
+            "build_seconds": round(job.elapsed, 3),
+        })
+        return True
+
+    def commit_batch(self, batch: _IndexBatch) -> None:
+        """提交一批写入，之后的搜索可见"""
+        if WHOOSH_AVAILABLE:
+            batch.writer.commit()
+        else:
+            for document_id, postings in batch.postings.items():
+                if postings is None:
+                    self.postings.delete(document_id)
+                else:
+                    self.postings.put(document_id, postings)
+
+        for document_id, stored in batch.texts.items():
+            if stored is None:
+                self.text_store.delete(document_id)
+            else:
+                self.text_store.put(document_id, *stored)
+        for document_id, trigrams in batch.trigrams.items():
+            if trigrams is None:
+                self.trigrams.delete(document_id)
+            else:
+                self.trigrams.put(document_id, trigrams)
+        self._generation += 1
+        self.catalog.apply(batch.upserts, batch.deletes)
+
+    def cancel_batch(self, batch: _IndexBatch) -> None:
+        """放弃一批写入"""
+        if WHOOSH_AVAILABLE:
+            batch.writer.cancel()
+
+    def _extract_pages(self, pdf_file: Path, total_pages: int):
+        """按页码范围把文本提取分派到工作进程，按页序逐页产出 (页码, 文本, 单词边界框)
+
+        所有范围一次性提交到进程池并行提取，调用方按页序取得结果
+        """
+        pages_per_task = max(
+            1, min(settings.index_pages_per_task, -(-total_pages // get_worker_count()))
+        )
+        pool = get_worker_pool()
+        futures = [
+            (start, pool.submit(extract_pages, str(pdf_file), start, start + pages_per_task))
+            for start in range(0, total_pages, pages_per_task)
+        ]
+
+        try:
+            for start, future in futures:
+                for offset, (text, boxes) in enumerate(future.result()):
+                    yield start + offset, text, boxes
+        finally:
+            for _, future in futures:
+                future.cancel()
+
+    def _lease_searcher(self):
+        """借用当前代次的共享搜索器，用法：with self._lease_searcher() as searcher"""
+        return self._searchers.lease(self._generation)
+
+    def _document_searcher(self, document_id: str):
+        """单文档搜索的搜索器，用法同 _lease_searcher
+
+        document 布局下只打开该文档的分区，不经过合并所有分区的共享搜索器
+        """
+        if self.layout == "document":
+            return self.ix.searcher(document_id=document_id)
+        return self._lease_searcher()
+
+    def close(self) -> None:
+        """提交队列中剩余的写入并关闭共享搜索器"""
+        self._closing.set()
+        self._queue.close()
+        self._searchers.close()
+        if isinstance(self.ix, PartitionedIndex):
+            self.ix.close()
+        self.catalog.close()
 
     def search(
         self, document_id: str, query: str, options: SearchOptions
@@ -155,176 +605,587 @@ class SearchService:
         Returns:
             搜索结果列表
         """
-        if WHOOSH_AVAILABLE:
-            return self._search_whoosh(document_id, query, options)
+        generation = self._generation
+        key = self._cache_key(document_id, query, options)
+        cached = self.result_cache.get(key, generation)
+        if cached is not None:
+            return list(cached)
+
+        if options.regex:
+            results = self._search_regex(document_id, query, options)
+        elif WHOOSH_AVAILABLE:
+            try:
+                results = self._search_whoosh(document_id, query, options)
+            except Exception as e:
+                # 失败的搜索不写入缓存，否则在下次提交前会一直返回空结果
+                print(f"Whoosh搜索失败: {e}")
+                return []
         else:
-            return self._search_simple(document_id, query, options)
+            results = self._search_simple(document_id, query, options)
+
+        # 以搜索开始时的代次写入，期间发生的提交会让这条结果在下次读取时失效
+        self.result_cache.put(key, generation, results)
+        return list(results)
+
+    @staticmethod
+    def _cache_key(document_id: str, query: str, options: SearchOptions) -> tuple:
+        """结果缓存键：合并空白，不区分大小写的查询再统一转为小写"""
+        normalized = query.strip() if options.regex else " ".join(query.split())
+        if not options.case_sensitive and not options.regex:
+            normalized = normalized.lower()
+        return (
+            document_id,
+            normalized,
+            options.case_sensitive,
+            options.whole_word,
+            options.regex,
+            options.page_limit,
+        )
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """搜索结果缓存和索引写入队列统计"""
+        return {
+            "generation": self._generation,
+            "result_cache": self.result_cache.stats(),
+            "index_queue": self.get_queue_stats(),
+        }
 
     def _search_whoosh(
         self, document_id: str, query: str, options: SearchOptions
     ) -> List[SearchResult]:
-        """使用Whoosh进行搜索"""
+        """使用Whoosh进行搜索，失败时抛出异常，由 search() 处理"""
         results = []
+        content_query = self._parse_query(query, options)
+        # 查询词不必相邻，按每个词分别匹配再取并集
+        pattern = self._query_pattern(content_query, query, options)
 
-        try:
-            with self.ix.searcher() as searcher:
-                # 构建查询
-                if options.regex:
-                    # 正则表达式查询
-                    parser = QueryParser("content", self.ix.schema)
-                    q = parser.parse(query)
-                elif options.whole_word:
-                    # 全词匹配
-                    parser = QueryParser("content", self.ix.schema)
-                    terms = query.strip().split()
-                    if len(terms) == 1:
-                        q = parser.parse(f'"{query}"')
-                    else:
-                        q = parser.parse(" AND ".join([f'"{t}"' for t in terms]))
-                else:
-                    # 默认：OR查询，匹配任意词
-                    parser = QueryParser(
-                        "content", self.ix.schema, group=OrGroup
-                    )
-                    q = parser.parse(query)
-
-                # 执行搜索
-                hits = searcher.search(q, limit=options.page_limit * 10)
-
-                # 过滤特定文档的结果
-                for hit in hits:
-                    if hit["document_id"] == document_id:
-                        text = hit.get("text_stored", "")
-                        highlights = self._extract_highlights(text, query, options)
-
-                        results.append(
-                            SearchResult(
-                                page_index=hit["page_number"] - 1,
-                                text=text[:500] + "..." if len(text) > 500 else text,
-                                position={"page": hit["page_number"]},
-                                highlights=highlights,
-                            )
-                        )
+        # 文档限定条件放在查询内部，与正文查询求交集，
+        # 只遍历该文档的倒排记录，不再对整个索引打分后再过滤
+        q = And([Term("document_id", document_id), content_query])
 
-                        if len(results) >= options.page_limit:
-                            break
+        with self._document_searcher(document_id) as searcher:
+            # 执行搜索，每页只保留得分最高的段落
+            hits = searcher.search(
+                q,
+                limit=options.page_limit,
+                collapse=FieldFacet("page_number"),
+            )
 
-        except Exception as e:
-            print(f"Whoosh搜索失败: {e}")
+            for hit in hits:
+                page_number = hit["page_number"]
+                page_text = self.text_store.get_page(document_id, page_number)
+                text = page_text[hit["passage_start"]:hit["passage_end"]]
+                spans = self._pattern_spans(pattern, page_text, self.cjk_bigrams)
+
+                results.append(
+                    SearchResult(
+                        page_index=page_number - 1,
+                        text=text[:500] + "..." if len(text) > 500 else text,
+                        position={
+                            "page": page_number,
+                            "start": hit["passage_start"],
+                            "end": hit["passage_end"],
+                            "matches": self._match_positions(document_id, page_number, spans),
+                        },
+                        highlights=self._highlights_from_spans(page_text, spans),
+                    )
+                )
 
         return results
 
+    def _parse_query(self, query: str, options: SearchOptions):
+        """构建 Whoosh 查询"""
+        if options.whole_word:
+            # 全词匹配
+            parser = QueryParser("content", self.ix.schema)
+            terms = query.strip().split()
+            if len(terms) == 1:
+                return parser.parse(f'"{query}"')
+            return parser.parse(" AND ".join([f'"{t}"' for t in terms]))
+
+        # 默认：OR查询，匹配任意词
+        parser = QueryParser(
+            "content", self.ix.schema, group=OrGroup
+        )
+        return parser.parse(query)
+
+    def search_corpus(
+        self,
+        query: str,
+        options: SearchOptions,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Dict[str, Any]:
+        """在所有已索引文档中搜索，按 BM25 排序并分页
+
+        第一次查询时计算完整排序结果（最多 search_corpus_max_hits 页）并缓存，
+        后续翻页直接从缓存切片，不再重新计算前 N 条。结果按（得分降序、文档ID、页码）
+        排序，游标记录结果集的代次和上一页最后一条的排序键：结果集仍在缓存中时按原快照翻页；
+        已被淘汰时按当前索引重新排序，从排序键之后继续，不会重复或跳过排在它之前的结果。
+
+        facets 为每个文档命中的页数，统计全部匹配结果，不受 search_corpus_max_hits 限制；
+        total 为可翻页的结果数，truncated 表示匹配的页数超出了这一限制。
+
+        Returns:
+            {"query", "total", "truncated", "generation", "facets": [{"document_id", "hits"}],
+             "results": [...], "next_cursor"}
+
+        Raises:
+            ValueError: 游标无效或与查询不匹配，或使用了正则表达式
+        """
+        if options.regex:
+            raise ValueError("全库搜索不支持正则表达式")
+
+        query_key = hashlib.sha1(json.dumps(
+            [" ".join(query.split()), options.case_sensitive, options.whole_word],
+            ensure_ascii=False,
+        ).encode("utf-8")).hexdigest()[:16]
+
+        after = None
+        generation = self._generation
+        if cursor:
+            state = self._decode_cursor(cursor)
+            if state.get("q") != query_key:
+                raise ValueError("游标与查询不匹配")
+            after = tuple(state["a"])
+            generation = state["g"]
+
+        ranked = self._get_ranked(query_key, generation, query, options)
+        if ranked is None:
+            # 快照已被淘汰，按当前索引重新计算，从游标的排序键之后继续
+            generation = self._generation
+            ranked = self._get_ranked(query_key, generation, query, options, compute=True)
+
+        hits = ranked["hits"]
+        offset = bisect_right(hits, after, key=self._rank_key) if after else 0
+        page = hits[offset:offset + limit]
+
+        # 高亮查询中的任意词
+        terms = [re.escape(term) for term, _ in tokenize(query, self.cjk_bigrams)]
+        pattern = re.compile(
+            "|".join(terms) or "(?!)", 0 if options.case_sensitive else re.IGNORECASE
+        )
+
+        results = []
+        for document_id, page_number, score, start, end in page:
+            page_text = self.text_store.get_page(document_id, page_number)
+            text = page_text[start:end] if end else page_text
+            spans = self._pattern_spans(pattern, page_text, self.cjk_bigrams)
+            results.append({
+                "document_id": document_id,
+                "page_index": page_number - 1,
+                "score": round(score, 4),
+                "text": text[:500] + "..." if len(text) > 500 else text,
+                "position": {
+                    "page": page_number,
+                    "matches": self._match_positions(document_id, page_number, spans),
+                },
+                "highlights": self._highlights_from_spans(page_text, spans),
+            })
+
+        next_cursor = None
+        if offset + len(page) < len(hits):
+            next_cursor = self._encode_cursor(
+                {"q": query_key, "g": generation, "a": list(self._rank_key(page[-1]))}
+            )
+
+        return {
+            "query": query,
+            "total": len(hits),
+            "truncated": ranked["truncated"],
+            "generation": generation,
+            "facets": ranked["facets"],
+            "results": results,
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def _rank_key(hit: tuple) -> tuple:
+        """排序键：得分降序，得分相同时按文档ID和页码，重新排序后顺序仍然确定"""
+        document_id, page_number, score = hit[:3]
+        return (-score, document_id, page_number)
+
+    def _get_ranked(
+        self,
+        query_key: str,
+        generation: int,
+        query: str,
+        options: SearchOptions,
+        compute: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """获取缓存的排序结果集；当前代次的结果集不存在时计算"""
+        key = (query_key, generation)
+        with self._ranked_lock:
+            ranked = self._ranked.get(key)
+            if ranked is not None:
+                self._ranked.move_to_end(key)
+                return ranked
+
+        if generation != self._generation and not compute:
+            return None
+
+        if WHOOSH_AVAILABLE:
+            hits, facets = self._rank_whoosh(query, options)
+        else:
+            hits, facets = self._rank_postings(query, options)
+
+        hits.sort(key=self._rank_key)
+        ranked = {
+            "hits": hits,
+            "truncated": sum(facets.values()) > len(hits),
+            "facets": [
+                {"document_id": document_id, "hits": count}
+                for document_id, count in sorted(facets.items(), key=lambda item: -item[1])
+            ],
+        }
+
+        with self._ranked_lock:
+            self._ranked[key] = ranked
+            while len(self._ranked) > settings.search_ranked_cache_size:
+                self._ranked.popitem(last=False)
+        return ranked
+
+    def _rank_whoosh(
+        self, query: str, options: SearchOptions
+    ) -> Tuple[List[tuple], Dict[str, int]]:
+        """Whoosh 默认的 BM25F 打分，每页只保留得分最高的段落
+
+        Returns:
+            (排序结果, 文档ID -> 全部匹配结果中命中的页数)
+        """
+        ranked = []
+        seen = set()
+        with self._lease_searcher() as searcher:
+            # 按（文档、页码）分组统计所有匹配的段落，不只是排在前面的
+            hits = searcher.search(
+                self._parse_query(query, options),
+                limit=settings.search_corpus_max_hits,
+                groupedby={"pages": MultiFacet(["document_id", "page_number"])},
+                maptype=Count,
+            )
+            facets: Dict[str, int] = {}
+            for document_id, _ in hits.groups("pages"):
+                facets[document_id] = facets.get(document_id, 0) + 1
+
+            for hit in hits:
+                # 分组统计时 Whoosh 对所有匹配结果排序，不再按 limit 截断
+                if len(ranked) >= settings.search_corpus_max_hits:
+                    break
+                key = (hit["document_id"], hit["page_number"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                ranked.append((*key, hit.score, hit["passage_start"], hit["passage_end"]))
+        return ranked, facets
+
+    def _rank_postings(
+        self, query: str, options: SearchOptions
+    ) -> Tuple[List[tuple], Dict[str, int]]:
+        """后备方案：以页面为单位的 BM25 打分
+
+        倒排表中没有页面长度，省略长度归一化（b=0）
+
+        Returns:
+            (排序结果, 文档ID -> 全部匹配结果中命中的页数)
+        """
+        terms = list(dict.fromkeys(term for term, _ in tokenize(query, self.cjk_bigrams)))
+        if not terms:
+            return [], {}
+
+        k1 = 1.2
+        total_pages = 0
+        document_frequency = {term: 0 for term in terms}
+        page_tf: Dict[tuple, Dict[str, int]] = {}
+
+        for record in self.catalog.list_documents():
+            document_id = record["document_id"]
+            total_pages += record["indexed_pages"]
+            postings = self.postings.get(document_id)
+            if postings is None:
+                continue
+            for term in terms:
+                entry = postings.get(term)
+                if entry is None:
+                    continue
+                pages = set()
+                for i in range(0, len(entry), 2):
+                    tf = page_tf.setdefault((document_id, entry[i]), {})
+                    tf[term] = tf.get(term, 0) + 1
+                    pages.add(entry[i])
+                document_frequency[term] += len(pages)
+
+        scored = []
+        facets: Dict[str, int] = {}
+        for (document_id, page_number), tf in page_tf.items():
+            if options.whole_word and len(tf) < len(terms):
+                continue
+            facets[document_id] = facets.get(document_id, 0) + 1
+            score = 0.0
+            for term, count in tf.items():
+                df = document_frequency[term]
+                idf = math.log(1 + (total_pages - df + 0.5) / (df + 0.5))
+                score += idf * count * (k1 + 1) / (count + k1)
+            scored.append((document_id, page_number, score, 0, 0))
+
+        scored.sort(key=self._rank_key)
+        return scored[:settings.search_corpus_max_hits], facets
+
+    @staticmethod
+    def _encode_cursor(state: Dict[str, Any]) -> str:
+        raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Dict[str, Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            state = json.loads(raw)
+            if not isinstance(state, dict):
+                raise ValueError
+            generation, after = state.get("g"), state.get("a")
+            if not (
+                isinstance(generation, int) and generation >= 0
+                and isinstance(after, list) and len(after) == 3
+                and isinstance(after[0], (int, float))
+                and isinstance(after[1], str)
+                and isinstance(after[2], int)
+            ):
+                raise ValueError
+            return state
+        except ValueError:
+            raise ValueError("游标无效")
+
     def _search_simple(
         self, document_id: str, query: str, options: SearchOptions
     ) -> List[SearchResult]:
-        """简单搜索（无Whoosh时的后备方案）"""
+        """倒排索引搜索（无Whoosh时的后备方案）
+
+        普通查询按词元从倒排表取得命中页面和位置，按命中次数排序；
+        全词匹配先取包含所有词元的页面，再用正则表达式校验。
+        """
         results = []
 
-        if document_id not in self._memory_index:
+        pages = self.text_store.get_pages(document_id)
+        if pages is None:
             return results
 
-        pages = self._memory_index[document_id]
+        pattern = self._build_pattern(query, options)
+        matched = []  # (命中次数, 页码, 命中范围)
 
-        # 准备查询模式
-        if options.regex:
-            pattern = re.compile(query)
-        elif options.whole_word:
-            pattern = re.compile(rf"\b{re.escape(query)}\b")
-        else:
-            if options.case_sensitive:
-                pattern = re.compile(re.escape(query))
+        terms = [term for term, _ in tokenize(query, self.cjk_bigrams)]
+        hits = self.postings.lookup(document_id, terms, require_all=options.whole_word)
+
+        for page_number in sorted(hits):
+            text = pages[page_number - 1]
+            if options.whole_word:
+                spans = self._pattern_spans(pattern, text)
             else:
-                pattern = re.compile(re.escape(query), re.IGNORECASE)
+                spans = [
+                    (offset, self._term_end(text, offset, terms))
+                    for offset in dict.fromkeys(hits[page_number])
+                ]
+                if options.case_sensitive:
+                    originals = {token for token, _, _ in iter_tokens(query, self.cjk_bigrams)}
+                    spans = [(start, end) for start, end in spans if text[start:end] in originals]
+            if spans:
+                matched.append((len(spans), page_number, spans))
 
-        for page_data in pages:
-            content = page_data["content"]
-            matches = list(pattern.finditer(content))
+        if not options.whole_word:
+            matched.sort(key=lambda item: (-item[0], item[1]))
 
-            if matches:
-                highlights = self._extract_highlights(content, query, options)
-                results.append(
-                    SearchResult(
-                        page_index=page_data["page_number"] - 1,
-                        text=content[:500] + "..." if len(content) > 500 else content,
-                        position={"page": page_data["page_number"]},
-                        highlights=highlights,
-                    )
+        for _, page_number, spans in matched[:options.page_limit]:
+            content = pages[page_number - 1]
+            results.append(
+                SearchResult(
+                    page_index=page_number - 1,
+                    text=content[:500] + "..." if len(content) > 500 else content,
+                    position={
+                        "page": page_number,
+                        "matches": self._match_positions(document_id, page_number, spans),
+                    },
+                    highlights=self._highlights_from_spans(content, spans),
                 )
-
-                if len(results) >= options.page_limit:
-                    break
+            )
 
         return results
 
-    def _extract_highlights(
-        self, text: str, query: str, options: SearchOptions
-    ) -> List[str]:
-        """提取高亮片段"""
-        highlights = []
-        context_size = 30
+    def _search_regex(
+        self, document_id: str, query: str, options: SearchOptions
+    ) -> List[SearchResult]:
+        """正则表达式搜索
+
+        先用三元组索引找出可能匹配的页面，只对这些页面执行正则匹配；
+        正则表达式中没有可用的字面量时才逐页匹配
+        """
+        results = []
+
+        try:
+            pattern = self._build_pattern(query, options)
+            candidates = self.trigrams.candidates(document_id, query)
+        except re.error as e:
+            print(f"正则表达式无效: {e}")
+            return results
+
+        pages = self.text_store.get_pages(document_id)
+        if pages is None:
+            return results
+
+        if candidates is None:
+            candidates = range(1, len(pages) + 1)
+
+        for page_number in sorted(candidates):
+            if not 0 < page_number <= len(pages):
+                continue
+            content = pages[page_number - 1]
+            spans = self._pattern_spans(pattern, content)
+            if not spans:
+                continue
 
-        # 准备搜索模式
+            results.append(
+                SearchResult(
+                    page_index=page_number - 1,
+                    text=content[:500] + "..." if len(content) > 500 else content,
+                    position={
+                        "page": page_number,
+                        "matches": self._match_positions(document_id, page_number, spans),
+                    },
+                    highlights=self._highlights_from_spans(content, spans),
+                )
+            )
+
+            if len(results) >= options.page_limit:
+                break
+
+        return results
+
+    @staticmethod
+    def _build_pattern(query: str, options: SearchOptions) -> "re.Pattern":
+        """根据搜索选项构建匹配用的正则表达式"""
         if options.regex:
-            pattern = re.compile(query)
-        elif options.whole_word:
-            pattern = re.compile(rf"\b{re.escape(query)}\b")
-        else:
-            if options.case_sensitive:
-                pattern = re.compile(re.escape(query))
-            else:
-                pattern = re.compile(re.escape(query), re.IGNORECASE)
+            return re.compile(query)
+        if options.whole_word:
+            return re.compile(rf"\b{re.escape(query)}\b")
+        if options.case_sensitive:
+            return re.compile(re.escape(query))
+        return re.compile(re.escape(query), re.IGNORECASE)
+
+    def _term_end(self, text: str, offset: int, terms: List[str]) -> int:
+        """offset 处命中的最长查询词的结束偏移（同一位置可能同时命中单字和二元组）"""
+        ends = [
+            offset + len(term) for term in terms
+            if text[offset:offset + len(term)].lower() == term
+        ]
+        return max(ends) if ends else token_end(text, offset, self.cjk_bigrams)
+
+    def _query_pattern(self, q, query: str, options: SearchOptions) -> "re.Pattern":
+        """由解析后的 Whoosh 查询中 content 字段的各个词构建匹配用的正则表达式
+
+        区分大小写时使用查询原文中对应的词元；没有可用的词时按整个查询匹配。
+        """
+        terms = {text for fieldname, text in q.all_terms() if fieldname == "content"}
+        if options.case_sensitive:
+            terms = {
+                token for token, _, _ in iter_tokens(query, self.cjk_bigrams)
+                if token.lower() in terms
+            }
+        if not terms:
+            return self._build_pattern(query, options)
 
-        for match in pattern.finditer(text):
-            start = max(0, match.start() - context_size)
-            end = min(len(text), match.end() + context_size)
-            highlight = text[start:end]
-            highlights.append(highlight)
+        alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+        if options.whole_word:
+            alternatives = rf"\b(?:{alternatives})\b"
+        return re.compile(alternatives, 0 if options.case_sensitive else re.IGNORECASE)
+
+    def _match_positions(
+        self, document_id: str, page_number: int, spans: List[Tuple[int, int]]
+    ) -> List[Dict[str, Any]]:
+        """计算每个匹配范围对应的矩形（最多 MAX_MATCH_POSITIONS 个）"""
+        boxes = self.text_store.get_boxes(document_id, page_number)
+        return [
+            {
+                "start": start,
+                "end": end,
+                "rects": match_rects(boxes, start, end) if boxes else [],
+            }
+            for start, end in spans[:MAX_MATCH_POSITIONS]
+        ]
 
-            if len(highlights) >= 3:
+    @staticmethod
+    def _pattern_spans(
+        pattern: "re.Pattern", text: str, overlapping: bool = False
+    ) -> List[Tuple[int, int]]:
+        """正则表达式在文本中的非空匹配范围
+
+        overlapping 为 True 时从每个匹配的下一个字符继续查找，相互重叠的匹配合并为一个范围。
+        查询词为相互重叠的 CJK 二元组时使用，否则“增值税”只能匹配到“增值”。
+        """
+        if not overlapping:
+            return [m.span() for m in pattern.finditer(text) if m.end() > m.start()]
+
+        spans: List[Tuple[int, int]] = []
+        pos = 0
+        while pos <= len(text):
+            match = pattern.search(text, pos)
+            if match is None:
                 break
+            start, end = match.span()
+            pos = start + 1
+            if end == start:
+                continue
+            if spans and start < spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+            else:
+                spans.append((start, end))
+        return spans
 
-        return highlights
+    @staticmethod
+    def _highlights_from_spans(
+        text: str, spans: List[Tuple[int, int]], context_size: int = 30
+    ) -> List[str]:
+        """取前三个匹配范围及其上下文作为高亮片段"""
+        return [
+            text[max(0, start - context_size):min(len(text), end + context_size)]
+            for start, end in spans[:3]
+        ]
+
+    def _extract_highlights(
+        self, text: str, query: str, options: SearchOptions
+    ) -> List[str]:
+        """提取高亮片段"""
+        pattern = self._build_pattern(query, options)
+        return self._highlights_from_spans(text, self._pattern_spans(pattern, text))
 
     def highlight_results(self, results: List[SearchResult]) -> List[SearchResult]:
         """高亮显示结果中的匹配文本"""
         return results
 
     def delete_index(self, document_id: str) -> bool:
-        """删除文档的索引"""
-        try:
-            if WHOOSH_AVAILABLE:
-                writer = self.ix.writer()
-                writer.delete_by_term("document_id", document_id)
-                writer.commit()
-            else:
-                if document_id in self._memory_index:
-                    del self._memory_index[document_id]
-            return True
-        except Exception as e:
-            print(f"删除索引失败: {e}")
-            return False
+        """删除文档的索引，等待所在批次提交后返回"""
+        job = self._queue.submit(IndexJob(document_id, "delete"))
+        job.wait()
+        if job.error:
+            print(f"删除索引失败: {job.error}")
+        return job.status == IndexJobStatus.COMPLETED
 
     def get_index_info(self, document_id: str) -> Dict[str, Any]:
-        """获取索引信息"""
+        """获取索引信息
+
+        直接读取提交时写入目录的统计，不访问索引本身，与索引规模无关
+        """
         try:
-            if WHOOSH_AVAILABLE:
-                with self.ix.searcher() as searcher:
-                    # 查询文档是否存在
-                    q = QueryParser("document_id", self.ix.schema).parse(document_id)
-                    hits = searcher.search(q, limit=1)
-                    if hits:
-                        return {
-                            "indexed": True,
-                            "page_count": len(list(searcher.search(q))),
-                        }
-            else:
-                if document_id in self._memory_index:
-                    return {
-                        "indexed": True,
-                        "page_count": len(self._memory_index[document_id]),
-                    }
+            record = self.catalog.get(document_id)
+            if record is None:
+                return {"indexed": False, "page_count": 0}
 
-            return {"indexed": False, "page_count": 0}
+            return {
+                "indexed": True,
+                "page_count": record["indexed_pages"],
+                "total_pages": record["total_pages"],
+                "char_count": record["char_count"],
+                "build_seconds": record["build_seconds"],
+                "content_hash": record["content_hash"],
+                "indexed_at": record["indexed_at"],
+            }
 
         except Exception as e:
             return {"indexed": False, "page_count": 0, "error": str(e)}
@@ -0,0 +1,68 @@
+# Searcher Lease
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+import threading
+
+
+class _Entry:
+    def __init__(self, searcher: Any, generation: int):
+        self.searcher = searcher
+        self.generation = generation
+        self.refs = 0
+        self.retired = False
+
+
+class SearcherManager:
+    """共享搜索器的租借管理
+
+    每次查询通过 lease() 借用当前代次的搜索器，结束时归还。
+    索引提交后为新代次打开新的搜索器，不使用 refresh()（它会关闭旧搜索器的段读取器）；
+    旧搜索器标记为退役，等最后一个仍在使用它的查询归还后才关闭。
+    """
+
+    def __init__(self, open_searcher: Callable[[], Any]):
+        self._open = open_searcher
+        self._current: Optional[_Entry] = None
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.closed = 0
+
+    @contextmanager
+    def lease(self, generation: int) -> Iterator[Any]:
+        """借用 generation 代次的搜索器"""
+        with self._lock:
+            entry = self._current
+            if entry is None or entry.generation != generation:
+                entry = _Entry(self._open(), generation)
+                self.opened += 1
+                if self._current is not None:
+                    self._retire(self._current)
+                self._current = entry
+            entry.refs += 1
+
+        try:
+            yield entry.searcher
+        finally:
+            with self._lock:
+                entry.refs -= 1
+                if entry.retired and entry.refs == 0:
+                    self._close(entry)
+
+    def _retire(self, entry: _Entry) -> None:
+        """标记退役，没有查询在使用时立即关闭（调用方需持有锁）"""
+        entry.retired = True
+        if entry.refs == 0:
+            self._close(entry)
+
+    def _close(self, entry: _Entry) -> None:
+        try:
+            entry.searcher.close()
+        finally:
+            self.closed += 1
+
+    def close(self) -> None:
+        """退役当前搜索器，仍在进行的查询结束后关闭"""
+        with self._lock:
+            if self._current is not None:
+                self._retire(self._current)
+                self._current = None
@@ -0,0 +1,98 @@
+# Text Store
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import shutil
+import threading
+import zlib
+
+
+class TextStore:
+    """文档页面文本存储
+
+    每个文档一个 zlib 压缩的文件，按页保存完整文本和单词边界框数组，
+    用于生成搜索摘要、高亮和命中位置，索引本身不再保存原文。
+    最近读取的文档解压后缓存在内存中。
+    """
+
+    def __init__(self, root: Path, cache_documents: int = 32):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_documents = cache_documents
+        self._cache: "OrderedDict[str, Dict[str, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, document_id: str) -> Path:
+        name = hashlib.sha1(document_id.encode("utf-8")).hexdigest()
+        return self.root / f"{name}.z"
+
+    def put(
+        self, document_id: str, pages: List[str], boxes: Optional[List[List[int]]] = None
+    ) -> None:
+        """保存文档各页文本和单词边界框（下标为页码减一），原子替换旧文件"""
+        path = self._path(document_id)
+        tmp_path = path.with_suffix(".tmp")
+        data = {"pages": pages, "boxes": boxes or [[] for _ in pages]}
+        tmp_path.write_bytes(
+            zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        )
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._cache.pop(document_id, None)
+
+    def _load(self, document_id: str) -> Optional[Dict[str, list]]:
+        with self._lock:
+            data = self._cache.get(document_id)
+            if data is not None:
+                self._cache.move_to_end(document_id)
+                return data
+
+        try:
+            raw = self._path(document_id).read_bytes()
+        except FileNotFoundError:
+            return None
+        data = json.loads(zlib.decompress(raw).decode("utf-8"))
+
+        with self._lock:
+            self._cache[document_id] = data
+            while len(self._cache) > self.cache_documents:
+                self._cache.popitem(last=False)
+        return data
+
+    def get_pages(self, document_id: str) -> Optional[List[str]]:
+        """获取文档各页文本，不存在时返回 None"""
+        data = self._load(document_id)
+        return data["pages"] if data is not None else None
+
+    def get_page(self, document_id: str, page_number: int) -> str:
+        """获取单页文本（页码从1开始）"""
+        pages = self.get_pages(document_id)
+        if pages is None or not 0 < page_number <= len(pages):
+            return ""
+        return pages[page_number - 1]
+
+    def get_boxes(self, document_id: str, page_number: int) -> List[int]:
+        """获取单页的扁平单词边界框数组（页码从1开始），格式见 word_boxes"""
+        data = self._load(document_id)
+        if data is None or not 0 < page_number <= len(data["boxes"]):
+            return []
+        return data["boxes"][page_number - 1]
+
+    def delete(self, document_id: str) -> None:
+        self._path(document_id).unlink(missing_ok=True)
+        with self._lock:
+            self._cache.pop(document_id, None)
+
+    def clear(self) -> None:
+        """删除所有文档文本"""
+        with self._lock:
+            self._cache.clear()
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    def size(self) -> int:
+        """存储占用的字节数"""
+        return sum(path.stat().st_size for path in self.root.glob("*.z"))
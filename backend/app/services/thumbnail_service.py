@@ -0,0 +1,273 @@
+# Thumbnail Service
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import base64
+import json
+import logging
+import os
+import threading
+
+from app.services.converters.pdf_renderer import PDFRenderer
+from app.services.document_cache import open_pdf
+from app.services.worker_pool import get_worker_count, run_in_worker_pool
+from app.utils.file_utils import get_file_hash
+
+logger = logging.getLogger(__name__)
+
+
+def render_thumbnails(
+    pdf_path: Path,
+    page_indices: List[int],
+    size: tuple[int, int],
+    output_paths: List[str],
+) -> List[dict]:
+    """在工作进程中渲染缩略图并写入磁盘
+
+    Returns:
+        [{"page_index", "width", "height"}, ...]
+    """
+    rendered = []
+    with PDFRenderer(pdf_path) as renderer:
+        for page_index, output_path in zip(page_indices, output_paths):
+            if page_index >= renderer.page_count:
+                continue
+            image = renderer.render_thumbnail(page_index, size)
+            try:
+                tmp_path = f"{output_path}.tmp"
+                image.save(tmp_path, format="PNG", optimize=True)
+                os.replace(tmp_path, output_path)
+                rendered.append({
+                    "page_index": page_index,
+                    "width": image.width,
+                    "height": image.height,
+                })
+            finally:
+                image.close()
+    return rendered
+
+
+def read_page_layout(pdf_path: Path) -> List[dict]:
+    """读取每页的尺寸和旋转角度"""
+    with open_pdf(pdf_path) as reader:
+        return [
+            {
+                "width": float(page.mediabox.width),
+                "height": float(page.mediabox.height),
+                "rotation": int(page.rotation),
+            }
+            for page in reader.pages
+        ]
+
+
+class ThumbnailService:
+    """页面缩略图服务
+
+    每个（文档内容哈希、页码、尺寸）只渲染一次，PNG保存在缩略图目录下。
+    文档页数和页面尺寸也缓存在同一目录的 JSON 文件中，命中缓存时完全不需要解析PDF。
+    两种文件共用一个LRU，总大小超出预算时删除最久未使用的文件。
+    """
+
+    def __init__(self, thumbnail_dir: str, max_size: int):
+        self.thumbnail_dir = Path(thumbnail_dir)
+        self.thumbnail_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # 文件名 -> 字节数
+        self._total_size = 0
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _scan(self) -> None:
+        """按修改时间加载已有缩略图和页面布局文件，最近使用的排在最后"""
+        files = []
+        for pattern in ("*.png", "*.json"):
+            for path in self.thumbnail_dir.glob(pattern):
+                stat = path.stat()
+                files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_size += size
+
+    @staticmethod
+    def _thumbnail_name(doc_hash: str, page_index: int, size: tuple[int, int]) -> str:
+        return f"{doc_hash}_{page_index}_{size[0]}x{size[1]}.png"
+
+    def _layout_path(self, doc_hash: str) -> Path:
+        return self.thumbnail_dir / f"{doc_hash}.json"
+
+    async def get_page_layout(self, pdf_path: Path) -> List[dict]:
+        """获取文档每页的尺寸和旋转角度（磁盘缓存）"""
+        doc_hash = await asyncio.to_thread(get_file_hash, pdf_path)
+        return await self._get_page_layout(pdf_path, doc_hash)
+
+    async def _get_page_layout(self, pdf_path: Path, doc_hash: str) -> List[dict]:
+        layout_path = self._layout_path(doc_hash)
+        if layout_path.exists():
+            try:
+                layout = json.loads(layout_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pass
+            else:
+                with self._lock:
+                    self._mark_used(layout_path.name)
+                return layout
+
+        layout = await run_in_worker_pool(read_page_layout, pdf_path)
+        tmp_path = layout_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(layout), encoding="utf-8")
+        os.replace(tmp_path, layout_path)
+        with self._lock:
+            self._add(layout_path.name, layout_path.stat().st_size)
+            self._evict()
+        return layout
+
+    async def get_thumbnails(
+        self,
+        pdf_path: Path,
+        pages: Optional[List[int]] = None,
+        size: tuple[int, int] = (200, 280),
+    ) -> dict:
+        """获取页面缩略图
+
+        Args:
+            pdf_path: PDF文件路径
+            pages: 页码列表（从0开始），None表示全部页面
+            size: 缩略图尺寸（宽度，高度）
+
+        Returns:
+            {"success", "thumbnails": [{"page_number", "thumbnail"(base64), "width", "height"}],
+             "total_pages"}
+        """
+        try:
+            doc_hash = await asyncio.to_thread(get_file_hash, pdf_path)
+            layout = await self._get_page_layout(pdf_path, doc_hash)
+            total_pages = len(layout)
+
+            page_indices = list(range(total_pages)) if pages is None else [
+                p for p in pages if 0 <= p < total_pages
+            ]
+
+            names = {p: self._thumbnail_name(doc_hash, p, size) for p in page_indices}
+            missing = [p for p in page_indices if not self._touch(names[p])]
+
+            if missing:
+                await self._render(pdf_path, missing, size, names)
+
+            thumbnails = await asyncio.to_thread(self._read_thumbnails, page_indices, names)
+
+            return {
+                "success": True,
+                "thumbnails": thumbnails,
+                "total_pages": total_pages,
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+            }
+
+    async def _render(
+        self,
+        pdf_path: Path,
+        page_indices: List[int],
+        size: tuple[int, int],
+        names: Dict[int, str],
+    ) -> None:
+        """把缺失的缩略图分批派发到工作进程渲染"""
+        chunk_size = max(1, -(-len(page_indices) // get_worker_count()))
+        chunks = [
+            page_indices[i:i + chunk_size] for i in range(0, len(page_indices), chunk_size)
+        ]
+        await asyncio.gather(*[
+            run_in_worker_pool(
+                render_thumbnails,
+                pdf_path,
+                chunk,
+                size,
+                [str(self.thumbnail_dir / names[p]) for p in chunk],
+            )
+            for chunk in chunks
+        ])
+
+        with self._lock:
+            for page_index in page_indices:
+                path = self.thumbnail_dir / names[page_index]
+                if path.exists():
+                    self._add(names[page_index], path.stat().st_size)
+            self._evict()
+
+    def _read_thumbnails(self, page_indices: List[int], names: Dict[int, str]) -> List[dict]:
+        """读取缓存的缩略图文件，只解析PNG头获取尺寸"""
+        from PIL import Image
+
+        thumbnails = []
+        for page_index in page_indices:
+            path = self.thumbnail_dir / names[page_index]
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            with Image.open(path) as image:
+                width, height = image.size
+            thumbnails.append({
+                "page_number": page_index + 1,
+                "thumbnail": base64.b64encode(data).decode("ascii"),
+                "width": width,
+                "height": height,
+            })
+        return thumbnails
+
+    def _touch(self, name: str) -> bool:
+        """命中时更新LRU顺序，返回是否命中"""
+        with self._lock:
+            if self._mark_used(name):
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            return False
+
+    def _mark_used(self, name: str) -> bool:
+        """把已缓存的文件移到LRU末尾，返回文件是否存在（调用方需持有锁）"""
+        if name not in self._entries or not (self.thumbnail_dir / name).exists():
+            return False
+        self._entries.move_to_end(name)
+        try:
+            os.utime(self.thumbnail_dir / name)
+        except OSError:
+            pass
+        return True
+
+    def _add(self, name: str, size: int) -> None:
+        """记录新缩略图（调用方需持有锁）"""
+        if name in self._entries:
+            self._total_size -= self._entries.pop(name)
+        self._entries[name] = size
+        self._total_size += size
+
+    def _evict(self) -> None:
+        """超出预算时删除最久未使用的缩略图或页面布局文件（调用方需持有锁）"""
+        while self._total_size > self.max_size and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total_size -= size
+            try:
+                (self.thumbnail_dir / name).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"删除缩略图失败 {name}: {e}")
+
+    def stats(self) -> dict:
+        """缩略图缓存统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "total_size": self._total_size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
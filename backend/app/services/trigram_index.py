@@ -0,0 +1,129 @@
+# Trigram Index
+from array import array
+from typing import Dict, List, Optional, Set, Union
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+from app.services.postings_index import PostingsIndex
+
+# 查询树：三元组字符串，("and" | "or", [子节点])，None 表示无法限定页面
+TrigramQuery = Union[None, str, tuple]
+
+_REPEATS = {
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    getattr(sre_constants, "POSSESSIVE_REPEAT", sre_constants.MAX_REPEAT),
+}
+
+
+def build_trigrams(pages: List[str]) -> Dict[str, array]:
+    """为文档各页文本（下标为页码减一）建立 三元组 -> 页码数组 的索引，不区分大小写"""
+    trigrams: Dict[str, array] = {}
+    for page_index, text in enumerate(pages):
+        text = text.lower()
+        for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            entry = trigrams.get(trigram)
+            if entry is None:
+                entry = trigrams[trigram] = array("I")
+            entry.append(page_index + 1)
+    return trigrams
+
+
+def _and(nodes: List[TrigramQuery]) -> TrigramQuery:
+    nodes = [node for node in nodes if node is not None]
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+
+def _or(nodes: List[TrigramQuery]) -> TrigramQuery:
+    if not nodes or any(node is None for node in nodes):
+        return None
+    return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+
+def _literal_query(literal: str) -> TrigramQuery:
+    literal = literal.lower()
+    return _and([literal[i:i + 3] for i in range(len(literal) - 2)])
+
+
+def _sequence_query(items) -> TrigramQuery:
+    """提取一个正则序列中所有匹配都必须包含的三元组"""
+    required: List[TrigramQuery] = []
+    run: List[str] = []
+
+    def flush():
+        if len(run) >= 3:
+            required.append(_literal_query("".join(run)))
+        run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            required.append(_sequence_query(av[-1]))
+        elif op in _REPEATS:
+            low, _, inner = av
+            if low >= 1:
+                required.append(_sequence_query(inner))
+        elif op is sre_constants.BRANCH:
+            required.append(_or([_sequence_query(branch) for branch in av[1]]))
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            required.append(_sequence_query(av))
+
+    flush()
+    return _and(required)
+
+
+def regex_trigram_query(pattern: str) -> TrigramQuery:
+    """把正则表达式转换为三元组查询树
+
+    Raises:
+        re.error: 正则表达式无效
+    """
+    return _sequence_query(sre_parse.parse(pattern))
+
+
+def _evaluate(node: TrigramQuery, index: Dict[str, array]) -> Set[int]:
+    if isinstance(node, str):
+        return set(index.get(node, ()))
+
+    op, children = node
+    if op == "and":
+        result: Optional[Set[int]] = None
+        for child in children:
+            pages = _evaluate(child, index)
+            result = pages if result is None else result & pages
+            if not result:
+                return set()
+        return result or set()
+
+    return set().union(*(_evaluate(child, index) for child in children))
+
+
+class TrigramIndex(PostingsIndex):
+    """正则表达式搜索用的三元组索引
+
+    从正则表达式中提取每个匹配都必须包含的字面量三元组，先用索引找出候选页面，
+    再只对候选页面执行正则匹配。
+    """
+
+    SUFFIX = ".trigrams"
+
+    def candidates(self, document_id: str, pattern: str) -> Optional[Set[int]]:
+        """获取可能匹配的页码；无法从正则表达式中提取三元组或没有索引时返回 None"""
+        query = regex_trigram_query(pattern)
+        if query is None:
+            return None
+
+        index = self.get(document_id)
+        if index is None:
+            return None
+        return _evaluate(query, index)
@@ -0,0 +1,365 @@
+# Upload Session Service
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+
+import aiofiles
+
+from app.utils.file_utils import compute_file_hash, remember_file_hash
+from app.utils.upload_utils import (
+    check_file_signature,
+    sniff_file_type,
+    SavedUpload,
+    UploadError,
+    UploadTooLargeError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class UploadSessionNotFoundError(UploadError):
+    """上传会话不存在"""
+    status_code = 404
+
+
+class UploadIncompleteError(UploadError):
+    """上传尚未完成"""
+    status_code = 409
+
+
+class UploadSession:
+    """可续传的分块上传会话"""
+
+    def __init__(
+        self,
+        id: str,
+        filename: str,
+        total_size: int,
+        chunk_size: int,
+        received: Optional[List[int]] = None,
+        status: str = "uploading",
+        content_hash: Optional[str] = None,
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None,
+    ):
+        self.id = id
+        self.filename = filename
+        self.total_size = total_size
+        self.chunk_size = chunk_size
+        self.received = set(received or [])
+        self.status = status
+        self.content_hash = content_hash
+        self.created_at = created_at or datetime.now().isoformat()
+        self.updated_at = updated_at or self.created_at
+
+        # 按顺序到达的连续前缀块在写入时直接计入哈希，finalize 时只需补算剩余部分
+        self._digest = hashlib.sha256()
+        self._hashed_chunks = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    @property
+    def received_offset(self) -> int:
+        """从文件开头起连续接收的字节数，客户端从此处续传"""
+        index = 0
+        while index in self.received:
+            index += 1
+        return min(index * self.chunk_size, self.total_size)
+
+    @property
+    def missing_chunks(self) -> List[int]:
+        return [i for i in range(self.total_chunks) if i not in self.received]
+
+    def expected_chunk_length(self, index: int) -> int:
+        if index == self.total_chunks - 1:
+            return self.total_size - index * self.chunk_size
+        return self.chunk_size
+
+    def to_dict(self) -> dict:
+        return {
+            "upload_id": self.id,
+            "filename": self.filename,
+            "total_size": self.total_size,
+            "chunk_size": self.chunk_size,
+            "total_chunks": self.total_chunks,
+            "received_chunks": len(self.received),
+            "received_offset": self.received_offset,
+            "missing_chunks": self.missing_chunks,
+            "status": self.status,
+            "content_hash": self.content_hash,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def to_metadata(self) -> dict:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "total_size": self.total_size,
+            "chunk_size": self.chunk_size,
+            "received": sorted(self.received),
+            "status": self.status,
+            "content_hash": self.content_hash,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class UploadSessionService:
+    """分块上传服务
+
+    块直接写入预分配的临时文件的对应偏移处，完成后原地重命名到上传目录，
+    转换、检索和拼接接口可通过 upload_id 直接使用，无需再复制一次。
+    会话元数据保存在磁盘上，服务重启后仍可续传。
+    超过 session_ttl 秒未更新的未完成会话视为已放弃，启动时和创建会话时清理。
+    """
+
+    SESSION_DIR = ".sessions"
+    SWEEP_INTERVAL = 600  # 创建会话时两次清理之间的最短间隔（秒）
+
+    def __init__(
+        self,
+        upload_dir: str,
+        max_file_size: int,
+        default_chunk_size: int,
+        session_ttl: int = 0,
+    ):
+        self.upload_dir = Path(upload_dir)
+        self.session_dir = self.upload_dir / self.SESSION_DIR
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        self.max_file_size = max_file_size
+        self.default_chunk_size = default_chunk_size
+        self.session_ttl = session_ttl
+        self._sessions: Dict[str, UploadSession] = {}
+        self._last_sweep = 0.0
+        self.sweep_expired()
+
+    def _part_path(self, session_id: str) -> Path:
+        return self.session_dir / f"{session_id}.part"
+
+    def _meta_path(self, session_id: str) -> Path:
+        return self.session_dir / f"{session_id}.json"
+
+    def _final_path(self, session: UploadSession) -> Path:
+        return self.upload_dir / f"{session.id}{Path(session.filename).suffix.lower()}"
+
+    async def create_session(
+        self, filename: str, total_size: int, chunk_size: Optional[int] = None
+    ) -> UploadSession:
+        """创建上传会话
+
+        Raises:
+            UploadTooLargeError: 文件超出大小限制
+            UploadError: 参数无效
+        """
+        if total_size <= 0:
+            raise UploadError("文件大小无效")
+        if total_size > self.max_file_size:
+            raise UploadTooLargeError(f"文件 {filename} 超出大小限制 {self.max_file_size} 字节")
+
+        chunk_size = chunk_size or self.default_chunk_size
+        if chunk_size <= 0:
+            raise UploadError("分块大小无效")
+
+        if time.monotonic() - self._last_sweep >= self.SWEEP_INTERVAL:
+            await asyncio.to_thread(self.sweep_expired)
+
+        session = UploadSession(
+            id=str(uuid.uuid4()),
+            filename=Path(filename).name,
+            total_size=total_size,
+            chunk_size=chunk_size,
+        )
+
+        # 预分配目标文件，块可以任意顺序写入
+        async with aiofiles.open(self._part_path(session.id), "wb") as f:
+            await f.truncate(total_size)
+
+        self._sessions[session.id] = session
+        await self._save_metadata(session)
+        return session
+
+    def get_session(self, session_id: str) -> UploadSession:
+        """获取上传会话
+
+        Raises:
+            UploadSessionNotFoundError: 会话不存在
+        """
+        session = self._sessions.get(session_id)
+        if session is not None:
+            return session
+
+        try:
+            uuid.UUID(session_id)
+        except ValueError:
+            raise UploadSessionNotFoundError(f"上传会话 {session_id} 不存在")
+
+        meta_path = self._meta_path(session_id)
+        if not meta_path.exists():
+            raise UploadSessionNotFoundError(f"上传会话 {session_id} 不存在")
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            session = UploadSession(**json.load(f))
+        self._sessions[session_id] = session
+        return session
+
+    async def write_chunk(self, session_id: str, index: int, data: bytes) -> UploadSession:
+        """写入编号为 index 的数据块（从0开始），重复写入同一块是幂等的"""
+        session = self.get_session(session_id)
+
+        async with session._lock:
+            if session.status != "uploading":
+                raise UploadIncompleteError(f"上传会话 {session_id} 已完成")
+            if index < 0 or index >= session.total_chunks:
+                raise UploadError(f"块编号 {index} 超出范围")
+            if len(data) != session.expected_chunk_length(index):
+                raise UploadError(
+                    f"块 {index} 长度应为 {session.expected_chunk_length(index)} 字节，"
+                    f"实际为 {len(data)} 字节"
+                )
+
+            async with aiofiles.open(self._part_path(session_id), "r+b") as f:
+                await f.seek(index * session.chunk_size)
+                await f.write(data)
+
+            if index == session._hashed_chunks:
+                session._digest.update(data)
+                session._hashed_chunks += 1
+
+            session.received.add(index)
+            session.updated_at = datetime.now().isoformat()
+            await self._save_metadata(session)
+
+        return session
+
+    async def finalize(self, session_id: str) -> SavedUpload:
+        """完成上传：校验完整性和文件头，计算哈希并移动到上传目录
+
+        Raises:
+            UploadIncompleteError: 仍有数据块未上传
+            UploadTypeMismatchError: 文件内容与扩展名不符
+        """
+        session = self.get_session(session_id)
+
+        async with session._lock:
+            final_path = self._final_path(session)
+            if session.status == "completed":
+                return self._saved_upload(session, final_path)
+
+            missing = session.missing_chunks
+            if missing:
+                raise UploadIncompleteError(f"仍有 {len(missing)} 个数据块未上传")
+
+            part_path = self._part_path(session_id)
+            async with aiofiles.open(part_path, "rb") as f:
+                header = await f.read(16)
+            detected_type = sniff_file_type(header)
+            check_file_signature(session.filename, detected_type)
+
+            if session._hashed_chunks == session.total_chunks:
+                content_hash = session._digest.hexdigest()
+            else:
+                content_hash = await asyncio.to_thread(compute_file_hash, part_path)
+
+            os.replace(part_path, final_path)
+            remember_file_hash(final_path, content_hash)
+
+            session.status = "completed"
+            session.content_hash = content_hash
+            session.updated_at = datetime.now().isoformat()
+            await self._save_metadata(session)
+
+        return self._saved_upload(session, final_path, detected_type)
+
+    async def abort(self, session_id: str) -> None:
+        """取消上传并删除临时文件"""
+        session = self.get_session(session_id)
+        async with session._lock:
+            self._part_path(session_id).unlink(missing_ok=True)
+            self._meta_path(session_id).unlink(missing_ok=True)
+            self._sessions.pop(session_id, None)
+
+    def sweep_expired(self) -> int:
+        """删除超过 session_ttl 秒未更新的未完成会话及其临时文件
+
+        已完成会话的元数据保留，resolve_upload 仍需要它。
+
+        Returns:
+            删除的会话数
+        """
+        self._last_sweep = time.monotonic()
+        if self.session_ttl <= 0:
+            return 0
+
+        cutoff = time.time() - self.session_ttl
+        removed = 0
+        for path in self.session_dir.iterdir():
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+                if path.suffix == ".json":
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            completed = json.load(f).get("status") == "completed"
+                    except ValueError:
+                        completed = False
+                    if completed:
+                        continue
+                    self._part_path(path.stem).unlink(missing_ok=True)
+                    path.unlink()
+                    self._sessions.pop(path.stem, None)
+                    removed += 1
+                elif path.suffix == ".tmp" or not self._meta_path(path.stem).exists():
+                    # 写入中断的元数据临时文件，或没有元数据的数据文件
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"清理上传会话文件失败 {path}: {e}")
+
+        if removed:
+            logger.info(f"清理了 {removed} 个过期的上传会话")
+        return removed
+
+    def resolve_upload(self, upload_id: str) -> Path:
+        """获取已完成上传的文件路径
+
+        Raises:
+            UploadSessionNotFoundError: 会话不存在
+            UploadIncompleteError: 上传尚未完成
+        """
+        session = self.get_session(upload_id)
+        if session.status != "completed":
+            raise UploadIncompleteError(f"上传 {upload_id} 尚未完成")
+
+        final_path = self._final_path(session)
+        if not final_path.exists():
+            raise UploadSessionNotFoundError(f"上传 {upload_id} 的文件已不存在")
+        return final_path
+
+    def _saved_upload(
+        self, session: UploadSession, path: Path, detected_type: Optional[str] = None
+    ) -> SavedUpload:
+        return SavedUpload(
+            path=path,
+            filename=session.filename,
+            size=session.total_size,
+            content_hash=session.content_hash,
+            detected_type=detected_type,
+        )
+
+    async def _save_metadata(self, session: UploadSession) -> None:
+        """写入会话元数据"""
+        meta_path = self._meta_path(session.id)
+        tmp_path = meta_path.with_suffix(".tmp")
+        async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+            await f.write(json.dumps(session.to_metadata()))
+        os.replace(tmp_path, meta_path)
@@ -0,0 +1,78 @@
+# Word Boxes
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+# 每个单词在扁平整数数组中占用的字段数：起始偏移, 结束偏移, x0, top, x1, bottom
+BOX_FIELDS = 6
+# 坐标以 1/10 点保存为整数
+COORD_SCALE = 10
+# 两个单词 top 相差超过该值（点）视为换行
+LINE_TOLERANCE = 3
+
+
+def build_page_text(words: Sequence[dict]) -> Tuple[str, List[int]]:
+    """由 pdfplumber 提取的单词拼出页面文本，同时记录每个单词的字符偏移和边界框
+
+    Args:
+        words: page.extract_words() 的结果，需包含 text, x0, top, x1, bottom
+
+    Returns:
+        (页面文本, 扁平的单词边界框数组)
+    """
+    parts: List[str] = []
+    boxes: List[int] = []
+    offset = 0
+    previous_top = None
+
+    for word in words:
+        text = word["text"]
+        if not text:
+            continue
+
+        if previous_top is not None:
+            separator = "\n" if abs(word["top"] - previous_top) > LINE_TOLERANCE else " "
+            parts.append(separator)
+            offset += 1
+        previous_top = word["top"]
+
+        parts.append(text)
+        boxes.extend((
+            offset,
+            offset + len(text),
+            round(word["x0"] * COORD_SCALE),
+            round(word["top"] * COORD_SCALE),
+            round(word["x1"] * COORD_SCALE),
+            round(word["bottom"] * COORD_SCALE),
+        ))
+        offset += len(text)
+
+    return "".join(parts), boxes
+
+
+def match_rects(boxes: Sequence[int], start: int, end: int) -> List[List[float]]:
+    """获取字符范围 [start, end) 覆盖的矩形，同一行相邻的单词合并为一个矩形
+
+    Returns:
+        [[x0, top, x1, bottom], ...]，单位为点，原点在页面左上角
+    """
+    starts = boxes[0::BOX_FIELDS]
+    rects: List[List[float]] = []
+
+    index = max(0, bisect_right(starts, start) - 1)
+    while index < len(starts):
+        base = index * BOX_FIELDS
+        word_start, word_end = boxes[base], boxes[base + 1]
+        if word_start >= end:
+            break
+        if word_end > start:
+            x0, top, x1, bottom = (v / COORD_SCALE for v in boxes[base + 2:base + 6])
+            if rects and abs(rects[-1][1] - top) <= LINE_TOLERANCE:
+                last = rects[-1]
+                last[0] = min(last[0], x0)
+                last[2] = max(last[2], x1)
+                last[3] = max(last[3], bottom)
+            else:
+                rects.append([x0, top, x1, bottom])
+        index += 1
+
+    return rects
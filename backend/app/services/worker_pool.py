@@ -0,0 +1,54 @@
+# Worker Pool
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+import asyncio
+import os
+import threading
+
+from app.core.config import settings
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_count() -> int:
+    """获取进程池大小"""
+    return settings.conversion_workers or os.cpu_count() or 1
+
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """获取全局CPU进程池（首次调用时创建）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=get_worker_count())
+        return _pool
+
+
+def shutdown_worker_pool(wait: bool = True) -> None:
+    """关闭全局进程池"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def run_converter(
+    converter_cls: type,
+    init_args: tuple,
+    convert_kwargs: Optional[dict] = None,
+) -> dict:
+    """在工作进程中实例化转换器并执行转换
+
+    转换器类、参数和返回值都需要可以被pickle序列化
+    """
+    converter = converter_cls(*init_args)
+    return converter.convert(**(convert_kwargs or {}))
+
+
+async def run_in_worker_pool(func, *args: Any) -> Any:
+    """在进程池中执行函数并等待结果，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_worker_pool(), func, *args)
@@ -5,6 +5,17 @@ from .file_utils import (
     ensure_directory,
     get_file_size_human,
     sanitize_filename,
+    compute_file_hash,
+    get_file_hash,
+    remember_file_hash,
+)
+from .upload_utils import (
+    save_upload_file,
+    sniff_file_type,
+    SavedUpload,
+    UploadError,
+    UploadTooLargeError,
+    UploadTypeMismatchError,
 )
 from .format_utils import PageSize, Orientation, get_page_dimensions, detect_page_type
 
@@ -14,6 +25,15 @@ __all__ = [
     "ensure_directory",
     "get_file_size_human",
     "sanitize_filename",
+    "compute_file_hash",
+    "get_file_hash",
+    "remember_file_hash",
+    "save_upload_file",
+    "sniff_file_type",
+    "SavedUpload",
+    "UploadError",
+    "UploadTooLargeError",
+    "UploadTypeMismatchError",
     "PageSize",
     "Orientation",
     "get_page_dimensions",
@@ -1,7 +1,16 @@
 # File Utilities
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
+import hashlib
 import os
+import threading
+
+
+# 文件哈希缓存：(路径, 大小, 修改时间) -> SHA-256
+_HASH_MEMO_SIZE = 4096
+_hash_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_hash_memo_lock = threading.Lock()
 
 
 def get_file_extension(filename: str) -> Optional[str]:
@@ -41,3 +50,41 @@ def sanitize_filename(filename: str) -> str:
     for char in invalid_chars:
         filename = filename.replace(char, "_")
     return filename.strip()
+
+
+def compute_file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """计算文件内容的SHA-256哈希"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_memo_key(file_path: Path) -> tuple:
+    stat = os.stat(file_path)
+    return (str(Path(file_path).resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+def remember_file_hash(file_path: Path, digest: str) -> None:
+    """记录已知的文件哈希（例如上传时边写边算的哈希）"""
+    key = _hash_memo_key(file_path)
+    with _hash_memo_lock:
+        _hash_memo[key] = digest
+        _hash_memo.move_to_end(key)
+        while len(_hash_memo) > _HASH_MEMO_SIZE:
+            _hash_memo.popitem(last=False)
+
+
+def get_file_hash(file_path: Path) -> str:
+    """获取文件SHA-256哈希，文件未变化时直接返回已记录的结果"""
+    key = _hash_memo_key(file_path)
+    with _hash_memo_lock:
+        digest = _hash_memo.get(key)
+        if digest is not None:
+            _hash_memo.move_to_end(key)
+            return digest
+
+    digest = compute_file_hash(file_path)
+    remember_file_hash(file_path, digest)
+    return digest
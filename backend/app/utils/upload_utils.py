@@ -0,0 +1,158 @@
+# Upload Utilities
+from pathlib import Path
+from typing import Optional
+import hashlib
+import uuid
+
+import aiofiles
+from fastapi import UploadFile
+
+from .file_utils import remember_file_hash
+
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# 文件头魔数 -> 识别出的类型
+MAGIC_SIGNATURES = [
+    (b"%PDF-", "pdf"),
+    (b"PK\x03\x04", "zip"),  # docx/xlsx/pptx
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),  # doc/xls/ppt
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+]
+
+# 扩展名 -> 允许的文件头类型
+EXTENSION_SIGNATURES = {
+    ".pdf": {"pdf"},
+    ".docx": {"zip"},
+    ".xlsx": {"zip"},
+    ".pptx": {"zip"},
+    ".doc": {"ole"},
+    ".xls": {"ole"},
+    ".ppt": {"ole"},
+    ".png": {"png"},
+    ".jpg": {"jpeg"},
+    ".jpeg": {"jpeg"},
+    ".gif": {"gif"},
+    ".bmp": {"bmp"},
+    ".webp": {"webp"},
+}
+
+
+class UploadError(Exception):
+    """上传错误"""
+    status_code = 400
+
+
+class UploadTooLargeError(UploadError):
+    """上传文件超出大小限制"""
+    status_code = 413
+
+
+class UploadTypeMismatchError(UploadError):
+    """文件内容与扩展名不符"""
+    status_code = 415
+
+
+class SavedUpload:
+    """已保存的上传文件"""
+
+    def __init__(
+        self,
+        path: Path,
+        filename: str,
+        size: int,
+        content_hash: str,
+        detected_type: Optional[str],
+    ):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.content_hash = content_hash
+        self.detected_type = detected_type
+
+
+def sniff_file_type(header: bytes) -> Optional[str]:
+    """根据文件头魔数识别文件类型"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    for signature, file_type in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return file_type
+    return None
+
+
+def check_file_signature(filename: str, detected_type: Optional[str]) -> None:
+    """校验文件头与扩展名是否一致
+
+    Raises:
+        UploadTypeMismatchError: 文件头与扩展名不符
+    """
+    expected = EXTENSION_SIGNATURES.get(Path(filename).suffix.lower())
+    if expected is not None and detected_type not in expected:
+        raise UploadTypeMismatchError(
+            f"文件 {filename} 的内容与扩展名不符（识别为 {detected_type or '未知类型'}）"
+        )
+
+
+async def save_upload_file(
+    file: UploadFile,
+    upload_dir: str,
+    max_size: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> SavedUpload:
+    """流式保存上传文件
+
+    按块异步写入磁盘，同一遍内完成大小限制、SHA-256计算和文件头识别。
+    失败时删除已写入的部分文件。
+
+    Raises:
+        UploadTooLargeError: 超出 max_size
+        UploadTypeMismatchError: 文件内容与扩展名不符
+    """
+    filename = file.filename or ""
+
+    # 已知大小时在写入前拒绝
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLargeError(f"文件 {filename} 超出大小限制 {max_size} 字节")
+
+    file_path = Path(upload_dir) / f"{uuid.uuid4()}{Path(filename).suffix}"
+    digest = hashlib.sha256()
+    size = 0
+    detected_type = None
+
+    try:
+        async with aiofiles.open(file_path, "wb") as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+
+                if size == 0:
+                    detected_type = sniff_file_type(chunk[:16])
+                    check_file_signature(filename, detected_type)
+
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(f"文件 {filename} 超出大小限制 {max_size} 字节")
+
+                digest.update(chunk)
+                await out.write(chunk)
+
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
+
+    content_hash = digest.hexdigest()
+    remember_file_hash(file_path, content_hash)
+
+    return SavedUpload(
+        path=file_path,
+        filename=filename,
+        size=size,
+        content_hash=content_hash,
+        detected_type=detected_type,
+    )
@@ -0,0 +1,69 @@
+# Text Analysis Tests
+from whoosh.fields import Schema, TEXT
+from whoosh.filedb.filestore import RamStorage
+from whoosh.qparser import QueryParser
+
+from app.services.analysis import cjk_bigram_analyzer, iter_tokens, token_end
+from app.services.postings_index import build_postings
+
+
+def test_standard_tokens_keep_cjk_runs():
+    """测试标准切分把连续的中文作为一个词元"""
+    assert list(iter_tokens("PDF 发票号码")) == [("PDF", 0, 3), ("发票号码", 4, 8)]
+
+
+def test_cjk_bigrams_with_offsets():
+    """测试中文切分为重叠二元组，单字和其他文字保持原样"""
+    tokens = list(iter_tokens("PDF发票号码 和 v2", cjk_bigrams=True))
+    assert tokens == [
+        ("PDF", 0, 3),
+        ("发票", 3, 5),
+        ("票号", 4, 6),
+        ("号码", 5, 7),
+        ("和", 8, 9),
+        ("v2", 10, 12),
+    ]
+
+
+def test_token_end_matches_iter_tokens():
+    """测试 token_end 与切分结果一致"""
+    text = "PDF发票号码 和"
+    for cjk_bigrams in (False, True):
+        for _, start, end in iter_tokens(text, cjk_bigrams):
+            assert token_end(text, start, cjk_bigrams) == end
+
+
+def test_bigram_postings_find_inner_words():
+    """测试二元组倒排表能找到连续中文中间的词"""
+    postings = build_postings(["请核对增值税发票号码"], cjk_bigrams=True)
+    assert list(postings["发票"]) == [1, 6]
+    assert "增值税发票号码" not in postings
+
+
+def test_unigrams_cover_every_character():
+    """测试建立索引时每个 CJK 字符（包括连续段末尾的字符）也作为词元"""
+    tokens = [token for token, _, _ in iter_tokens("中国人", cjk_bigrams=True, unigrams=True)]
+    assert tokens == ["中国", "中", "国人", "国", "人"]
+
+    postings = build_postings(["中国人"], cjk_bigrams=True)
+    assert list(postings["人"]) == [1, 2]
+
+
+def test_single_character_query_matches():
+    """测试单字查询可以命中连续中文中的任意字符，多字查询仍按二元组短语匹配"""
+    analyzer = cjk_bigram_analyzer()
+    assert [t.text for t in analyzer("中国人", mode="query")] == ["中国", "国人"]
+
+    schema = Schema(content=TEXT(analyzer=analyzer, multitoken_query="phrase", stored=True))
+    ix = RamStorage().create_index(schema)
+    writer = ix.writer()
+    writer.add_document(content="我是中国人")
+    writer.add_document(content="国人")
+    writer.commit()
+
+    parser = QueryParser("content", schema)
+    with ix.searcher() as searcher:
+        assert len(searcher.search(parser.parse("人"))) == 2
+        assert len(searcher.search(parser.parse("中"))) == 1
+        assert len(searcher.search(parser.parse("中国人"))) == 1
+        assert len(searcher.search(parser.parse("我人"))) == 0
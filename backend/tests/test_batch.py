@@ -0,0 +1,52 @@
+# Batch Service Tests
+import asyncio
+import pytest
+from pathlib import Path
+
+from app.services.batch_service import BatchService, TaskStatus
+from app.services.conversion_service import ConversionResult
+
+
+SUPPORTED_FORMATS = {
+    "pdf": [".pdf"],
+    "word": [".doc", ".docx"],
+}
+
+
+class _FakeConversionService:
+    """模拟转换服务"""
+
+    async def pdf_to_word(self, file, options):
+        return ConversionResult(
+            success=True,
+            output_path=str(file.with_suffix(".docx")),
+            output_format="docx",
+        )
+
+
+def test_submit_rejects_unknown_target():
+    """测试不支持的目标格式"""
+    service = BatchService(_FakeConversionService(), SUPPORTED_FORMATS)
+    with pytest.raises(ValueError):
+        service.submit([("a.pdf", Path("a.pdf"))], "mp3")
+
+
+def test_batch_task_runs_in_background():
+    """测试批量任务在后台完成并记录每个文件的状态"""
+
+    async def run():
+        service = BatchService(_FakeConversionService(), SUPPORTED_FORMATS, max_concurrency=1)
+        task = service.submit(
+            [("a.pdf", Path("a.pdf")), ("b.xyz", Path("b.xyz"))],
+            "word",
+        )
+        assert task.items[1].status == TaskStatus.FAILED
+        while not task.finished:
+            await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(run())
+    assert task.status == TaskStatus.PARTIAL
+    assert task.items[0].status == TaskStatus.COMPLETED
+    assert task.items[0].output_paths == ["a.docx"]
+    assert task.progress == 1.0
@@ -1,6 +1,11 @@
 # Conversion Service Tests
 import pytest
+from PIL import Image
+from reportlab.pdfgen import canvas
 from app.services.conversion_service import ConversionService, ConversionOptions, ConversionResult
+from app.services.converters.pdf_renderer import PDFRenderer, fit_scale
+from app.services.converters.pdf_to_images import PDFToImagesConverter
+from app.services.worker_pool import run_converter
 from pathlib import Path
 
 
@@ -44,4 +49,70 @@ def test_conversion_result_failure(conversion_service):
     assert result.warnings == []
 
 
+class _EchoConverter:
+    """用于测试的转换器"""
+
+    def __init__(self, input_path, output_path):
+        self.input_path = input_path
+        self.output_path = output_path
+
+    def convert(self, method: str = "default") -> dict:
+        return {"success": True, "output_file": str(self.output_path), "method": method}
+
+
+def test_run_converter():
+    """测试进程池中的转换器调用"""
+    result = run_converter(_EchoConverter, (Path("in.pdf"), Path("out.docx")), {"method": "auto"})
+    assert result["success"] is True
+    assert result["output_file"] == "out.docx"
+    assert result["method"] == "auto"
+
+
+def _text_pdf(path, width=200, height=300):
+    """生成一页带文字的PDF"""
+    pdf = canvas.Canvas(str(path), pagesize=(width, height))
+    pdf.setFont("Helvetica", 36)
+    pdf.drawString(20, height / 2, "Hello")
+    pdf.save()
+    return path
+
+
+def _is_blank(image):
+    return image.convert("L").getextrema() == (255, 255)
+
+
+def test_renderer_draws_page_content(tmp_path):
+    """测试渲染结果包含页面内容，尺寸与页面大小和DPI一致"""
+    pdf_path = _text_pdf(tmp_path / "text.pdf")
+
+    with PDFRenderer(pdf_path) as renderer:
+        assert renderer.page_count == 1
+        assert renderer.page_size(0) == pytest.approx((200, 300))
+        image = renderer.render(0, dpi=144)
+
+    assert image.size == (400, 600)
+    assert not _is_blank(image)
+
+
+def test_pdf_to_images_writes_rendered_pages(tmp_path):
+    """测试PDF转图片输出非空白的图片文件"""
+    pdf_path = _text_pdf(tmp_path / "text.pdf")
+    converter = PDFToImagesConverter(pdf_path, tmp_path / "out", dpi=72)
+
+    result = converter.convert()
+
+    assert result["success"] is True
+    assert result["pages_converted"] == 1
+    with Image.open(tmp_path / "out" / result["images"][0]["filename"]) as image:
+        assert image.size == (200, 300)
+        assert not _is_blank(image)
+
+
 # TODO: Add actual conversion tests when implemented
+
+
+def test_fit_scale_limits_pixels():
+    """测试渲染像素上限"""
+    assert fit_scale(600, 800, 2.0, None) == 2.0
+    scale = fit_scale(600, 800, 10.0, 1_000_000)
+    assert 600 * scale * 800 * scale <= 1_000_000 + 1
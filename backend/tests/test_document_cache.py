@@ -0,0 +1,51 @@
+# Document Handle Cache Tests
+import os
+from PyPDF2 import PdfWriter
+
+from app.services.document_cache import DocumentHandleCache
+
+
+def _blank_pdf(path, pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=300)
+    writer.write(str(path))
+    return path
+
+
+def test_reader_is_reused_until_file_changes(tmp_path):
+    """测试文件未变化时复用已解析的文档"""
+    cache = DocumentHandleCache(max_bytes=10 * 1024 * 1024)
+    path = _blank_pdf(tmp_path / "doc.pdf", 2)
+
+    with cache.open_pdf(path) as first:
+        assert len(first.pages) == 2
+    with cache.open_pdf(path) as second:
+        assert second is first
+
+    _blank_pdf(path, 3)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    with cache.open_pdf(path) as third:
+        assert len(third.pages) == 3
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["documents"] == 1
+
+
+def test_memory_budget_evicts_lru(tmp_path):
+    """测试超出内存预算时淘汰最久未使用的文档"""
+    a = _blank_pdf(tmp_path / "a.pdf", 1)
+    b = _blank_pdf(tmp_path / "b.pdf", 1)
+    cache = DocumentHandleCache(max_bytes=os.path.getsize(a) + os.path.getsize(b) - 1)
+
+    with cache.open_pdf(a):
+        pass
+    with cache.open_pdf(b):
+        pass
+
+    stats = cache.stats()
+    assert stats["documents"] == 1
+    assert stats["evictions"] == 1
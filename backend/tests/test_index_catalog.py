@@ -0,0 +1,80 @@
+# Index Catalog Tests
+import sqlite3
+
+from app.services.index_catalog import IndexCatalog
+
+
+def test_catalog_persists_records(tmp_path):
+    """测试目录记录写入磁盘并可重新打开"""
+    db_path = tmp_path / "catalog.sqlite3"
+    catalog = IndexCatalog(db_path)
+    catalog.apply(
+        [{"document_id": "a", "content_hash": "h1", "total_pages": 3, "indexed_pages": 2}],
+        [],
+    )
+    catalog.close()
+
+    reopened = IndexCatalog(db_path)
+    record = reopened.get("a")
+    assert record["content_hash"] == "h1"
+    assert record["total_pages"] == 3
+    assert reopened.get("missing") is None
+
+
+def test_catalog_replace_and_delete():
+    """测试同一事务中的替换和删除"""
+    catalog = IndexCatalog()
+    catalog.apply(
+        [
+            {"document_id": "a", "content_hash": "h1"},
+            {"document_id": "b", "content_hash": "h2"},
+        ],
+        [],
+    )
+    catalog.apply([{"document_id": "a", "content_hash": "h3"}], ["b"])
+
+    assert catalog.get("a")["content_hash"] == "h3"
+    assert catalog.get("b") is None
+    assert catalog.count() == 1
+    assert [record["document_id"] for record in catalog.list_documents()] == ["a"]
+
+
+def test_catalog_adds_missing_columns(tmp_path):
+    """测试旧版本目录自动增加来源文件和统计列"""
+    db_path = tmp_path / "catalog.sqlite3"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE documents (document_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL,"
+        " total_pages INTEGER NOT NULL DEFAULT 0, indexed_pages INTEGER NOT NULL DEFAULT 0,"
+        " indexed_at TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO documents VALUES ('old', 'h0', 1, 1, '2024-01-01')")
+    conn.commit()
+    conn.close()
+
+    catalog = IndexCatalog(db_path)
+    old = catalog.get("old")
+    assert old["source_path"] is None
+    assert old["char_count"] == 0
+    catalog.apply([{"document_id": "a", "content_hash": "h1", "source_path": "/tmp/a.pdf"}], [])
+    assert catalog.get("a")["source_path"] == "/tmp/a.pdf"
+
+
+def test_catalog_stores_document_stats():
+    """测试记录文档统计信息"""
+    catalog = IndexCatalog()
+    catalog.apply(
+        [{
+            "document_id": "a",
+            "content_hash": "h1",
+            "total_pages": 4,
+            "indexed_pages": 3,
+            "char_count": 1200,
+            "build_seconds": 0.25,
+        }],
+        [],
+    )
+    record = catalog.get("a")
+    assert record["char_count"] == 1200
+    assert record["build_seconds"] == 0.25
+    assert record["indexed_at"]
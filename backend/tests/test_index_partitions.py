@@ -0,0 +1,123 @@
+# Index Partitions Tests
+from whoosh.fields import Schema, ID, TEXT
+from whoosh.query import Term
+
+from app.services.index_partitions import PartitionedIndex, partition_name
+
+
+def _schema():
+    return Schema(document_id=ID(stored=True, unique=True), content=TEXT())
+
+
+def test_partition_name_is_stable():
+    """测试分区名只由文档ID决定，分桶数量有上限"""
+    assert partition_name("doc", "document") == partition_name("doc", "document")
+    assert partition_name("doc", "document") != partition_name("other", "document")
+    buckets = {partition_name(f"doc-{i}", "bucket", 4) for i in range(100)}
+    assert buckets <= {"0000", "0001", "0002", "0003"}
+
+
+def test_document_layout_drops_partition(tmp_path):
+    """测试 document 布局删除文档时丢弃分区，搜索合并所有分区"""
+    index = PartitionedIndex(tmp_path / "partitions", _schema(), "document")
+    writer = index.writer()
+    writer.add_document(document_id="a", content="alpha shared")
+    writer.add_document(document_id="b", content="beta shared")
+    writer.commit()
+    assert index.partition_count() == 2
+
+    searcher = index.searcher()
+    assert len(searcher.search(Term("content", "shared"))) == 2
+
+    writer = index.writer()
+    writer.delete_by_term("document_id", "a")
+    writer.commit()
+    assert index.partition_count() == 1
+    assert not (tmp_path / "partitions" / partition_name("a", "document")).exists()
+    assert index.doc_count_all() == 1
+
+    searcher = index.searcher()
+    assert [hit["document_id"] for hit in searcher.search(Term("content", "shared"))] == ["b"]
+
+
+def test_document_layout_rebuild_replaces_partition(tmp_path):
+    """测试重建文档时整体替换分区，提交前搜索仍看到旧内容"""
+    index = PartitionedIndex(tmp_path / "partitions", _schema(), "document")
+    writer = index.writer()
+    writer.add_document(document_id="a", content="old text")
+    writer.commit()
+
+    writer = index.writer()
+    writer.delete_by_term("document_id", "a")
+    writer.add_document(document_id="a", content="new text")
+    searcher = index.searcher()
+    assert len(searcher.search(Term("content", "old"))) == 1
+    writer.commit()
+
+    searcher = index.searcher()
+    assert len(searcher.search(Term("content", "old"))) == 0
+    assert len(searcher.search(Term("content", "new"))) == 1
+    assert index.doc_count_all() == 1
+
+
+def test_bucket_layout_reopens(tmp_path):
+    """测试 bucket 布局按分桶写入，重新打开后仍可搜索"""
+    index = PartitionedIndex(tmp_path / "partitions", _schema(), "bucket", buckets=2)
+    writer = index.writer()
+    for i in range(6):
+        writer.add_document(document_id=f"doc-{i}", content="common")
+    writer.commit()
+
+    writer = index.writer()
+    writer.delete_by_term("document_id", "doc-0")
+    writer.commit(optimize=True)
+
+    reopened = PartitionedIndex(tmp_path / "partitions", _schema(), "bucket", buckets=2)
+    assert reopened.partition_count() <= 2
+    assert len(reopened.searcher().search(Term("content", "common"))) == 5
+    assert reopened.doc_count_all() == reopened.doc_count() == 5
+
+
+def test_old_searcher_keeps_readers_after_commit(tmp_path):
+    """测试提交后仍在使用的旧搜索器可以继续查询，所有搜索器关闭后读取器随之关闭"""
+    index = PartitionedIndex(tmp_path / "partitions", _schema(), "bucket", buckets=1)
+    writer = index.writer()
+    writer.add_document(document_id="a", content="alpha")
+    writer.commit()
+
+    old = index.searcher()
+    writer = index.writer()
+    writer.delete_by_term("document_id", "a")
+    writer.add_document(document_id="b", content="beta")
+    writer.commit(optimize=True)
+
+    new = index.searcher()
+    assert len(new.search(Term("content", "beta"))) == 1
+    assert len(old.search(Term("content", "alpha"))) == 1
+
+    old.close()
+    new.close()
+    index.close()
+    assert index._refs == {}
+
+
+def test_document_searcher_opens_one_partition(tmp_path):
+    """测试单文档搜索只打开该文档的分区，搜索器关闭后读取器随之关闭"""
+    index = PartitionedIndex(tmp_path / "partitions", _schema(), "document")
+    writer = index.writer()
+    for document_id in ("a", "b", "c"):
+        writer.add_document(document_id=document_id, content="shared")
+    writer.commit()
+
+    with index.searcher(document_id="b") as searcher:
+        assert [hit["document_id"] for hit in searcher.search(Term("content", "shared"))] == ["b"]
+        assert len(index._refs) == 1
+    assert index._refs == {}
+
+    with index.searcher() as searcher:
+        assert len(searcher.search(Term("content", "shared"))) == 3
+        with index.searcher(document_id="c") as single:
+            assert len(single.search(Term("content", "shared"))) == 1
+            assert len(index._refs) == 3
+    index.close()
+    assert index._refs == {}
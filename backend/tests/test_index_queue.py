@@ -0,0 +1,144 @@
+# Index Queue Tests
+from app.services.index_queue import IndexJob, IndexJobStatus, IndexQueue
+
+
+class _ListSink:
+    """把写入记录在列表中的写入端"""
+
+    def __init__(self):
+        self.commits = []
+
+    def begin_batch(self):
+        return []
+
+    def apply_job(self, writer, job):
+        if job.document_id == "broken":
+            raise ValueError("无法解析")
+        if job.content_hash == "unchanged":
+            job.skipped = True
+            return False
+        job.indexed_pages = 1
+        writer.append(job.document_id)
+        return True
+
+    def commit_batch(self, writer):
+        self.commits.append(list(writer))
+
+    def cancel_batch(self, writer):
+        pass
+
+
+def test_jobs_share_one_commit():
+    """测试多个文档在同一次提交中写入"""
+    sink = _ListSink()
+    index_queue = IndexQueue(sink, batch_size=10, commit_interval=0.2)
+
+    jobs = [index_queue.submit(IndexJob(f"doc-{i}", content_hash=str(i))) for i in range(5)]
+    for job in jobs:
+        assert job.wait(5)
+    index_queue.close()
+
+    assert all(job.status == IndexJobStatus.COMPLETED for job in jobs)
+    assert sum(len(batch) for batch in sink.commits) == 5
+    assert len(sink.commits) < 5
+    assert index_queue.stats()["committed_jobs"] == 5
+
+
+def test_failed_job_does_not_block_batch():
+    """测试单个文档失败不影响同批其他文档"""
+    sink = _ListSink()
+    index_queue = IndexQueue(sink, batch_size=10, commit_interval=0.05)
+
+    broken = index_queue.submit(IndexJob("broken", content_hash="x"))
+    ok = index_queue.submit(IndexJob("ok", content_hash="y"))
+    assert ok.wait(5) and broken.wait(5)
+    index_queue.close()
+
+    assert broken.status == IndexJobStatus.FAILED
+    assert broken.error == "无法解析"
+    assert ok.status == IndexJobStatus.COMPLETED
+
+
+def test_duplicate_submit_returns_pending_job():
+    """测试相同内容的重复提交共享同一任务"""
+    sink = _ListSink()
+    index_queue = IndexQueue(sink, batch_size=10, commit_interval=0.2)
+
+    first = index_queue.submit(IndexJob("doc", content_hash="h"))
+    second = index_queue.submit(IndexJob("doc", content_hash="h"))
+    assert second is first
+    first.wait(5)
+    index_queue.close()
+
+    assert index_queue.get_job("doc") is first
+
+
+def test_same_document_is_committed_before_rewrite():
+    """测试同一批中再次写入同一文档前先提交"""
+    sink = _ListSink()
+    index_queue = IndexQueue(sink, batch_size=10, commit_interval=0.2)
+
+    first = index_queue.submit(IndexJob("doc", content_hash="v1"))
+    second = index_queue.submit(IndexJob("doc", content_hash="v2"))
+    assert second is not first
+    assert first.wait(5) and second.wait(5)
+    index_queue.close()
+
+    assert sink.commits == [["doc"], ["doc"]]
+
+
+def test_skipped_job_completes_without_commit():
+    """测试内容未变化的文档不等待提交"""
+    sink = _ListSink()
+    index_queue = IndexQueue(sink, batch_size=10, commit_interval=60)
+
+    job = index_queue.submit(IndexJob("doc", content_hash="unchanged"))
+    assert job.wait(5)
+    index_queue.close()
+
+    assert job.status == IndexJobStatus.COMPLETED
+    assert job.skipped
+    assert sink.commits == []
+
+
+def test_exclusive_task_runs_after_pending_commit():
+    """测试维护操作执行前先提交当前批次"""
+    sink = _ListSink()
+    index_queue = IndexQueue(sink, batch_size=10, commit_interval=5.0)
+
+    job = index_queue.submit(IndexJob("doc-1", content_hash="1"))
+    future = index_queue.run_exclusive(lambda: list(sink.commits))
+
+    assert future.result(5) == [["doc-1"]]
+    assert job.wait(5)
+    index_queue.close()
+
+
+class _LockBusy(Exception):
+    pass
+
+
+def test_lock_contention_retries_instead_of_failing():
+    """测试写锁被其他进程占用时任务退避重试，取得写锁后正常提交"""
+    sink = _ListSink()
+    attempts = []
+    begin_batch = sink.begin_batch
+
+    def busy_begin_batch():
+        attempts.append(None)
+        if len(attempts) < 3:
+            raise _LockBusy("index is locked")
+        return begin_batch()
+
+    sink.begin_batch = busy_begin_batch
+    index_queue = IndexQueue(
+        sink, batch_size=10, commit_interval=0.05,
+        lock_errors=(_LockBusy,), lock_retry_delay=0.01,
+    )
+
+    job = index_queue.submit(IndexJob("doc-1", content_hash="1"))
+    assert job.wait(5)
+    assert job.status == IndexJobStatus.COMPLETED
+    assert sink.commits == [["doc-1"]]
+    assert index_queue.stats()["lock_retries"] == 2
+    index_queue.close()
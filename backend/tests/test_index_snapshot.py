@@ -0,0 +1,56 @@
+# Index Snapshot Tests
+import io
+import tarfile
+
+import pytest
+
+from app.services.index_snapshot import export_snapshot, import_snapshot
+
+
+def _make_index(index_dir):
+    (index_dir / "text").mkdir(parents=True)
+    (index_dir / "schema_version").write_text("3:cjk_bigram")
+    (index_dir / "MAIN_1.seg").write_bytes(b"segment")
+    (index_dir / "text" / "doc.z").write_bytes(b"pages")
+    (index_dir / "MAIN_WRITELOCK").write_text("")
+    (index_dir / "text" / "doc.tmp").write_bytes(b"partial")
+
+
+def test_export_and_import_round_trip(tmp_path):
+    """测试导出的快照可导入到新目录，锁文件和临时文件不进入快照"""
+    source = tmp_path / "source"
+    _make_index(source)
+
+    info = export_snapshot(source, tmp_path / "snapshots" / "index.tar.gz")
+    assert info["schema_version"] == "3:cjk_bigram"
+    assert info["files"] == 3
+
+    target = tmp_path / "target"
+    target.mkdir()
+    (target / "stale.seg").write_bytes(b"old")
+
+    imported = import_snapshot(tmp_path / "snapshots" / "index.tar.gz", target)
+    assert imported["files"] == 3
+    assert (target / "MAIN_1.seg").read_bytes() == b"segment"
+    assert (target / "text" / "doc.z").read_bytes() == b"pages"
+    assert not (target / "stale.seg").exists()
+    assert not (target / "MAIN_WRITELOCK").exists()
+    assert not (target / "snapshot.json").exists()
+
+
+def test_import_rejects_unsafe_paths(tmp_path):
+    """测试快照中跳出目标目录的条目被拒绝，原目录保持不变"""
+    archive_path = tmp_path / "evil.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as archive:
+        info = tarfile.TarInfo("../escape.txt")
+        info.size = 1
+        archive.addfile(info, io.BytesIO(b"x"))
+
+    target = tmp_path / "index"
+    target.mkdir()
+    (target / "keep.seg").write_bytes(b"keep")
+
+    with pytest.raises(ValueError):
+        import_snapshot(archive_path, target)
+    assert (target / "keep.seg").exists()
+    assert not (tmp_path / "escape.txt").exists()
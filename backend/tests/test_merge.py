@@ -1,6 +1,8 @@
 # Merge Service Tests
 import pytest
+from PyPDF2 import PdfReader, PdfWriter
 from app.services.merge_service import MergeService, MergeConfig, SelectedPage
+from app.services.converters.pdf_merge import DocumentMergeConverter
 
 
 @pytest.fixture
@@ -46,4 +48,38 @@ def test_get_queue_empty(merge_service):
     assert len(queue) == 0
 
 
+def _blank_pdf(path, pages, width=200):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=width, height=300)
+    writer.write(str(path))
+    return path
+
+
+def test_merge_pdf_pages_opens_each_source_once(tmp_path):
+    """测试按文档ID合并页面，每个源文档只打开一次"""
+    sources = {
+        "doc_a": _blank_pdf(tmp_path / "a.pdf", 3, width=200),
+        "doc_b": _blank_pdf(tmp_path / "b.pdf", 2, width=400),
+    }
+    output = tmp_path / "merged.pdf"
+    pages = [("doc_b", 1), ("doc_a", 0), ("doc_a", 2), ("doc_b", 0), ("doc_a", 0)]
+
+    result = DocumentMergeConverter(output).merge_pdf_pages(sources, pages)
+
+    assert result["success"] is True
+    assert result["pages_merged"] == 5
+    assert result["sources_opened"] == 2
+    widths = [float(p.mediabox.width) for p in PdfReader(str(output)).pages]
+    assert widths == [400, 200, 200, 400, 200]
+
+
+def test_merge_pdf_pages_unknown_document(tmp_path):
+    """测试未知文档ID"""
+    result = DocumentMergeConverter(tmp_path / "merged.pdf").merge_pdf_pages(
+        {}, [("missing", 0)]
+    )
+    assert result["success"] is False
+
+
 # TODO: Add actual merge tests when implemented
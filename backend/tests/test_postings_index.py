@@ -0,0 +1,43 @@
+# Postings Index Tests
+from app.services.postings_index import PostingsIndex, build_postings, tokenize
+
+
+PAGES = [
+    "Invoice total due",
+    "",
+    "The total amount; TOTAL due later",
+]
+
+
+def test_tokenize_offsets():
+    """测试词元小写化并记录原文偏移"""
+    assert list(tokenize("Hello, World")) == [("hello", 0), ("world", 7)]
+
+
+def test_lookup_any_and_all_terms(tmp_path):
+    """测试按任意词和全部词查找页面及偏移"""
+    index = PostingsIndex(tmp_path / "postings")
+    index.put("doc", build_postings(PAGES))
+
+    any_hits = index.lookup("doc", ["invoice", "amount"])
+    assert sorted(any_hits) == [1, 3]
+
+    all_hits = index.lookup("doc", ["total", "due"], require_all=True)
+    assert sorted(all_hits) == [1, 3]
+    assert all_hits[3] == [4, 18, 24]
+
+    assert index.lookup("doc", ["invoice", "amount"], require_all=True) == {}
+    assert index.lookup("missing", ["total"]) == {}
+
+
+def test_postings_survive_reload(tmp_path):
+    """测试倒排表保存到磁盘后可重新加载，删除后不存在"""
+    PostingsIndex(tmp_path / "postings").put("doc", build_postings(PAGES))
+
+    reopened = PostingsIndex(tmp_path / "postings")
+    assert reopened.contains("doc")
+    assert sorted(reopened.lookup("doc", ["later"])) == [3]
+
+    reopened.delete("doc")
+    assert not reopened.contains("doc")
+    assert reopened.get("doc") is None
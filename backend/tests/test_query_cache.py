@@ -0,0 +1,32 @@
+# Query Result Cache Tests
+from app.services.query_cache import QueryResultCache
+
+
+def test_generation_change_invalidates():
+    """测试索引代次变化后缓存失效"""
+    cache = QueryResultCache(max_entries=10)
+    cache.put(("doc", "invoice"), 1, ["page 3"])
+
+    assert cache.get(("doc", "invoice"), 1) == ["page 3"]
+    assert cache.get(("doc", "invoice"), 2) is None
+    assert cache.get(("doc", "invoice"), 1) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["stale"] == 1
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_lru_eviction():
+    """测试超出条数上限时淘汰最久未使用的结果"""
+    cache = QueryResultCache(max_entries=2)
+    cache.put("a", 0, 1)
+    cache.put("b", 0, 2)
+    cache.get("a", 0)
+    cache.put("c", 0, 3)
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == 1
+    assert cache.get("c", 0) == 3
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,77 @@
+# Conversion Result Cache Tests
+import pytest
+
+from app.services.result_cache import ConversionCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """结果缓存fixture"""
+    return ConversionCache(str(tmp_path / "cache"), max_size=10)
+
+
+def _write(path, size):
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_make_key_normalizes_options():
+    """测试选项规范化"""
+    key1 = ConversionCache.make_key("abc", "pdf_to_word", {"quality": None, "page_size": "A4 "})
+    key2 = ConversionCache.make_key("abc", "pdf_to_word", {"page_size": "a4"})
+    key3 = ConversionCache.make_key("abc", "pdf_to_excel", {"page_size": "a4"})
+    assert key1 == key2
+    assert key1 != key3
+
+
+def test_cache_hit_and_miss(cache, tmp_path):
+    """测试命中与未命中统计"""
+    output = _write(tmp_path / "out.docx", 4)
+    assert cache.get("k1") is None
+    cache.put("k1", {"output_path": output}, files=[output])
+    assert cache.get("k1") == {"output_path": output}
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_lru_eviction(cache, tmp_path):
+    """测试超出磁盘预算时按LRU淘汰"""
+    a = _write(tmp_path / "a.pdf", 4)
+    b = _write(tmp_path / "b.pdf", 4)
+    c = _write(tmp_path / "c.pdf", 4)
+    cache.put("a", {}, files=[a])
+    cache.put("b", {}, files=[b])
+    cache.get("a")
+    cache.put("c", {}, files=[c])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert not (tmp_path / "b.pdf").exists()
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_keeps_shared_output_dir(cache, tmp_path):
+    """测试淘汰单文件结果后，共享的输出目录即使为空也保留"""
+    outputs = tmp_path / "outputs"
+    outputs.mkdir()
+    a = _write(outputs / "a.pdf", 8)
+    b = _write(tmp_path / "b.pdf", 8)
+    cache.put("a", {}, files=[a])
+    cache.put("b", {}, files=[b])
+
+    assert not (outputs / "a.pdf").exists()
+    assert outputs.is_dir()
+
+
+def test_eviction_removes_result_directory(cache, tmp_path):
+    """测试淘汰多文件结果时删除其独占的目录"""
+    result_dir = tmp_path / "outputs" / "doc_1"
+    result_dir.mkdir(parents=True)
+    pages = [_write(result_dir / f"page_{i}.png", 4) for i in range(2)]
+    other = _write(tmp_path / "other.pdf", 8)
+    cache.put("pages", {}, files=pages, directory=str(result_dir))
+    cache.put("other", {}, files=[other])
+
+    assert not result_dir.exists()
+    assert (tmp_path / "outputs").is_dir()
@@ -0,0 +1,187 @@
+# Search Service Tests
+import pytest
+from PyPDF2 import PdfWriter
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfgen import canvas
+from whoosh.fields import Schema, ID, TEXT
+from whoosh.index import create_in
+from whoosh.query import Term
+
+from app.services.search_service import (
+    SearchOptions,
+    SearchService,
+    extract_pages,
+    split_passages,
+)
+from app.services.word_boxes import build_page_text
+from app.services.searcher_lease import SearcherManager
+
+
+def _blank_pdf(path, pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=300)
+    writer.write(str(path))
+    return str(path)
+
+
+def _text_pdf(path, text, font="Helvetica"):
+    pdf = canvas.Canvas(str(path), pagesize=(400, 300))
+    pdf.setFont(font, 14)
+    pdf.drawString(20, 250, text)
+    pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+def test_extract_pages_clips_range(tmp_path):
+    """测试按页码范围提取文本，超出页数的部分被截断"""
+    pdf_path = _blank_pdf(tmp_path / "doc.pdf", 5)
+
+    assert len(extract_pages(pdf_path, 0, 3)) == 3
+    assert extract_pages(pdf_path, 3, 10) == [("", []), ("", [])]
+    assert extract_pages(pdf_path, 5, 8) == []
+
+
+def test_split_passages_overlap():
+    """测试段落按固定长度切分并相互重叠，覆盖全部文本"""
+    text = "x" * 2500
+    passages = split_passages(text, 1000, 200)
+
+    assert passages == [(0, 1000), (800, 1800), (1600, 2500)]
+    assert split_passages("short", 1000, 200) == [(0, 5)]
+
+
+def test_cursor_round_trip():
+    """测试翻页游标编码后可还原，损坏的游标被拒绝"""
+    state = {"q": "abc", "g": 3, "a": [-1.5, "doc", 2]}
+    cursor = SearchService._encode_cursor(state)
+
+    assert SearchService._decode_cursor(cursor) == state
+    with pytest.raises(ValueError):
+        SearchService._decode_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        SearchService._decode_cursor(SearchService._encode_cursor({"q": "abc", "g": 3, "o": 40}))
+
+
+def test_old_searcher_survives_optimize(tmp_path):
+    """测试提交并合并索引段后，仍在使用的旧搜索器可以继续查询"""
+    ix = create_in(str(tmp_path), Schema(document_id=ID(stored=True, unique=True), content=TEXT()))
+    writer = ix.writer()
+    writer.add_document(document_id="a", content="alpha beta")
+    writer.add_document(document_id="b", content="beta gamma")
+    writer.commit()
+
+    manager = SearcherManager(ix.searcher)
+    with manager.lease(0) as old:
+        writer = ix.writer()
+        writer.update_document(document_id="a", content="alpha delta")
+        writer.commit(optimize=True)
+
+        with manager.lease(1) as new:
+            assert len(new.search(Term("content", "delta"))) == 1
+
+        assert len(old.search(Term("content", "beta"))) == 2
+
+
+def test_non_adjacent_terms_return_rects(tmp_path):
+    """测试不相邻的多个查询词各自返回匹配矩形"""
+    service = SearchService(str(tmp_path / "index"))
+    try:
+        words = [
+            {"text": text, "x0": x0, "top": 100, "x1": x0 + 30, "bottom": 110}
+            for text, x0 in (("Foo", 10), ("middle", 50), ("bar", 90))
+        ]
+        text, boxes = build_page_text(words)
+        service.text_store.put("doc", [text], [boxes])
+
+        options = SearchOptions()
+        q = service._parse_query("foo bar", options)
+        spans = service._pattern_spans(service._query_pattern(q, "foo bar", options), text)
+        matches = service._match_positions("doc", 1, spans)
+
+        assert [text[m["start"]:m["end"]] for m in matches] == ["Foo", "bar"]
+        assert all(len(m["rects"]) == 1 for m in matches)
+    finally:
+        service.close()
+
+
+def test_cjk_phrase_search(tmp_path):
+    """测试中文 PDF 建立索引后，三个及以上字符的查询按短语命中并高亮完整短语"""
+    pdfmetrics.registerFont(UnicodeCIDFont("STSong-Light"))
+    pdf_path = _text_pdf(tmp_path / "invoice.pdf", "增值税发票号码 12345", "STSong-Light")
+
+    service = SearchService(str(tmp_path / "index"))
+    try:
+        assert service.build_index("doc", pdf_path)["success"]
+
+        for query in ("增值税", "发票号码", "税"):
+            results = service.search("doc", query, SearchOptions())
+            assert [r.page_index for r in results] == [0], query
+            match = results[0].position["matches"][0]
+            assert results[0].text[match["start"]:match["end"]] == query
+            assert match["rects"]
+
+        assert service.search("doc", "增票", SearchOptions()) == []
+        assert service.search_corpus("发票号码", SearchOptions())["total"] == 1
+    finally:
+        service.close()
+
+
+def test_reindex_picks_up_modified_source(tmp_path):
+    """测试不强制重新索引时，来源文件修改过的文档重新索引，未修改的跳过"""
+    changed = _text_pdf(tmp_path / "changed.pdf", "original wording")
+    unchanged = _text_pdf(tmp_path / "unchanged.pdf", "stable wording")
+
+    service = SearchService(str(tmp_path / "index"))
+    try:
+        service.build_index("changed", changed)
+        service.build_index("unchanged", unchanged)
+        _text_pdf(tmp_path / "changed.pdf", "revised wording")
+
+        assert service.reindex_all() == 2
+        jobs = {doc: service._queue.get_job(doc) for doc in ("changed", "unchanged")}
+        for job in jobs.values():
+            assert job.wait(30)
+
+        assert not jobs["changed"].skipped
+        assert jobs["unchanged"].skipped
+        assert service.search("changed", "revised", SearchOptions())
+        assert not service.search("changed", "original", SearchOptions())
+    finally:
+        service.close()
+
+
+def test_corpus_cursor_survives_evicted_snapshot(tmp_path, monkeypatch):
+    """测试排序结果集被淘汰后继续翻页，不重复也不跳过；facets 统计全部匹配结果"""
+    service = SearchService(str(tmp_path / "index"))
+    try:
+        for i in range(5):
+            text = " ".join(["needle"] * (i + 1) + ["hay"] * 10)
+            service.build_index(f"doc-{i}", _text_pdf(tmp_path / f"doc-{i}.pdf", text))
+        expected = [
+            (r["document_id"], r["page_index"])
+            for r in service.search_corpus("needle", SearchOptions(), limit=10)["results"]
+        ]
+        assert len(expected) == 5
+
+        seen = []
+        cursor = None
+        while True:
+            service._ranked.clear()
+            page = service.search_corpus("needle", SearchOptions(), cursor, limit=2)
+            seen.extend((r["document_id"], r["page_index"]) for r in page["results"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+
+        monkeypatch.setattr("app.services.search_service.settings.search_corpus_max_hits", 2)
+        service._ranked.clear()
+        result = service.search_corpus("needle", SearchOptions())
+        assert result["total"] == 2
+        assert result["truncated"]
+        assert sum(facet["hits"] for facet in result["facets"]) == 5
+    finally:
+        service.close()
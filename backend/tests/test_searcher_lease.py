@@ -0,0 +1,34 @@
+# Searcher Lease Tests
+from app.services.searcher_lease import SearcherManager
+
+
+class _FakeSearcher:
+    def __init__(self, generation):
+        self.generation = generation
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_old_searcher_closed_after_last_lease():
+    """测试新代次打开新的搜索器，旧搜索器在最后一个查询归还后才关闭"""
+    opened = []
+
+    def open_searcher():
+        opened.append(_FakeSearcher(len(opened)))
+        return opened[-1]
+
+    manager = SearcherManager(open_searcher)
+    with manager.lease(0) as old:
+        with manager.lease(0) as same:
+            assert same is old
+        with manager.lease(1) as new:
+            assert new is not old
+            assert not old.closed
+        assert not new.closed
+    assert old.closed
+
+    manager.close()
+    assert new.closed
+    assert manager.opened == manager.closed == 2
@@ -0,0 +1,49 @@
+# Single Flight Tests
+import asyncio
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_identical_calls_are_coalesced():
+    """测试相同键的并发调用只执行一次"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do("key", compute) for _ in range(3)])
+        return flight, results
+
+    flight, results = asyncio.run(run())
+    assert results == ["result"] * 3
+    assert len(calls) == 1
+    assert flight.stats()["coalesced"] == 2
+    assert flight.in_flight() == 0
+
+
+def test_errors_are_shared_and_not_cached():
+    """测试异常会传递给所有等待者，之后的调用重新执行"""
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+        )
+        with pytest.raises(RuntimeError):
+            await flight.do("key", failing)
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(calls) == 2
@@ -0,0 +1,29 @@
+# Text Store Tests
+from app.services.text_store import TextStore
+
+
+def test_put_and_get_pages(tmp_path):
+    """测试按页保存和读取文本"""
+    store = TextStore(tmp_path / "text")
+    store.put("doc-1", ["第一页", "", "third page " * 100])
+
+    assert store.get_page("doc-1", 1) == "第一页"
+    assert store.get_page("doc-1", 3).startswith("third page")
+    assert store.get_page("doc-1", 4) == ""
+    assert store.size() < len("third page " * 100)
+
+    reopened = TextStore(tmp_path / "text")
+    assert reopened.get_pages("doc-1")[0] == "第一页"
+
+
+def test_replace_and_delete(tmp_path):
+    """测试替换后读到新内容，删除后不存在"""
+    store = TextStore(tmp_path / "text")
+    store.put("doc", ["old"])
+    assert store.get_page("doc", 1) == "old"
+
+    store.put("doc", ["new"])
+    assert store.get_page("doc", 1) == "new"
+
+    store.delete("doc")
+    assert store.get_pages("doc") is None
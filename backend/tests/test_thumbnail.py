@@ -0,0 +1,73 @@
+# Thumbnail Service Tests
+import asyncio
+import json
+import pytest
+from PIL import Image
+
+from app.services.thumbnail_service import ThumbnailService
+from app.utils.file_utils import compute_file_hash
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    """不是合法PDF的输入文件，用于验证缓存命中时不解析PDF"""
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"not really a pdf")
+    return path
+
+
+def _seed(service, pdf_file, pages, size):
+    doc_hash = compute_file_hash(pdf_file)
+    layout = [{"width": 595.0, "height": 842.0, "rotation": 0} for _ in range(pages)]
+    (service.thumbnail_dir / f"{doc_hash}.json").write_text(json.dumps(layout))
+    for page in range(pages):
+        name = service._thumbnail_name(doc_hash, page, size)
+        Image.new("RGB", (size[0] - 10, size[1]), "white").save(service.thumbnail_dir / name)
+    service._scan()
+
+
+def test_cached_thumbnails_skip_pdf_parsing(tmp_path, pdf_file):
+    """测试命中缓存时直接读取缩略图"""
+    service = ThumbnailService(str(tmp_path / "thumbs"), max_size=10 * 1024 * 1024)
+    _seed(service, pdf_file, pages=2, size=(150, 210))
+
+    result = asyncio.run(service.get_thumbnails(pdf_file, size=(150, 210)))
+
+    assert result["success"] is True
+    assert result["total_pages"] == 2
+    assert [t["page_number"] for t in result["thumbnails"]] == [1, 2]
+    assert result["thumbnails"][0]["width"] == 140
+    assert service.stats()["hits"] == 2
+
+
+def test_thumbnail_lru_eviction(tmp_path):
+    """测试超出预算时删除最久未使用的缩略图"""
+    service = ThumbnailService(str(tmp_path / "thumbs"), max_size=10)
+    for name in ("a.png", "b.png", "c.png"):
+        (service.thumbnail_dir / name).write_bytes(b"12345")
+        with service._lock:
+            service._add(name, 5)
+    service._touch("a.png")
+    with service._lock:
+        service._evict()
+
+    assert not (service.thumbnail_dir / "b.png").exists()
+    assert (service.thumbnail_dir / "a.png").exists()
+    assert service.stats()["total_size"] == 10
+
+
+def test_layout_files_share_cache_budget(tmp_path, pdf_file):
+    """测试页面布局文件计入缓存大小，超出预算时同样被删除"""
+    service = ThumbnailService(str(tmp_path / "thumbs"), max_size=10 * 1024 * 1024)
+    _seed(service, pdf_file, pages=2, size=(150, 210))
+    layout_name = f"{compute_file_hash(pdf_file)}.json"
+
+    assert layout_name in service._entries
+    assert service.stats()["entries"] == 3
+
+    service.max_size = 0
+    with service._lock:
+        service._evict()
+
+    assert not (service.thumbnail_dir / layout_name).exists()
+    assert service.stats()["total_size"] == 0
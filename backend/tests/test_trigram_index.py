@@ -0,0 +1,33 @@
+# Trigram Index Tests
+from app.services.trigram_index import TrigramIndex, build_trigrams, regex_trigram_query
+
+
+PAGES = [
+    "Invoice number INV-2024-001",
+    "Payment received",
+    "Refund for invoice INV-2023-117",
+]
+
+
+def test_regex_trigram_query():
+    """测试从正则表达式中提取必需的三元组"""
+    assert regex_trigram_query(r"abc") == "abc"
+    assert regex_trigram_query(r"abcd") == ("and", ["abc", "bcd"])
+    assert regex_trigram_query(r"ab.cd") is None
+    assert regex_trigram_query(r"(foo|bar)x*") == ("or", ["foo", "bar"])
+    assert regex_trigram_query(r"(foo|.b)") is None
+    assert regex_trigram_query(r"INV-\d+") == ("and", ["inv", "nv-"])
+    assert regex_trigram_query(r"(?:xyz)?end") == "end"
+
+
+def test_candidates_limit_pages(tmp_path):
+    """测试候选页面只包含可能匹配的页面"""
+    index = TrigramIndex(tmp_path / "trigrams")
+    index.put("doc", build_trigrams(PAGES))
+
+    assert index.candidates("doc", r"INV-2023-\d+") == {3}
+    assert index.candidates("doc", r"(payment|refund)") == {2, 3}
+    assert index.candidates("doc", r"invoice") == {1, 3}
+    assert index.candidates("doc", r"zzz") == set()
+    assert index.candidates("doc", r"\d+") is None
+    assert index.candidates("missing", r"invoice") is None
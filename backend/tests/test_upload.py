@@ -0,0 +1,52 @@
+# Upload Utilities Tests
+import asyncio
+import hashlib
+import io
+import pytest
+from fastapi import UploadFile
+
+from app.utils.upload_utils import (
+    save_upload_file,
+    sniff_file_type,
+    UploadTooLargeError,
+    UploadTypeMismatchError,
+)
+
+
+PDF_BYTES = b"%PDF-1.7\n" + b"0" * 100
+
+
+def test_sniff_file_type():
+    """测试文件头识别"""
+    assert sniff_file_type(b"%PDF-1.4") == "pdf"
+    assert sniff_file_type(b"PK\x03\x04rest") == "zip"
+    assert sniff_file_type(b"\x89PNG\r\n\x1a\n") == "png"
+    assert sniff_file_type(b"RIFF\x00\x00\x00\x00WEBPVP8") == "webp"
+    assert sniff_file_type(b"hello") is None
+
+
+def test_save_upload_file_hashes_in_one_pass(tmp_path):
+    """测试流式保存并同时计算哈希"""
+    upload = UploadFile(file=io.BytesIO(PDF_BYTES), filename="doc.pdf")
+    saved = asyncio.run(save_upload_file(upload, str(tmp_path), max_size=1024, chunk_size=16))
+
+    assert saved.path.read_bytes() == PDF_BYTES
+    assert saved.size == len(PDF_BYTES)
+    assert saved.content_hash == hashlib.sha256(PDF_BYTES).hexdigest()
+    assert saved.detected_type == "pdf"
+
+
+def test_save_upload_file_rejects_oversize(tmp_path):
+    """测试超出大小限制时中止并清理"""
+    upload = UploadFile(file=io.BytesIO(PDF_BYTES), filename="doc.pdf")
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_upload_file(upload, str(tmp_path), max_size=32, chunk_size=16))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_upload_file_rejects_type_mismatch(tmp_path):
+    """测试文件内容与扩展名不符"""
+    upload = UploadFile(file=io.BytesIO(b"not a pdf"), filename="doc.pdf")
+    with pytest.raises(UploadTypeMismatchError):
+        asyncio.run(save_upload_file(upload, str(tmp_path), max_size=1024))
+    assert list(tmp_path.iterdir()) == []
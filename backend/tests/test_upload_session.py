@@ -0,0 +1,104 @@
+# Upload Session Service Tests
+import asyncio
+import hashlib
+import os
+import pytest
+import time
+
+from app.services.upload_session_service import (
+    UploadSessionService,
+    UploadIncompleteError,
+    UploadSessionNotFoundError,
+)
+
+
+PDF_BYTES = b"%PDF-1.7\n" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def service(tmp_path):
+    """分块上传服务fixture"""
+    return UploadSessionService(str(tmp_path), max_file_size=1024 * 1024, default_chunk_size=100)
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_out_of_order_upload_and_finalize(service, tmp_path):
+    """测试乱序上传、查询偏移量和完成上传"""
+
+    async def run():
+        session = await service.create_session("scan.pdf", len(PDF_BYTES))
+        chunks = _chunks(PDF_BYTES, 100)
+
+        await service.write_chunk(session.id, 0, chunks[0])
+        await service.write_chunk(session.id, 2, chunks[2])
+        assert session.received_offset == 100
+        assert 1 in session.missing_chunks
+
+        with pytest.raises(UploadIncompleteError):
+            await service.finalize(session.id)
+
+        for index, chunk in enumerate(chunks):
+            await service.write_chunk(session.id, index, chunk)
+
+        return session.id, await service.finalize(session.id)
+
+    upload_id, saved = asyncio.run(run())
+    assert saved.path == tmp_path / f"{upload_id}.pdf"
+    assert saved.path.read_bytes() == PDF_BYTES
+    assert saved.content_hash == hashlib.sha256(PDF_BYTES).hexdigest()
+    assert service.resolve_upload(upload_id) == saved.path
+
+
+def test_session_survives_restart(service, tmp_path):
+    """测试服务重启后可以继续上传"""
+
+    async def run():
+        session = await service.create_session("scan.pdf", len(PDF_BYTES))
+        chunks = _chunks(PDF_BYTES, 100)
+        await service.write_chunk(session.id, 0, chunks[0])
+
+        restarted = UploadSessionService(str(tmp_path), 1024 * 1024, 100)
+        assert restarted.get_session(session.id).received_offset == 100
+        for index, chunk in enumerate(chunks[1:], start=1):
+            await restarted.write_chunk(session.id, index, chunk)
+        return await restarted.finalize(session.id)
+
+    saved = asyncio.run(run())
+    assert saved.content_hash == hashlib.sha256(PDF_BYTES).hexdigest()
+
+
+def test_unknown_session(service):
+    """测试不存在的会话"""
+    with pytest.raises(UploadSessionNotFoundError):
+        service.get_session("../etc/passwd")
+
+
+def test_sweep_removes_abandoned_sessions(tmp_path):
+    """测试超过保留时间的未完成会话被清理，已完成会话和新会话保留"""
+    service = UploadSessionService(str(tmp_path), 1024 * 1024, 100, session_ttl=3600)
+
+    async def run():
+        abandoned = await service.create_session("old.pdf", len(PDF_BYTES))
+        active = await service.create_session("new.pdf", len(PDF_BYTES))
+        completed = await service.create_session("done.pdf", len(PDF_BYTES))
+        for index, chunk in enumerate(_chunks(PDF_BYTES, 100)):
+            await service.write_chunk(completed.id, index, chunk)
+        await service.finalize(completed.id)
+        return abandoned.id, active.id, completed.id
+
+    abandoned, active, completed = asyncio.run(run())
+    expired = time.time() - 7200
+    for path in service.session_dir.iterdir():
+        if path.stem in (abandoned, completed):
+            os.utime(path, (expired, expired))
+
+    assert service.sweep_expired() == 1
+    assert sorted(path.name for path in service.session_dir.iterdir()) == sorted(
+        [f"{active}.json", f"{active}.part", f"{completed}.json"]
+    )
+    with pytest.raises(UploadSessionNotFoundError):
+        service.get_session(abandoned)
+    assert service.resolve_upload(completed).exists()
@@ -0,0 +1,40 @@
+# Word Boxes Tests
+from app.services.word_boxes import build_page_text, match_rects
+
+
+def _word(text, x0, top, x1, bottom):
+    return {"text": text, "x0": x0, "top": top, "x1": x1, "bottom": bottom}
+
+
+WORDS = [
+    _word("Hello", 10, 100, 40, 110),
+    _word("world", 45, 100, 80, 110),
+    _word("next", 10, 120, 35, 130),
+    _word("line", 40, 120.5, 60, 130),
+]
+
+
+def test_build_page_text_offsets():
+    """测试拼接文本时记录单词偏移，换行处使用换行符"""
+    text, boxes = build_page_text(WORDS)
+
+    assert text == "Hello world\nnext line"
+    assert boxes[:6] == [0, 5, 100, 1000, 400, 1100]
+    assert boxes[12:14] == [12, 16]
+
+
+def test_match_rects_merges_same_line():
+    """测试同一行的单词合并为一个矩形，跨行的匹配返回多个矩形"""
+    text, boxes = build_page_text(WORDS)
+
+    start = text.index("world")
+    assert match_rects(boxes, start, start + 5) == [[45.0, 100.0, 80.0, 110.0]]
+
+    assert match_rects(boxes, 0, len("Hello world")) == [[10.0, 100.0, 80.0, 110.0]]
+
+    start = text.index("world")
+    end = text.index("next") + 4
+    assert match_rects(boxes, start, end) == [
+        [45.0, 100.0, 80.0, 110.0],
+        [10.0, 120.0, 35.0, 130.0],
+    ]